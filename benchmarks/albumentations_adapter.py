@@ -0,0 +1,39 @@
+"""Per sample overhead of `tfms.A.Adapter`, measured with its `timing_hook`.
+
+Compares creating the `A.Compose` on every sample (previous behaviour) with the
+cached pipelines.
+"""
+from icevision.all import *
+
+
+class UncachedAdapter(tfms.A.Adapter):
+    def get_tfms(self):
+        return self.create_tfms()
+
+
+def main(size: int = 384, epochs: int = 20):
+    parser = parsers.COCOBBoxParser(
+        annotations_filepath="samples/annotations.json", img_dir="samples/images"
+    )
+    records = parser.parse(data_splitter=SingleSplitSplitter(), show_pbar=False)[0]
+
+    for adapter_cls in [UncachedAdapter, tfms.A.Adapter]:
+        timings = defaultdict(list)
+
+        def timing_hook(sample_timings):
+            for name, seconds in sample_timings.items():
+                timings[name].append(seconds)
+
+        tfm = adapter_cls(tfms.A.aug_tfms(size=size), timing_hook=timing_hook)
+        ds = Dataset(records, tfm)
+        for _ in range(epochs):
+            for i in range(len(ds)):
+                ds[i]
+
+        means = {name: np.mean(o) * 1e3 for name, o in timings.items()}
+        report = ", ".join(f"{name}: {ms:6.3f} ms" for name, ms in means.items())
+        print(f"{adapter_cls.__name__:>14}: {report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Fraction of padded pixels when the images of each batch are padded to the largest
+height and width of the batch (what `ImgPadStack` and the torchvision models do),
+with random batches and with `AspectRatioBatchSampler`.
+
+Image sizes are a mix of portrait and landscape photos of different resolutions.
+"""
+from icevision.all import *
+
+
+def make_records(num_images: int, seed: int = 0) -> List[BaseRecord]:
+    rng = np.random.default_rng(seed)
+    records = []
+    for i in range(num_images):
+        long_side = rng.choice([480, 640, 800, 1024])
+        short_side = int(long_side * rng.choice([0.5, 0.5625, 0.75, 1]))
+        width, height = (long_side, short_side)
+        if rng.random() < 0.4:
+            width, height = height, width
+        record = BaseRecord(())
+        record.set_record_id(i)
+        record.set_img_size(ImgSize(width=width, height=height))
+        records.append(record)
+    return records
+
+
+def padded_fraction(records: List[BaseRecord], batches: List[List[int]]) -> float:
+    pixels, padded_pixels = 0, 0
+    for batch in batches:
+        sizes = np.array([records[i].img_size for i in batch])
+        pixels += (sizes[:, 0] * sizes[:, 1]).sum()
+        padded_pixels += len(batch) * sizes[:, 0].max() * sizes[:, 1].max()
+    return 1 - pixels / padded_pixels
+
+
+def main(num_images: int = 10_000, batch_size: int = 16):
+    records = make_records(num_images)
+
+    idxs = np.random.default_rng(0).permutation(num_images).tolist()
+    random_batches = [
+        idxs[i : i + batch_size] for i in range(0, num_images, batch_size)
+    ]
+    sampler = AspectRatioBatchSampler(records, batch_size=batch_size)
+
+    for name, batches in [("random", random_batches), ("aspect ratio", list(sampler))]:
+        fraction = padded_fraction(records, batches)
+        print(
+            f"{name:>12}: {fraction * 100:5.1f}% padded pixels, {len(batches)} batches"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Time spent augmenting a batch of records with `tfms.A.Adapter` (one sample at a
+time) and with `tfms.batch.BatchAugment` (the whole batch at once).
+
+`BatchAugment` keeps the images uint8 when there's no `BatchNormalize`, they can then
+be collated with `uint8=True` and normalized on the device with `add_normalize_hook`.
+"""
+import time
+
+from icevision.all import *
+
+
+def main(size: int = 384, batch_size: int = 16, n: int = 30):
+    parser = parsers.COCOMaskParser(
+        annotations_filepath="samples/annotations.json", img_dir="samples/images"
+    )
+    records = parser.parse(data_splitter=SingleSplitSplitter(), show_pbar=False)[0]
+    records = [records[i % len(records)] for i in range(batch_size)]
+    # images are loaded and resized beforehand, only the augmentations are timed
+    presize = tfms.A.Adapter([tfms.A.Resize(size, size)])
+    records = [presize(record.load()) for record in records]
+
+    albu_tfm = tfms.A.Adapter(
+        [
+            tfms.A.HorizontalFlip(),
+            tfms.A.ShiftScaleRotate(rotate_limit=15),
+            tfms.A.RandomBrightnessContrast(),
+            tfms.A.Normalize(),
+        ]
+    )
+    augment = [
+        tfms.batch.BatchHorizontalFlip(),
+        tfms.batch.BatchAffine(),
+        tfms.batch.BatchColorJitter(),
+    ]
+    batch_tfm = tfms.batch.BatchAugment([*augment, tfms.batch.BatchNormalize()])
+    uint8_batch_tfm = tfms.batch.BatchAugment(augment)
+
+    def albu(batch):
+        return [albu_tfm(record) for record in batch]
+
+    for name, fn in [
+        ("albumentations", albu),
+        ("batch", batch_tfm),
+        ("batch uint8", uint8_batch_tfm),
+    ]:
+        timings = []
+        for _ in range(n):
+            batch = [record.clone() for record in records]
+            start = time.perf_counter()
+            fn(batch)
+            timings.append(time.perf_counter() - start)
+        print(f"{name:>14}: {np.median(timings) * 1e3:8.2f} ms per batch")
+
+
+if __name__ == "__main__":
+    main()
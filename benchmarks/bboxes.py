@@ -0,0 +1,29 @@
+"""Cost of converting predicted boxes and computing their area and collating them into a tensor.
+
+Compares a list of `BBox` objects with the vectorized `BBoxes` array type.
+"""
+import timeit
+from icevision.all import *
+
+
+def main(num_boxes: int = 5000, number: int = 20):
+    xyxy = np.random.rand(num_boxes, 4) * 100
+    xyxy[:, 2:] += xyxy[:, :2]
+
+    def with_list():
+        bboxes = [BBox.from_xyxy(*points) for points in xyxy]
+        areas = [bbox.area for bbox in bboxes]
+        tensor = torch.tensor([bbox.xyxy for bbox in bboxes])
+
+    def with_array():
+        bboxes = BBoxes.from_xyxy(xyxy)
+        areas = bboxes.area
+        tensor = bboxes.to_tensor()
+
+    for name, fn in [("list", with_list), ("BBoxes", with_array)]:
+        seconds = timeit.timeit(fn, number=number) / number
+        print(f"{name:>10}: {seconds * 1e3:8.2f} ms for {num_boxes} boxes")
+
+
+if __name__ == "__main__":
+    main()
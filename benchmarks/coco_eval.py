@@ -0,0 +1,65 @@
+"""Time of `COCOMetric.accumulate` and `finalize` with the pycocotools and the numpy
+backends on synthetic bbox records.
+"""
+import time
+
+from icevision.all import *
+
+
+def synthetic_records(n_imgs: int, n_gts: int = 7, n_dts: int = 20, seed: int = 0):
+    rng = np.random.RandomState(seed)
+    class_map = ClassMap([str(i) for i in range(10)])
+
+    def _record(record_id, xyxy, labels, scores=None):
+        components = [
+            SizeRecordComponent(),
+            FilepathRecordComponent(),
+            InstancesLabelsRecordComponent(),
+            BBoxesRecordComponent(),
+        ]
+        if scores is not None:
+            components.append(ScoresRecordComponent())
+        record = BaseRecord(components)
+        record.set_record_id(record_id)
+        record.set_filepath("none")
+        record.set_img_size(ImgSize(640, 480), original=True)
+        record.detection.set_class_map(class_map)
+        record.detection.add_labels_by_id(labels.tolist())
+        record.detection.add_bboxes(BBoxes.from_xyxy(xyxy))
+        if scores is not None:
+            record.detection.set_scores(scores)
+        return record
+
+    records, preds = [], []
+    for i in range(n_imgs):
+        xy = rng.uniform(0, 500, (n_gts, 2))
+        xyxy = np.concatenate([xy, xy + rng.uniform(8, 140, (n_gts, 2))], 1)
+        labels = rng.randint(1, 11, n_gts)
+        records.append(_record(i, xyxy, labels))
+
+        idxs = rng.randint(0, n_gts, n_dts)
+        dt_xyxy = xyxy[idxs] + rng.normal(0, 6, (n_dts, 4))
+        dt_xyxy[:, 2:] = np.maximum(dt_xyxy[:, 2:], dt_xyxy[:, :2] + 1)
+        dt_labels = np.where(rng.rand(n_dts) < 0.8, labels[idxs], rng.randint(1, 11))
+        preds.append(_record(i, dt_xyxy, dt_labels, rng.rand(n_dts)))
+
+    return records, preds
+
+
+def main(n_imgs: int = 5000, batch_size: int = 16):
+    records, preds = synthetic_records(n_imgs)
+    preds = [Prediction(pred=pred, ground_truth=gt) for pred, gt in zip(preds, records)]
+
+    for backend in COCOMetricBackend:
+        metric = COCOMetric(backend=backend)
+        start = time.perf_counter()
+        for i in range(0, len(preds), batch_size):
+            metric.accumulate(preds[i : i + batch_size])
+        logs = metric.finalize()
+        elapsed = time.perf_counter() - start
+        ap = logs["AP (IoU=0.50:0.95) area=all"]
+        print(f"{backend.value:>12}: {elapsed:7.2f} s (AP={ap:.6f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Time of `SimpleConfusionMatrix.accumulate` on synthetic images with hundreds of
+boxes, compared with matching through the per-box dicts of `match_records`.
+"""
+import time
+
+from icevision.all import *
+from icevision.metrics.confusion_matrix.confusion_matrix_utils import *
+
+
+def synthetic_records(n_imgs: int, n_gts: int = 200, n_dts: int = 300, seed: int = 0):
+    rng = np.random.RandomState(seed)
+    class_map = ClassMap([str(i) for i in range(20)])
+
+    def _record(xyxy, labels, scores=None):
+        components = [
+            SizeRecordComponent(),
+            FilepathRecordComponent(),
+            InstancesLabelsRecordComponent(),
+            BBoxesRecordComponent(),
+        ]
+        if scores is not None:
+            components.append(ScoresRecordComponent())
+        record = BaseRecord(components)
+        record.set_filepath("none")
+        record.set_img_size(ImgSize(1100, 1100), original=True)
+        record.detection.set_class_map(class_map)
+        record.detection.add_labels_by_id(labels.tolist())
+        record.detection.add_bboxes(BBoxes.from_xyxy(xyxy))
+        if scores is not None:
+            record.detection.set_scores(scores)
+        return record
+
+    preds = []
+    for _ in range(n_imgs):
+        xy = rng.uniform(0, 1000, (n_gts, 2))
+        xyxy = np.concatenate([xy, xy + rng.uniform(8, 100, (n_gts, 2))], 1)
+        labels = rng.randint(1, 21, n_gts)
+
+        idxs = rng.randint(0, n_gts, n_dts)
+        dt_xyxy = xyxy[idxs] + rng.normal(0, 6, (n_dts, 4))
+        dt_xyxy[:, 2:] = np.maximum(dt_xyxy[:, 2:], dt_xyxy[:, :2] + 1)
+        dt_labels = np.where(rng.rand(n_dts) < 0.8, labels[idxs], rng.randint(1, 21))
+        preds.append(
+            Prediction(
+                pred=_record(dt_xyxy, dt_labels, rng.rand(n_dts)),
+                ground_truth=_record(xyxy, labels),
+            )
+        )
+
+    return preds
+
+
+def match_records_cm(preds: Collection[Prediction]) -> np.ndarray:
+    target_labels, predicted_labels = [], []
+    for pred in preds:
+        for target_item, prediction_items in match_records(
+            pred.ground_truth, pred.pred
+        ):
+            target_labels.append(target_item["target_label_id"])
+            predicted_item = get_best_score_item(prediction_items)
+            predicted_labels.append(predicted_item["predicted_label_id"])
+    return sklearn.metrics.confusion_matrix(
+        target_labels, predicted_labels, labels=list(range(21))
+    )
+
+
+def main(n_imgs: int = 200):
+    preds = synthetic_records(n_imgs)
+
+    start = time.perf_counter()
+    expected = match_records_cm(preds)
+    print(f"match_records: {time.perf_counter() - start:7.2f} s")
+
+    for policy in MatchingPolicy:
+        metric = SimpleConfusionMatrix(policy=policy)
+        start = time.perf_counter()
+        metric.accumulate(preds)
+        metric.finalize()
+        elapsed = time.perf_counter() - start
+        print(f"{policy.name:>13}: {elapsed:7.2f} s")
+        if policy == MatchingPolicy.BEST_SCORE:
+            assert np.array_equal(metric.confusion_matrix, expected)
+
+
+if __name__ == "__main__":
+    main()
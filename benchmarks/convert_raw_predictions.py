@@ -0,0 +1,129 @@
+"""Conversions per second of `convert_raw_predictions` of each model family, with
+synthetic raw outputs of 100 detections per image and a low detection threshold.
+"""
+import time
+
+from icevision.all import *
+
+NUM_DETS, NUM_KPTS, IMG_SIZE = 100, 17, 384
+
+
+def _records(batch_size: int):
+    class_map = ClassMap([str(i) for i in range(80)])
+    records = []
+    for i in range(batch_size):
+        record = BaseRecord(
+            (ImageRecordComponent(), ClassMapRecordComponent(task=tasks.detection))
+        )
+        record.set_record_id(i)
+        record.set_img(np.zeros((IMG_SIZE, IMG_SIZE, 3), dtype=np.uint8))
+        record.detection.set_class_map(class_map)
+        records.append(record)
+    return records
+
+
+def _torchvision_raw_pred(masks: bool = False, keypoints: bool = False):
+    xy = torch.rand(NUM_DETS, 2) * IMG_SIZE / 2
+    raw_pred = {
+        "boxes": torch.cat([xy, xy + torch.rand(NUM_DETS, 2) * IMG_SIZE / 2], 1),
+        "labels": torch.randint(1, 81, (NUM_DETS,)),
+        "scores": torch.rand(NUM_DETS),
+    }
+    if masks:
+        raw_pred["masks"] = torch.rand(NUM_DETS, 1, IMG_SIZE // 4, IMG_SIZE // 4)
+    if keypoints:
+        raw_pred["keypoints"] = torch.rand(NUM_DETS, NUM_KPTS, 3) * IMG_SIZE
+        raw_pred["keypoints_scores"] = torch.rand(NUM_DETS, NUM_KPTS)
+    return raw_pred
+
+
+def torchvision_inputs(batch_size: int, **kwargs):
+    batch = (torch.zeros(batch_size, 3, IMG_SIZE, IMG_SIZE),)
+    raw_preds = [_torchvision_raw_pred(**kwargs) for _ in range(batch_size)]
+    return batch, raw_preds
+
+
+def efficientdet_inputs(batch_size: int):
+    batch = (torch.zeros(batch_size, 3, IMG_SIZE, IMG_SIZE),)
+    xy = torch.rand(batch_size, NUM_DETS, 2) * IMG_SIZE / 2
+    raw_preds = torch.cat(
+        [
+            xy,
+            xy + torch.rand(batch_size, NUM_DETS, 2) * IMG_SIZE / 2,
+            torch.rand(batch_size, NUM_DETS, 1),
+            torch.randint(1, 81, (batch_size, NUM_DETS, 1)).float(),
+        ],
+        -1,
+    )
+    return batch, raw_preds
+
+
+def yolov5_inputs(batch_size: int):
+    batch = torch.zeros(batch_size, 3, IMG_SIZE, IMG_SIZE)
+    # (xc, yc, w, h, objectness, class scores...) before nms
+    raw_preds = torch.cat(
+        [
+            torch.rand(batch_size, NUM_DETS * 10, 2) * IMG_SIZE,
+            torch.rand(batch_size, NUM_DETS * 10, 2) * IMG_SIZE / 4,
+            torch.rand(batch_size, NUM_DETS * 10, 81),
+        ],
+        -1,
+    )
+    return batch, raw_preds
+
+
+def benchmark(name, convert_fn, batch, raw_preds, batch_size, num_batches=20):
+    records = _records(batch_size)
+    convert_fn(batch=batch, raw_preds=raw_preds, records=records)
+    start = time.perf_counter()
+    for _ in range(num_batches):
+        convert_fn(batch=batch, raw_preds=raw_preds, records=records)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>14}: {num_batches * batch_size / elapsed:8.1f} images/s")
+
+
+def main(batch_size: int = 8, detection_threshold: float = 0.05):
+    from icevision.models.torchvision import faster_rcnn, mask_rcnn, keypoint_rcnn
+
+    torch.manual_seed(0)
+    kwargs = dict(detection_threshold=detection_threshold)
+    benchmark(
+        "faster_rcnn",
+        partial(faster_rcnn.convert_raw_predictions, **kwargs),
+        *torchvision_inputs(batch_size),
+        batch_size,
+    )
+    benchmark(
+        "mask_rcnn",
+        partial(mask_rcnn.convert_raw_predictions, mask_threshold=0.5, **kwargs),
+        *torchvision_inputs(batch_size, masks=True),
+        batch_size,
+    )
+    benchmark(
+        "keypoint_rcnn",
+        partial(keypoint_rcnn.convert_raw_predictions, **kwargs),
+        *torchvision_inputs(batch_size, keypoints=True),
+        batch_size,
+    )
+    if SoftDependencies.effdet:
+        from icevision.models.ross import efficientdet
+
+        benchmark(
+            "efficientdet",
+            partial(efficientdet.convert_raw_predictions, **kwargs),
+            *efficientdet_inputs(batch_size),
+            batch_size,
+        )
+    if SoftDependencies.yolov5:
+        from icevision.models.ultralytics import yolov5
+
+        benchmark(
+            "yolov5",
+            partial(yolov5.convert_raw_predictions, nms_iou_threshold=0.6, **kwargs),
+            *yolov5_inputs(batch_size),
+            batch_size,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Time spent loading and resizing 4000x3000 JPEGs with and without `draft_decode`.
+
+The sample images are upscaled to 4000x3000 and saved as JPEGs, then each record is
+loaded by a `Dataset` with `resize_and_pad(size)` as transform. With `draft_decode`
+the JPEGs are decoded at 1/2, 1/4 or 1/8 of their size instead of full resolution.
+"""
+import tempfile
+import time
+from icevision.all import *
+
+
+def make_records(dst: Path, num_images: int) -> List[BaseRecord]:
+    class_map = ClassMap(["a"])
+    sample_filepaths = sorted(Path("samples/images").glob("*.jpg"))
+    records = []
+    for i in range(num_images):
+        img = PIL.Image.open(sample_filepaths[i % len(sample_filepaths)])
+        filepath = dst / f"{i}.jpg"
+        img.convert("RGB").resize((4000, 3000)).save(filepath, quality=90)
+
+        record = BaseRecord(
+            (
+                FilepathRecordComponent(),
+                InstancesLabelsRecordComponent(),
+                BBoxesRecordComponent(),
+            )
+        )
+        record.set_record_id(i)
+        record.set_filepath(filepath)
+        record.set_img_size(ImgSize(width=4000, height=3000))
+        record.detection.set_class_map(class_map)
+        record.detection.add_labels(["a"])
+        record.detection.set_bboxes([BBox.from_xyxy(400, 300, 2000, 1500)])
+        records.append(record)
+    return records
+
+
+def main(num_images: int = 10, sizes: Sequence[int] = (384, 512, 1024)):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        records = make_records(Path(tmpdir), num_images)
+
+        for size in sizes:
+            tfm = tfms.A.Adapter(tfms.A.resize_and_pad(size))
+            for draft_decode in [False, True]:
+                dataset = Dataset(records, tfm=tfm, draft_decode=draft_decode)
+                start = time.perf_counter()
+                for i in range(len(dataset)):
+                    dataset[i]
+                per_item = (time.perf_counter() - start) / len(dataset)
+                name = "draft" if draft_decode else "full"
+                print(f"size {size:>4} {name:>5}: {per_item * 1e3:7.1f} ms/item")
+
+
+if __name__ == "__main__":
+    main()
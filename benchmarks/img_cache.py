@@ -0,0 +1,33 @@
+"""Time spent loading the sample records with and without `ImageCache`.
+
+Every epoch decodes all the JPEGs with `open_img` when there is no cache. With the
+cache only the first epoch decodes them, the following ones read the decoded
+arrays from shared memory.
+"""
+import time
+from icevision.all import *
+
+
+def main(num_epochs: int = 5):
+    parser = parsers.COCOMaskParser(
+        annotations_filepath="samples/annotations.json", img_dir="samples/images"
+    )
+    records = parser.parse(data_splitter=SingleSplitSplitter(), show_pbar=False)[0]
+
+    for name, img_cache in [
+        ("no cache", None),
+        ("cache", ImageCache(max_bytes=2 ** 30)),
+    ]:
+        dataset = Dataset(records, img_cache=img_cache)
+        for epoch in range(num_epochs):
+            start = time.perf_counter()
+            for i in range(len(dataset)):
+                dataset[i]
+            per_item = (time.perf_counter() - start) / len(dataset)
+            print(f"{name:>8} epoch {epoch}: {per_item * 1e3:6.2f} ms/item")
+        if img_cache is not None:
+            print(img_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Time spent collating a batch of normalized images of different sizes into a
+(B,C,H,W) tensor: `ImgPadStack`, `im2tensor` and `torch.stack`, like the model
+dataloaders do, with the previous `ImgPadStack` implementation as a reference.
+"""
+import time
+
+from icevision.all import *
+
+
+def reference_pad_stack(records, pad_value=np.zeros(1)):
+    max_sizes = np.zeros(3, dtype=int)
+    for record in records:
+        max_sizes = np.maximum(max_sizes, record.img.shape)
+    padded_imgs = np.ones((len(records), *max_sizes), dtype=records[0].img.dtype)
+    padded_imgs *= pad_value
+    for record, padded_img in zip(records, padded_imgs):
+        h, w, c = record.img.shape
+        padded_img[:h, :w, :c] = record.img
+        record.img = padded_img
+    return records
+
+
+def collate(pad_stack, records):
+    records = pad_stack(records)
+    return torch.stack([im2tensor(record.img) for record in records])
+
+
+def main(batch_size: int = 16, n: int = 20, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    records = []
+    for _ in range(batch_size):
+        height, width = rng.integers(448, 640, size=2)
+        record = BaseRecord((ImageRecordComponent(),))
+        record.set_img(rng.standard_normal((height, width, 3), dtype=np.float32))
+        records.append(record)
+
+    pad_stacks = [
+        ("reference", reference_pad_stack),
+        ("ImgPadStack", tfms.batch.ImgPadStack()),
+        ("stride 32", tfms.batch.ImgPadStack(stride=32)),
+    ]
+    for name, pad_stack in pad_stacks:
+        timings = []
+        for _ in range(n):
+            batch = [record.clone() for record in records]
+            start = time.perf_counter()
+            imgs = collate(pad_stack, batch)
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{name:>12}: {np.median(timings) * 1e3:8.2f} ms per batch "
+            f"{tuple(imgs.shape)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
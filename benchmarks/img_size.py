@@ -0,0 +1,78 @@
+"""Time spent getting image sizes when parsing a COCO dataset.
+
+The sample annotations are replicated to `num_images` images (symlinks to the
+sample images), then compares:
+- Opening every image with PIL, what `COCOBBoxParser` used to do
+- Reading the image headers with a thread pool (`img_size_from_annotations=False`)
+- Trusting the sizes in the annotations file (default)
+"""
+import tempfile
+import time
+from icevision.all import *
+
+
+def pil_img_size(filepath):
+    with PIL.Image.open(filepath) as image:
+        image_size = image.size
+        exif = image._getexif()
+    if exif is not None and exif.get(274) in [6, 8]:
+        image_size = image_size[::-1]
+    return ImgSize(*image_size)
+
+
+def make_coco_dataset(dst: Path, num_images: int) -> Path:
+    annotations = json.loads(Path("samples/annotations.json").read_text())
+    img_dir = dst / "images"
+    img_dir.mkdir()
+
+    images, new_annotations = [], []
+    for i in range(num_images):
+        info = annotations["images"][i % len(annotations["images"])]
+        file_name = f"{i}.jpg"
+        (img_dir / file_name).symlink_to(
+            Path("samples/images").absolute() / info["file_name"]
+        )
+        images.append({**info, "id": i, "file_name": file_name})
+        ann = annotations["annotations"][0]
+        new_annotations.append({**ann, "id": i, "image_id": i})
+
+    annotations.update(images=images, annotations=new_annotations)
+    annotations_filepath = dst / "annotations.json"
+    annotations_filepath.write_text(json.dumps(annotations))
+    return annotations_filepath
+
+
+def main(num_images: int = 100_000):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        annotations_filepath = make_coco_dataset(Path(tmpdir), num_images)
+        img_dir = Path(tmpdir) / "images"
+        filepaths = sorted(img_dir.iterdir())
+
+        print("Getting the size of all images:")
+        for name, fn in [
+            ("PIL", lambda: [pil_img_size(o) for o in filepaths]),
+            ("image headers", lambda: [get_img_size(o) for o in filepaths]),
+            ("thread pool", lambda: get_img_sizes(filepaths)),
+        ]:
+            start = time.perf_counter()
+            fn()
+            seconds = time.perf_counter() - start
+            print(f"{name:>14}: {seconds:6.2f} s for {num_images} images")
+
+        print("Parsing:")
+        for name in ["PIL", "image headers", "annotations"]:
+            parser = parsers.COCOBBoxParser(
+                annotations_filepath,
+                img_dir,
+                img_size_from_annotations=name == "annotations",
+            )
+            if name == "PIL":
+                parser.img_size = lambda o: pil_img_size(parser.filepath(o))
+            start = time.perf_counter()
+            parser.parse_dicted(show_pbar=False)
+            seconds = time.perf_counter() - start
+            print(f"{name:>14}: {seconds:6.2f} s for {num_images} images")
+
+
+if __name__ == "__main__":
+    main()
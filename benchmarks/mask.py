@@ -0,0 +1,76 @@
+"""Microbenchmarks for the conversions between the `Mask` types.
+
+Uses a 1024x1024 image with 50 random elliptical instances, plus the masks
+and polygons from `samples/`.
+"""
+import timeit
+from icevision.all import *
+
+
+def groupby_coco_rle(mask_array: MaskArray, h: int, w: int) -> List[dict]:
+    "Previous `MaskArray.to_coco_rle`, used as reference"
+    rles = []
+    for mask in mask_array.data:
+        counts = []
+        flat = itertools.groupby(mask.ravel(order="F"))
+        for i, (value, elements) in enumerate(flat):
+            if i == 0 and value == 1:
+                counts.append(0)
+            counts.append(len(list(elements)))
+        rles.append({"counts": counts, "size": (h, w)})
+    return rles
+
+
+def random_masks(h: int, w: int, num_instances: int) -> MaskArray:
+    rng = np.random.RandomState(42)
+    ys, xs = np.ogrid[:h, :w]
+    masks = []
+    for _ in range(num_instances):
+        cy, cx = rng.randint(0, h), rng.randint(0, w)
+        ry, rx = rng.randint(10, h // 4), rng.randint(10, w // 4)
+        masks.append(((ys - cy) / ry) ** 2 + ((xs - cx) / rx) ** 2 <= 1)
+    return MaskArray(np.stack(masks))
+
+
+def timeit_ms(fn, number: int) -> float:
+    return timeit.timeit(fn, number=number) / number * 1e3
+
+
+def main(h: int = 1024, w: int = 1024, num_instances: int = 50, number: int = 5):
+    masks = random_masks(h, w, num_instances)
+    coco_rles = masks.to_coco_rle(h, w)
+    kaggle_rles = masks.to_kaggle_rle(h, w)
+    rles = [RLE.from_coco(o["counts"]) for o in coco_rles]
+    erles = masks.to_erles(h, w)
+
+    annotations = json.loads(Path("samples/annotations.json").read_text())
+    polygons = [
+        Polygon(o["segmentation"])
+        for o in annotations["annotations"]
+        if not o["iscrowd"]
+    ]
+    voc_mask = VocMaskFile("samples/voc/SegmentationObject/2007_000063.png")
+
+    benchmarks = {
+        "MaskArray.to_coco_rle (groupby)": lambda: groupby_coco_rle(masks, h, w),
+        "MaskArray.to_coco_rle": lambda: masks.to_coco_rle(h, w),
+        "MaskArray.to_kaggle_rle": lambda: masks.to_kaggle_rle(h, w),
+        "MaskArray.to_erles": lambda: masks.to_erles(h, w),
+        "EncodedRLEs.to_mask": lambda: erles.to_mask(h, w),
+        "RLE.from_kaggle": lambda: [RLE.from_kaggle(o) for o in kaggle_rles],
+        "RLE.to_kaggle": lambda: [o.to_kaggle() for o in rles],
+        "RLE.to_erles": lambda: [o.to_erles(h, w) for o in rles],
+        "RLE.to_mask": lambda: [o.to_mask(h, w) for o in rles],
+        "Polygon.to_erles (samples)": lambda: [o.to_erles(427, 640) for o in polygons],
+        "Polygon.to_mask (samples)": lambda: [o.to_mask(427, 640) for o in polygons],
+        "VocMaskFile.to_mask (samples)": lambda: voc_mask.to_mask(375, 500),
+        "VocMaskFile.to_erles (samples)": lambda: voc_mask.to_erles(375, 500),
+    }
+
+    print(f"{num_instances} instances of {h}x{w}")
+    for name, fn in benchmarks.items():
+        print(f"{name:>32}: {timeit_ms(fn, number):10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Time spent converting the images of a batch to BGR CHW tensors as the mmdet batch
+builders do, copying the flipped HWC image before `im2tensor` copies it to CHW, and
+with `_img_tensor`, which flips the channels while copying from HWC to CHW.
+"""
+import time
+
+from icevision.all import *
+from icevision.models.mmdet.common.bbox.dataloaders import _img_tensor
+
+
+def flip_then_convert(record, uint8: bool = False):
+    img = record.img[:, :, ::-1].copy()
+    return img_to_tensor(img, uint8=uint8)
+
+
+def main(size: int = 1024, batch_size: int = 8, num_batches: int = 20):
+    records = []
+    for _ in range(batch_size):
+        record = BaseRecord((ImageRecordComponent(),))
+        record.set_img(np.random.randint(0, 256, (size, size, 3), dtype=np.uint8))
+        records.append(record)
+    # bytes of a full size uint8 image, each conversion copies it once or twice
+    img_bytes = size * size * 3
+
+    for name, convert, num_copies in [
+        ("flip+convert", flip_then_convert, 2),
+        ("fused", _img_tensor, 1),
+    ]:
+        start = time.perf_counter()
+        for _ in range(num_batches):
+            imgs = torch.stack([convert(record, uint8=True) for record in records])
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>12}: {batch_size * num_copies * img_bytes / 2 ** 20:6.1f} MiB "
+            f"copied per batch, {elapsed / num_batches * 1e3:7.2f} ms per batch"
+        )
+
+
+if __name__ == "__main__":
+    main()
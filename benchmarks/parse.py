@@ -0,0 +1,51 @@
+"""Throughput of `Parser.parse` in the main process vs `num_workers` processes,
+and of parsing again with a warm parse cache after a single file changed.
+
+The VOC samples are replicated into a temporary directory so the parser has to
+read a few thousand XML files.
+"""
+import tempfile
+import time
+from icevision.all import *
+
+
+def make_voc_dir(dst: Path, num_copies: int) -> Path:
+    annotations_dir = dst / "Annotations"
+    annotations_dir.mkdir()
+    for xml_file in Path("samples/voc/Annotations").glob("*.xml"):
+        content = xml_file.read_text()
+        for i in range(num_copies):
+            # the record_id comes from the filename inside the annotation
+            unique_content = content.replace(xml_file.stem, f"{xml_file.stem}_{i}")
+            (annotations_dir / f"{xml_file.stem}_{i}.xml").write_text(unique_content)
+    return annotations_dir
+
+
+def main(num_copies: int = 2500, workers: Sequence[int] = (0, 2, 4, 8)):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        annotations_dir = make_voc_dir(Path(tmpdir), num_copies)
+        for num_workers in workers:
+            parser = parsers.VOCBBoxParser(
+                annotations_dir=annotations_dir, images_dir="samples/voc/JPEGImages"
+            )
+            start = time.perf_counter()
+            parser.parse_dicted(show_pbar=False, num_workers=num_workers)
+            seconds = time.perf_counter() - start
+            print(f"num_workers={num_workers}: {len(parser) / seconds:10.0f} files/s")
+
+        cache_filepath = Path(tmpdir) / "cache.db"
+        for name in ["cold cache", "warm cache", "1 file changed"]:
+            if name == "1 file changed":
+                xml_file = next(annotations_dir.glob("*.xml"))
+                xml_file.write_text(xml_file.read_text())
+            parser = parsers.VOCBBoxParser(
+                annotations_dir=annotations_dir, images_dir="samples/voc/JPEGImages"
+            )
+            start = time.perf_counter()
+            parser.parse(show_pbar=False, autofix=False, cache_filepath=cache_filepath)
+            seconds = time.perf_counter() - start
+            print(f"{name:>14}: {len(parser) / seconds:10.0f} files/s")
+
+
+if __name__ == "__main__":
+    main()
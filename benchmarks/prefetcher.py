@@ -0,0 +1,39 @@
+"""Time spent iterating an `infer_dl` while the model runs, moving each batch to the
+device synchronously and with `DevicePrefetcher`, which loads the next batch on a
+background thread.
+
+The model is simulated by waiting `step_ms` (like the host waits for the device to
+finish a batch), so the benchmark shows the overlap on machines without a gpu.
+"""
+import time
+
+from icevision.all import *
+
+
+def iterate(batches: Iterable, device: torch.device, step_ms: float) -> float:
+    start = time.perf_counter()
+    for (imgs,), _ in batches:
+        imgs = imgs.to(device)
+        time.sleep(step_ms / 1e3)
+    return time.perf_counter() - start
+
+
+def main(size: int = 512, batch_size: int = 4, num_batches: int = 20, step_ms=100):
+    parser = parsers.COCOMaskParser(
+        annotations_filepath="samples/annotations.json", img_dir="samples/images"
+    )
+    records = parser.parse(data_splitter=SingleSplitSplitter(), show_pbar=False)[0]
+    records = [records[i % len(records)] for i in range(batch_size * num_batches)]
+    dataset = Dataset(
+        records, tfms.A.Adapter([tfms.A.Resize(size, size), tfms.A.Normalize()])
+    )
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+    dl = models.torchvision.faster_rcnn.infer_dl(dataset, batch_size=batch_size)
+    for name, batches in [("sync", dl), ("prefetcher", DevicePrefetcher(dl, device))]:
+        elapsed = iterate(batches, device=device, step_ms=step_ms)
+        print(f"{name:>10}: {elapsed / num_batches * 1e3:7.2f} ms per batch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Time spent per epoch loading 4000x3000 JPEGs with `aug_tfms(presize=...)`, from
+the original images and from images resized once by `presize_records`.
+"""
+import tempfile
+import time
+from icevision.all import *
+
+
+def make_records(dst: Path, num_images: int) -> List[BaseRecord]:
+    class_map = ClassMap(["a"])
+    sample_filepaths = sorted(Path("samples/images").glob("*.jpg"))
+    records = []
+    for i in range(num_images):
+        img = PIL.Image.open(sample_filepaths[i % len(sample_filepaths)])
+        filepath = dst / f"{i}.jpg"
+        img.convert("RGB").resize((4000, 3000)).save(filepath, quality=90)
+
+        record = BaseRecord(
+            (
+                FilepathRecordComponent(),
+                InstancesLabelsRecordComponent(),
+                BBoxesRecordComponent(),
+            )
+        )
+        record.set_record_id(i)
+        record.set_filepath(filepath)
+        record.set_img_size(ImgSize(width=4000, height=3000))
+        record.detection.set_class_map(class_map)
+        record.detection.add_labels(["a"])
+        record.detection.set_bboxes([BBox.from_xyxy(400, 300, 2000, 1500)])
+        records.append(record)
+    return records
+
+
+def time_epoch(dataset: Dataset) -> float:
+    start = time.perf_counter()
+    for i in range(len(dataset)):
+        dataset[i]
+    return (time.perf_counter() - start) / len(dataset)
+
+
+def main(num_images: int = 20, size: int = 384, presize: int = 512):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        records = make_records(Path(tmpdir), num_images)
+        tfm = tfms.A.Adapter(tfms.A.aug_tfms(size=size, presize=presize))
+
+        start = time.perf_counter()
+        presized_records = presize_records(
+            records, presize, Path(tmpdir) / "presized", show_pbar=False
+        )
+        print(f"presize_records: {time.perf_counter() - start:6.2f} s")
+
+        for name, dataset in [
+            ("original", Dataset(records, tfm=tfm)),
+            ("draft decode", Dataset(records, tfm=tfm, draft_decode=True)),
+            ("presized", Dataset(presized_records, tfm=tfm)),
+        ]:
+            print(f"{name:>15}: {time_epoch(dataset) * 1e3:7.1f} ms/item")
+
+
+if __name__ == "__main__":
+    main()
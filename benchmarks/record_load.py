@@ -0,0 +1,22 @@
+"""Per item overhead of copying a record when it's loaded by `Dataset.__getitem__`.
+
+Compares the previous `deepcopy` based copy with `BaseRecord.clone`.
+"""
+import timeit
+from icevision.all import *
+
+
+def main(number: int = 200):
+    parser = parsers.COCOMaskParser(
+        annotations_filepath="samples/annotations.json", img_dir="samples/images"
+    )
+    records = parser.parse(data_splitter=SingleSplitSplitter(), show_pbar=False)[0]
+
+    for name, fn in [("deepcopy", deepcopy), ("clone", lambda o: o.clone())]:
+        seconds = timeit.timeit(lambda: [fn(o) for o in records], number=number)
+        per_item = seconds / (number * len(records))
+        print(f"{name:>10}: {per_item * 1e6:8.1f} us/item")
+
+
+if __name__ == "__main__":
+    main()
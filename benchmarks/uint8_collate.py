@@ -0,0 +1,42 @@
+"""Size of the image batches sent from the dataloader workers and time spent per
+batch, when the images are normalized by `tfms.A.Normalize` and collated as float32
+and when they're collated as uint8 (`uint8=True`) and normalized with
+`normalize_imgs` (on the device the model runs on, the cpu here).
+"""
+import time
+
+from icevision.all import *
+
+
+def main(size: int = 512, batch_size: int = 8, num_batches: int = 20):
+    parser = parsers.COCOMaskParser(
+        annotations_filepath="samples/annotations.json", img_dir="samples/images"
+    )
+    records = parser.parse(data_splitter=SingleSplitSplitter(), show_pbar=False)[0]
+    records = [records[i % len(records)] for i in range(batch_size * num_batches)]
+
+    resize = [tfms.A.Resize(size, size)]
+    float_ds = Dataset(records, tfms.A.Adapter([*resize, tfms.A.Normalize()]))
+    uint8_ds = Dataset(records, tfms.A.Adapter(resize))
+
+    for name, dataset, uint8 in [
+        ("float32", float_ds, False),
+        ("uint8", uint8_ds, True),
+    ]:
+        dl = models.torchvision.faster_rcnn.infer_dl(
+            dataset, batch_size=batch_size, num_workers=2, uint8=uint8
+        )
+        num_bytes = 0
+        start = time.perf_counter()
+        for (imgs,), _ in dl:
+            num_bytes += imgs.numel() * imgs.element_size()
+            imgs = normalize_imgs(imgs)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>8}: {num_bytes / num_batches / 2 ** 20:6.1f} MiB per batch, "
+            f"{elapsed / num_batches * 1e3:7.2f} ms per batch"
+        )
+
+
+if __name__ == "__main__":
+    main()
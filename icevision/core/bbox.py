@@ -1,4 +1,4 @@
-__all__ = ["BBox"]
+__all__ = ["BBox", "BBoxes"]
 
 from icevision.imports import *
 from icevision.utils import *
@@ -170,3 +170,224 @@ class BBox:
             # just went out of the image dimensions
             raise ValueError(f"invalid RLE or image dimensions: x1={x1} > shape[1]={w}")
         return cls.from_xyxy(x0, y0, x1, y1)
+
+
+class BBoxes:
+    """Batch of bounding boxes, stored as a `(N, 4)` float array in `xyxy` format.
+
+    Vectorized alternative to a list of `BBox`, coordinate conversions, `autofix`,
+    `area` and `iou` are computed for all boxes at once. Indexing with an integer
+    (or iterating) returns `BBox` objects, so it can be used wherever a list of
+    `BBox` was expected.
+
+    Should **not** be instantiated directly (except for creating an empty batch),
+    instead use `from_*` methods. e.g. `from_xyxy`, `from_xywh`, `from_bboxes`.
+    The underlying array is never modified in place, methods that change the boxes
+    replace it instead, so arrays can be safely shared between instances.
+
+    # Examples
+
+    Create from an array in `xywh` format, and get `xyxy` coordinates.
+    ```python
+    bboxes = BBoxes.from_xywh(np.array([[1, 1, 4, 4], [2, 2, 3, 3]]))
+    xyxy = bboxes.xyxy
+    ```
+    """
+
+    def __init__(self, data: Optional[np.ndarray] = None):
+        data = np.zeros((0, 4)) if data is None else data
+        self.data = np.asarray(data, dtype=np.float64).reshape(-1, 4)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        for xyxy in self.data.tolist():
+            yield BBox.from_xyxy(*xyxy)
+
+    def __getitem__(self, i) -> Union[BBox, "BBoxes"]:
+        if isinstance(i, (int, np.integer)):
+            return BBox.from_xyxy(*self.data[i].tolist())
+        return self.__class__(self.data[i])
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} (xyxy): {self.data.tolist()}>"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple)):
+            if not all(isinstance(o, BBox) for o in other):
+                return False
+            other = BBoxes.from_bboxes(other)
+        if isinstance(other, BBoxes):
+            return bool(np.array_equal(self.data, other.data))
+        return False
+
+    @property
+    def xmin(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def ymin(self) -> np.ndarray:
+        return self.data[:, 1]
+
+    @property
+    def xmax(self) -> np.ndarray:
+        return self.data[:, 2]
+
+    @property
+    def ymax(self) -> np.ndarray:
+        return self.data[:, 3]
+
+    @property
+    def width(self) -> np.ndarray:
+        return self.xmax - self.xmin
+
+    @property
+    def height(self) -> np.ndarray:
+        return self.ymax - self.ymin
+
+    @property
+    def area(self) -> np.ndarray:
+        return self.width * self.height
+
+    @property
+    def xyxy(self) -> np.ndarray:
+        return self.data
+
+    @property
+    def yxyx(self) -> np.ndarray:
+        return self.data[:, [1, 0, 3, 2]]
+
+    @property
+    def xywh(self) -> np.ndarray:
+        return np.stack([self.xmin, self.ymin, self.width, self.height], axis=1)
+
+    def relative_xcycwh(self, img_width: int, img_height: int) -> np.ndarray:
+        scale = np.array([img_width, img_height, img_width, img_height])
+        x, y, w, h = (self.xywh / scale).T
+        return np.stack([x + 0.5 * w, y + 0.5 * h, w, h], axis=1)
+
+    def to_tensor(self) -> torch.Tensor:
+        return torch.from_numpy(self.data).float()
+
+    def append(self, bbox: BBox) -> None:
+        self.extend([bbox])
+
+    def extend(self, bboxes: Union["BBoxes", Sequence[BBox]]) -> None:
+        bboxes = BBoxes.from_bboxes(bboxes)
+        if len(bboxes) > 0:
+            self.data = np.concatenate([self.data, bboxes.data])
+
+    def pop(self, i: int) -> BBox:
+        bbox = self[i]
+        self.data = np.delete(self.data, i, axis=0)
+        return bbox
+
+    def clip(self, img_w: int, img_h: int) -> "BBoxes":
+        "Clips coordinates to be inside the image"
+        max_xyxy = np.array([img_w, img_h, img_w, img_h])
+        return self.__class__(np.clip(self.data, 0, max_xyxy))
+
+    def is_valid(self) -> np.ndarray:
+        "Boolean mask of the boxes with positive width and height"
+        return (self.xmin < self.xmax) & (self.ymin < self.ymax)
+
+    def autofix(self, img_w, img_h, record_id: Optional[Any] = None) -> np.ndarray:
+        """Vectorized version of `BBox.autofix`, clips all coordinates that are
+        outside the image.
+
+        # Returns
+        A boolean mask with `False` for the boxes that could not be fixed
+        (e.g. `xmin >= xmax` after clipping).
+        """
+        clipped = self.clip(img_w=img_w, img_h=img_h)
+
+        # log messages are only created for the boxes that needed fixing
+        for i in np.where((clipped.data != self.data).any(axis=1))[0]:
+            bbox, clipped_bbox = self[i], clipped[i]
+            for name, dim in zip(
+                ["xmin", "ymin", "xmax", "ymax"], ["width", "height"] * 2
+            ):
+                before, after = getattr(bbox, name), getattr(clipped_bbox, name)
+                if before != after:
+                    # any coordinate can be clipped to either 0 or the image size
+                    to = after if after == 0 else f"image {dim} {after}"
+                    autofix_log(
+                        "AUTOFIX-SUCCESS",
+                        f"Clipping bbox {name} from {before} to {to} (Before: {bbox})",
+                        record_id=record_id,
+                    )
+
+        self.data = clipped.data
+        success = self.is_valid()
+
+        for i in np.where(~success)[0]:
+            bbox, msg = self[i], []
+            if bbox.xmin >= bbox.xmax:
+                msg += [
+                    f"\tx_min:{bbox.xmin} is greater than or equal to x_max:{bbox.xmax}"
+                ]
+            if bbox.ymin >= bbox.ymax:
+                msg += [
+                    f"\ty_min:{bbox.ymin} is greater than or equal to y_max:{bbox.ymax}"
+                ]
+            msg = "\n".join(msg)
+            autofix_log(
+                "AUTOFIX-FAIL",
+                "{}",
+                f"Cannot auto-fix coordinates: {bbox}\n{msg}",
+                record_id=record_id,
+            )
+
+        return success
+
+    def iou(self, other: "BBoxes") -> np.ndarray:
+        "Pairwise intersection over union, returns a `(len(self), len(other))` array"
+        # computed per coordinate with in place operations, only `(N, M)` arrays
+        # are allocated instead of `(N, M, 2)` ones
+        x1, y1, x2, y2 = self.data.T[:, :, None]
+        other_x1, other_y1, other_x2, other_y2 = other.data.T
+        intersection = np.minimum(x2, other_x2)
+        intersection -= np.maximum(x1, other_x1)
+        np.maximum(intersection, 0, out=intersection)
+        height = np.minimum(y2, other_y2)
+        height -= np.maximum(y1, other_y1)
+        np.maximum(height, 0, out=height)
+        intersection *= height
+
+        union = np.add.outer(self.area, other.area)
+        union -= intersection
+        return np.divide(intersection, union, out=np.zeros_like(union), where=union > 0)
+
+    @classmethod
+    def from_xyxy(cls, xyxy: np.ndarray) -> "BBoxes":
+        return cls(xyxy)
+
+    @classmethod
+    def from_xywh(cls, xywh: np.ndarray) -> "BBoxes":
+        xywh = np.asarray(xywh, dtype=np.float64).reshape(-1, 4)
+        return cls(np.concatenate([xywh[:, :2], xywh[:, :2] + xywh[:, 2:]], axis=1))
+
+    @classmethod
+    def from_yxyx(cls, yxyx: np.ndarray) -> "BBoxes":
+        yxyx = np.asarray(yxyx, dtype=np.float64).reshape(-1, 4)
+        return cls(yxyx[:, [1, 0, 3, 2]])
+
+    @classmethod
+    def from_relative_xcycwh(
+        cls, xcycwh: np.ndarray, img_width: int, img_height: int
+    ) -> "BBoxes":
+        xc, yc, bw, bh = np.asarray(xcycwh, dtype=np.float64).reshape(-1, 4).T
+        pnts = np.stack(
+            [(xc - 0.5 * bw), (yc - 0.5 * bh), (xc + 0.5 * bw), (yc + 0.5 * bh)],
+            axis=1,
+        )
+        scale = np.array([img_width, img_height, img_width, img_height])
+        return cls(np.around(pnts * scale))
+
+    @classmethod
+    def from_bboxes(cls, bboxes: Union["BBoxes", Sequence[BBox]]) -> "BBoxes":
+        if isinstance(bboxes, BBoxes):
+            # new container, the array is never modified in place so it's shared
+            return cls(bboxes.data)
+        return cls([bbox.xyxy for bbox in bboxes])
@@ -13,6 +13,19 @@ class Component:
     def set_composite(self, composite):
         self.composite = composite
 
+    def clone(self) -> "Component":
+        """Returns a shallow copy of the component.
+
+        Containers (lists, dicts and sets) are copied so they can be modified in
+        place without affecting the original, their elements are shared.
+        Subclasses holding other mutable state should extend this method.
+        """
+        component = copy(self)
+        for name, value in vars(component).items():
+            if isinstance(value, (list, dict, set)):
+                setattr(component, name, copy(value))
+        return component
+
 
 class TaskComponent(Component):
     def __init__(self, task=tasks.common):
@@ -45,10 +58,30 @@ class TaskComposite:
 
         raise AttributeError(f"{self.__class__.__name__} has no attribute {name}")
 
+    def __setstate__(self, state):
+        # defined explicitly so unpickling doesn't go through `__getattr__`
+        self.__dict__.update(state)
+
     def add_component(self, component: TaskComponent):
         self.components.add(component)
         self.set_task_components(self.components)
 
+    def clone(self) -> "TaskComposite":
+        """Cheaper alternative to `deepcopy`, each component is responsible for
+        copying the state that can be modified, check `Component.clone`.
+        """
+        composite = copy(self)
+        composite.components = set(component.clone() for component in self.components)
+        composite.set_task_components(composite.components)
+
+        # keep attributes that were manually set on the task composites
+        for task_name, task_composite in self.task_composites.items():
+            new_task_composite = composite.task_composites[task_name]
+            for name, value in vars(task_composite).items():
+                new_task_composite.__dict__.setdefault(name, value)
+
+        return composite
+
     def set_task_components(self, components: Sequence[TaskComponent]):
         task_components = defaultdict(list)
         # example: task_components['detect'] = (LabelsComponent, BBoxesComponent, ...)
@@ -117,6 +150,10 @@ class Composite:
 
         raise AttributeError(f"{self.__class__.__name__} has no attribute {name}")
 
+    def __setstate__(self, state):
+        # defined explicitly so unpickling doesn't go through `__getattr__`
+        self.__dict__.update(state)
+
     def reduce_on_components(
         self, fn_name: str, reduction: Optional[str] = None, **fn_kwargs
     ) -> Any:
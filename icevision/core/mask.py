@@ -86,18 +86,16 @@ class MaskArray(Mask):
         )
 
     def to_coco_rle(self, h, w) -> List[dict]:
-        """From https://stackoverflow.com/a/49547872/6772672"""
+        """Uncompressed COCO RLE of each mask, described [here](https://stackoverflow.com/a/49547872/6772672)"""
         assert self.data.shape[1:] == (h, w)
-        rles = []
-        for mask in self.data:
-            counts = []
-            flat = itertools.groupby(mask.ravel(order="F"))
-            for i, (value, elements) in enumerate(flat):
-                if i == 0 and value == 1:
-                    counts.append(0)
-                counts.append(len(list(elements)))
-            rles.append({"counts": counts, "size": (h, w)})
-        return rles
+        return [
+            {"counts": _coco_counts(mask.ravel(order="F")).tolist(), "size": (h, w)}
+            for mask in self.data
+        ]
+
+    def to_kaggle_rle(self, h, w) -> List[List[int]]:
+        "Kaggle RLE (pairs of 1-indexed start and length of each run of ones) of each mask"
+        return [RLE.from_coco(o["counts"]).to_kaggle() for o in self.to_coco_rle(h, w)]
 
     @property
     def shape(self):
@@ -186,9 +184,28 @@ class RLE(Mask):
     def to_coco(self) -> List[int]:
         return self.counts
 
+    def to_kaggle(self) -> List[int]:
+        "Inverse of `from_kaggle`, runs of zero ones are dropped"
+        counts = np.asarray(self.counts, dtype=np.int64)
+        zeros, ones = counts[::2], counts[1::2]
+        zeros = zeros[: len(ones)]
+        starts = np.cumsum(zeros + ones) - ones + 1
+
+        keep = ones > 0
+        return np.stack([starts[keep], ones[keep]], axis=1).ravel().tolist()
+
     def to_erles(self, h, w) -> EncodedRLEs:
+        counts = list(self.to_coco())
+        # the last run of zeros can be omitted (e.g. kaggle), pycocotools needs it
+        remaining = h * w - sum(counts)
+        if remaining > 0:
+            if len(counts) % 2 == 0:
+                counts.append(remaining)
+            else:
+                counts[-1] += remaining
+
         return EncodedRLEs(
-            mask_utils.frPyObjects([{"counts": self.to_coco(), "size": [h, w]}], h, w)
+            mask_utils.frPyObjects([{"counts": counts, "size": [h, w]}], h, w)
         )
 
     @classmethod
@@ -201,15 +218,14 @@ class RLE(Mask):
         if len(counts) % 2 != 0:
             raise ValueError("Counts must be divisible by 2")
 
-        current = 1
-        coco_counts = []
-        for start, count in zip(counts[::2], counts[1::2]):
-            coco_counts.append(start - current)  # zeros
-            coco_counts.append(count)  # ones
-            current = start + count
+        counts = np.asarray(counts, dtype=np.int64).reshape(-1, 2)
+        starts, ones = counts[:, 0], counts[:, 1]
+        # runs start at one
+        ends = np.concatenate([[1], starts[:-1] + ones[:-1]])
+        coco_counts = np.stack([starts - ends, ones], axis=1).ravel().tolist()
 
         # remove trailing zero
-        if coco_counts[-1] == 0:
+        if coco_counts and coco_counts[-1] == 0:
             coco_counts.pop(-1)
 
         return cls.from_coco(coco_counts)
@@ -231,6 +247,19 @@ class RLE(Mask):
         # return cls.from_kaggle(kaggle_counts)
 
 
+def _coco_counts(flat: np.ndarray) -> np.ndarray:
+    "Lengths of the runs of a flat binary mask, starting with a run of zeros"
+    if len(flat) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    flat = flat != 0
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    counts = np.diff(np.concatenate([[0], changes, [len(flat)]]))
+    if flat[0]:
+        counts = np.concatenate([[0], counts])
+    return counts
+
+
 class Polygon(Mask):
     """Polygon representation of a mask
 
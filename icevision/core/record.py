@@ -60,10 +60,39 @@ class BaseRecord(TaskComposite):
     def aggregate_objects(self):
         return self.reduce_on_components("_aggregate_objects", reduction="update")
 
-    # Instead of copying here, copy outside?
-    def load(self) -> "BaseRecord":
-        record = deepcopy(self)
-        record.reduce_on_components("_load")
+    def load(
+        self,
+        img_cache: Optional[ImageCache] = None,
+        min_img_size: Optional[Callable[[ImgSize], Optional[ImgSize]]] = None,
+    ) -> "BaseRecord":
+        """Returns a copy of the record with the image (and other data stored on disk)
+        loaded.
+
+        # Arguments
+            img_cache: Cache of decoded images, see `ImageCache`.
+            min_img_size: Returns the smallest size needed for an image of a given
+                size (e.g. `Transform.min_img_size`), JPEGs are decoded at a reduced
+                size and the annotations are scaled by the same factor.
+        """
+        record = self.clone()
+        record.reduce_on_components(
+            "_load", img_cache=img_cache, min_img_size=min_img_size
+        )
+        original_size = getattr(record, "draft_original_size", None)
+        if original_size is not None:
+            record.reduce_on_components(
+                "_rescale", original_size=original_size, size=record.img_size
+            )
+        return record
+
+    def rescale(self, size: ImgSize) -> "BaseRecord":
+        """Returns a copy of the record with the image size set to `size` and the
+        annotations (boxes, masks, keypoints and areas) scaled to match, the image
+        itself is not resized.
+        """
+        record = self.clone()
+        record.reduce_on_components("_rescale", original_size=self.img_size, size=size)
+        record.set_img_size(size)
         return record
 
     def unload(self):
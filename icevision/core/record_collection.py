@@ -0,0 +1,319 @@
+__all__ = ["RecordCollection"]
+
+from icevision.imports import *
+from icevision.utils import *
+from icevision.core import tasks
+from icevision.core.bbox import *
+from icevision.core.mask import *
+from icevision.core.class_map import *
+from icevision.core.components import *
+from icevision.core.record_components import *
+from icevision.core.record import *
+
+
+class RecordCollection:
+    """Columnar storage for a sequence of records.
+
+    Instead of keeping one `BaseRecord` object graph per sample, all annotations
+    are stored in contiguous numpy arrays. For each task, `offsets[i]:offsets[i+1]`
+    indexes the annotations of the i-th record inside the flat `label_ids`,
+    `bboxes` (xyxy), `areas` and `iscrowds` columns.
+
+    Indexing a collection with an integer returns a `BaseRecord` view built on
+    demand from the columns, so it can be used as a drop-in replacement for a list
+    of records (e.g. as the records of a `Dataset` or as the input of the
+    `build_*_batch` functions). Indexing with a slice or a sequence of indexes
+    returns a new `RecordCollection`.
+
+    Should **not** be instantiated directly, use `from_records` instead.
+
+    # Examples
+
+    ```python
+    train_records, valid_records = parser.parse()
+    train_records = RecordCollection.from_records(train_records)
+    train_ds = Dataset(train_records, train_tfms)
+    ```
+    """
+
+    def __init__(
+        self,
+        layout: List[Tuple[type, tasks.Task]],
+        record_ids: list,
+        filepaths: Optional[List[str]],
+        sizes: np.ndarray,
+        class_maps: Dict[str, ClassMap],
+        offsets: Dict[str, np.ndarray],
+        columns: Dict[str, Dict[str, Union[np.ndarray, list]]],
+    ):
+        self.layout = layout
+        self.record_ids = record_ids
+        self.filepaths = filepaths
+        self.sizes = sizes
+        self.class_maps = class_maps
+        self.offsets = offsets
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.record_ids)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} with {len(self)} records>"
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.take(range(len(self))[i])
+        if isinstance(i, (int, np.integer)):
+            return self.get_record(int(i))
+        return self.take(i)
+
+    def num_annotations(self, task_name: str = tasks.detection.name) -> np.ndarray:
+        "Number of annotations of each record for the given task"
+        return np.diff(self.offsets[task_name])
+
+    def get_record(self, i: int) -> BaseRecord:
+        """Builds a `BaseRecord` view for the i-th record.
+
+        Only the annotations of the requested record are converted to python
+        objects, the rest of the collection is left untouched.
+        """
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"Index {i} out of range for {self}")
+
+        components = [component_cls(task=task) for component_cls, task in self.layout]
+        record = BaseRecord(components)
+        record.set_record_id(self.record_ids[i])
+
+        width, height = self.sizes[i].tolist()
+        if width >= 0 and height >= 0:
+            record.set_img_size(ImgSize(width=width, height=height))
+
+        for component in components:
+            task_name = component.task.name
+            if isinstance(component, FilepathRecordComponent):
+                component.set_filepath(self.filepaths[i])
+                continue
+            if isinstance(component, ClassMapRecordComponent):
+                component.set_class_map(self.class_maps.get(task_name))
+
+            # only tasks with a labels component have annotations
+            if task_name not in self.offsets:
+                continue
+            start, end = self.offsets[task_name][i : i + 2].tolist()
+            columns = self.columns[task_name]
+
+            if isinstance(component, BaseLabelsRecordComponent):
+                label_ids = columns["label_ids"][start:end].tolist()
+                component.set_labels_by_id(label_ids)
+            elif isinstance(component, BBoxesRecordComponent):
+                component.set_bboxes(BBoxes.from_xyxy(columns["bboxes"][start:end]))
+            elif isinstance(component, AreasRecordComponent):
+                component.set_areas(columns["areas"][start:end].tolist())
+            elif isinstance(component, IsCrowdsRecordComponent):
+                component.set_iscrowds(columns["iscrowds"][start:end].tolist())
+            elif isinstance(component, MasksRecordComponent):
+                component.set_masks(EncodedRLEs(columns["masks"][start:end]))
+            elif isinstance(component, KeyPointsRecordComponent):
+                component.set_keypoints(columns["keypoints"][start:end])
+
+        return record
+
+    def take(self, idxs: Sequence[int]) -> "RecordCollection":
+        "Creates a new collection containing only the records at `idxs`"
+        idxs = np.asarray(idxs, dtype=np.int64).reshape(-1)
+
+        offsets, columns = {}, {}
+        for task_name, task_offsets in self.offsets.items():
+            starts, ends = task_offsets[idxs], task_offsets[idxs + 1]
+            lengths = ends - starts
+            new_offsets = np.zeros(len(idxs) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=new_offsets[1:])
+            # index of every annotation of the selected records, in order
+            ann_idxs = np.repeat(starts - new_offsets[:-1], lengths) + np.arange(
+                new_offsets[-1]
+            )
+
+            offsets[task_name] = new_offsets
+            columns[task_name] = {
+                name: _take_column(column, ann_idxs)
+                for name, column in self.columns[task_name].items()
+            }
+
+        return self.__class__(
+            layout=self.layout,
+            record_ids=[self.record_ids[i] for i in idxs],
+            filepaths=ifnotnone(self.filepaths, lambda o: [o[i] for i in idxs]),
+            sizes=self.sizes[idxs],
+            class_maps=self.class_maps,
+            offsets=offsets,
+            columns=columns,
+        )
+
+    def to_records(self) -> List[BaseRecord]:
+        return list(self)
+
+    @classmethod
+    def from_records(
+        cls, records: Sequence[BaseRecord], show_pbar: bool = False
+    ) -> "RecordCollection":
+        """Packs a sequence of records into a `RecordCollection`.
+
+        All records are expected to have the same components, and records of the
+        same task are expected to share the same `ClassMap`.
+
+        # Arguments
+            records: The records to be packed, e.g. the output of `Parser.parse`.
+            show_pbar: Whether or not to show a progress bar while packing.
+        """
+        if len(records) == 0:
+            raise ValueError("Cannot create a RecordCollection from zero records")
+
+        layout = _record_layout(records[0])
+        has_filepath = any(
+            issubclass(component_cls, FilepathRecordComponent)
+            for component_cls, _ in layout
+        )
+
+        record_ids, filepaths, sizes = [], [], []
+        class_maps = {}
+        lengths = defaultdict(list)
+        columns = defaultdict(lambda: defaultdict(list))
+
+        for record in pbar(records, show=show_pbar):
+            if _record_layout(record) != layout:
+                raise ValueError(
+                    f"(record_id: {record.record_id}) All records in a "
+                    f"RecordCollection need to have the same components"
+                )
+
+            record_ids.append(record.record_id)
+            if has_filepath:
+                filepaths.append(str(record.filepath))
+            img_size = record.img_size
+            sizes.append(tuple(img_size) if img_size is not None else (-1, -1))
+
+            for component in record.components:
+                task_name = component.task.name
+                task_columns = columns[task_name]
+
+                if isinstance(component, ClassMapRecordComponent):
+                    class_maps.setdefault(task_name, component.class_map)
+                    if isinstance(component, BaseLabelsRecordComponent):
+                        task_columns["label_ids"].extend(component.label_ids)
+                        lengths[task_name].append(len(component.label_ids))
+                elif isinstance(component, BBoxesRecordComponent):
+                    task_columns["bboxes"].extend(component.bboxes.xyxy.tolist())
+                elif isinstance(component, AreasRecordComponent):
+                    task_columns["areas"].extend(component.areas)
+                elif isinstance(component, IsCrowdsRecordComponent):
+                    task_columns["iscrowds"].extend(component.iscrowds)
+                elif isinstance(component, MasksRecordComponent):
+                    erles = _masks_to_erles(
+                        component.masks, record.height, record.width
+                    )
+                    task_columns["masks"].extend(erles)
+                elif isinstance(component, KeyPointsRecordComponent):
+                    task_columns["keypoints"].extend(component.keypoints)
+
+        offsets = {}
+        for task_name, task_lengths in lengths.items():
+            offsets[task_name] = np.zeros(len(records) + 1, dtype=np.int64)
+            np.cumsum(task_lengths, out=offsets[task_name][1:])
+
+        packed_columns = {}
+        for task_name, task_columns in columns.items():
+            if not task_columns:
+                continue
+            if task_name not in offsets:
+                raise ValueError(
+                    f"Task '{task_name}' has annotations but no labels component"
+                )
+            num_annotations = offsets[task_name][-1]
+            packed_columns[task_name] = {}
+            for name, values in task_columns.items():
+                if len(values) != num_annotations:
+                    raise ValueError(
+                        f"Number of '{name}' ({len(values)}) is different from the "
+                        f"number of labels ({num_annotations}) for task '{task_name}', "
+                        f"make sure to autofix the records before packing them"
+                    )
+                packed_columns[task_name][name] = _pack_column(name, values)
+
+        return cls(
+            layout=layout,
+            record_ids=record_ids,
+            filepaths=filepaths if has_filepath else None,
+            sizes=np.array(sizes, dtype=np.int32).reshape(-1, 2),
+            class_maps=class_maps,
+            offsets=offsets,
+            columns=packed_columns,
+        )
+
+
+_SUPPORTED_COMPONENTS = (
+    RecordIDRecordComponent,
+    SizeRecordComponent,
+    FilepathRecordComponent,
+    ClassMapRecordComponent,
+    BBoxesRecordComponent,
+    AreasRecordComponent,
+    IsCrowdsRecordComponent,
+    MasksRecordComponent,
+    KeyPointsRecordComponent,
+)
+
+_COLUMN_DTYPES = {
+    "label_ids": np.int64,
+    "bboxes": np.float64,
+    "areas": np.float64,
+    "iscrowds": np.uint8,
+}
+
+
+def _record_layout(record: BaseRecord) -> List[Tuple[type, tasks.Task]]:
+    layout = []
+    for component in record.components:
+        component_cls = component.__class__
+        # base components are automatically created by `BaseRecord`
+        if component_cls in BaseRecord.base_components:
+            continue
+        # components that hold images in memory or need extra init arguments
+        # cannot be represented as columns
+        if (
+            not isinstance(component, _SUPPORTED_COMPONENTS)
+            or component_cls is ImageRecordComponent
+            or isinstance(component, ClassificationLabelsRecordComponent)
+        ):
+            raise ValueError(f"{component_cls.__name__} is not supported")
+        layout.append((component_cls, component.task))
+
+    return sorted(layout, key=lambda o: (o[1].name, o[0].__name__))
+
+
+def _pack_column(name: str, values: list) -> Union[np.ndarray, list]:
+    dtype = _COLUMN_DTYPES.get(name)
+    if dtype is None:
+        return values
+
+    column = np.array(values, dtype=dtype)
+    if name == "bboxes":
+        column = column.reshape(-1, 4)
+    return column
+
+
+def _masks_to_erles(masks, h: int, w: int) -> List[dict]:
+    if isinstance(masks, (EncodedRLEs, MaskArray)):
+        return masks.to_erles(h=h, w=w).erles
+    return [erle for mask in masks for erle in mask.to_erles(h=h, w=w).erles]
+
+
+def _take_column(column: Union[np.ndarray, list], idxs: np.ndarray):
+    if isinstance(column, np.ndarray):
+        return column[idxs]
+    return [column[i] for i in idxs]
@@ -37,7 +37,15 @@ class RecordComponent(TaskComponent):
     def as_dict(self) -> dict:
         return {}
 
-    def _load(self) -> None:
+    def _load(
+        self,
+        img_cache: Optional[ImageCache] = None,
+        min_img_size: Optional[Callable[[ImgSize], Optional[ImgSize]]] = None,
+    ) -> None:
+        return
+
+    def _rescale(self, original_size: ImgSize, size: ImgSize) -> None:
+        "Scales the annotations when the image is loaded at a reduced size"
         return
 
     def _unload(self) -> None:
@@ -155,14 +163,38 @@ class FilepathRecordComponent(ImageRecordComponent):
     def __init__(self, task=tasks.common):
         super().__init__(task=task)
         self.filepath = None
+        # full resolution size of the image when it's decoded at a reduced size
+        self.draft_original_size = None
 
     def set_filepath(self, filepath: Union[str, Path]):
         self.filepath = Path(filepath)
 
-    def _load(self):
-        img = open_img(self.filepath)
+    def _load(
+        self,
+        img_cache: Optional[ImageCache] = None,
+        min_img_size: Optional[Callable[[ImgSize], Optional[ImgSize]]] = None,
+    ):
+        # the size set by the parser is needed to scale the annotations
+        draft_size = None
+        if min_img_size is not None and self.composite.img_size is not None:
+            draft_size = min_img_size(self.composite.img_size)
+
+        if img_cache is not None:
+            img, original_size = img_cache.load_with_size(
+                self.filepath, draft_size=draft_size
+            )
+        else:
+            img, original_size = open_img_with_size(
+                self.filepath, draft_size=draft_size
+            )
         self.set_img(img)
 
+        # the parsed size can differ from the decoded one (e.g. EXIF orientation), the
+        # scale of the draft is only known from the full resolution size of the file
+        self.draft_original_size = None
+        if draft_size is not None and original_size != self.composite.img_size:
+            self.draft_original_size = original_size
+
     def _autofix(self) -> Dict[str, bool]:
         exists = self.filepath.exists()
         if not exists:
@@ -314,31 +346,32 @@ class ClassificationLabelsRecordComponent(BaseLabelsRecordComponent):
 class BBoxesRecordComponent(RecordComponent):
     def __init__(self, task=tasks.detection):
         super().__init__(task=task)
-        self.bboxes: List[BBox] = []
+        self.bboxes = BBoxes()
 
-    def set_bboxes(self, bboxes: Sequence[BBox]):
-        self.bboxes = list(bboxes)
+    def set_bboxes(self, bboxes: Union[BBoxes, Sequence[BBox]]):
+        self.bboxes = BBoxes.from_bboxes(bboxes)
 
-    def add_bboxes(self, bboxes: Sequence[BBox]):
+    def add_bboxes(self, bboxes: Union[BBoxes, Sequence[BBox]]):
         self.bboxes.extend(bboxes)
 
+    def clone(self) -> "BBoxesRecordComponent":
+        component = super().clone()
+        # the array is never modified in place, it's safe to share it
+        component.bboxes = BBoxes(self.bboxes.data)
+        return component
+
     def _autofix(self) -> Dict[str, bool]:
-        success = []
-        for bbox in self.bboxes:
-            try:
-                autofixed = bbox.autofix(
-                    img_w=self.composite.width,
-                    img_h=self.composite.height,
-                    record_id=self.composite.record_id,
-                )
-                success.append(True)
-            except InvalidDataError as e:
-                autofix_log(
-                    "AUTOFIX-FAIL", "{}", str(e), record_id=self.composite.record_id
-                )
-                success.append(False)
-
-        return {"bboxes": success}
+        success = self.bboxes.autofix(
+            img_w=self.composite.width,
+            img_h=self.composite.height,
+            record_id=self.composite.record_id,
+        )
+        return {"bboxes": success.tolist()}
+
+    def _rescale(self, original_size: ImgSize, size: ImgSize) -> None:
+        scale_x = size.width / original_size.width
+        scale_y = size.height / original_size.height
+        self.bboxes = BBoxes(self.bboxes.data * [scale_x, scale_y, scale_x, scale_y])
 
     def _num_annotations(self) -> Dict[str, int]:
         return {"bboxes": len(self.bboxes)}
@@ -347,19 +380,19 @@ class BBoxesRecordComponent(RecordComponent):
         self.bboxes.pop(i)
 
     def _aggregate_objects(self) -> Dict[str, List[dict]]:
-        objects = []
-        for bbox in self.bboxes:
-            x, y, w, h = bbox.xywh
-            objects.append(
-                {
-                    "bbox_x": x,
-                    "bbox_y": y,
-                    "bbox_width": w,
-                    "bbox_height": h,
-                    "bbox_sqrt_area": bbox.area ** 0.5,
-                    "bbox_aspect_ratio": w / h,
-                }
-            )
+        x, y, w, h = self.bboxes.xywh.T.tolist()
+        sqrt_areas = np.sqrt(self.bboxes.area).tolist()
+        objects = [
+            {
+                "bbox_x": x,
+                "bbox_y": y,
+                "bbox_width": w,
+                "bbox_height": h,
+                "bbox_sqrt_area": sqrt_area,
+                "bbox_aspect_ratio": w / h,
+            }
+            for x, y, w, h, sqrt_area in zip(x, y, w, h, sqrt_areas)
+        ]
 
         return {"bboxes": objects}
 
@@ -384,6 +417,12 @@ class MasksRecordComponent(RecordComponent):
     def set_masks(self, masks: Sequence[Mask]):
         self.masks = masks
 
+    def clone(self) -> "MasksRecordComponent":
+        component = super().clone()
+        if isinstance(self.masks, EncodedRLEs):
+            component.masks = EncodedRLEs(list(self.masks.erles))
+        return component
+
     def add_masks(self, masks: Sequence[Mask]):
         self.masks.extend(self._masks_to_erle(masks))
 
@@ -394,14 +433,47 @@ class MasksRecordComponent(RecordComponent):
         width, height = self.composite.img_size
         return [mask.to_erles(h=height, w=width) for mask in masks]
 
-    def _load(self):
-        self.masks = MaskArray.from_masks(
-            self.masks, self.composite.height, self.composite.width
-        )
+    def mask_array(self) -> MaskArray:
+        """Decodes the masks to a `MaskArray`.
+
+        Masks are kept compressed when the record is loaded, this should only be
+        called when the pixels are needed (e.g. by a transform or when building
+        a batch).
+        """
+        if isinstance(self.masks, MaskArray):
+            return self.masks
+
+        height, width = self.composite.height, self.composite.width
+        if len(self.masks) == 0:
+            return MaskArray(np.zeros((0, height, width), dtype=np.uint8))
+        return MaskArray.from_masks(self.masks, height, width)
+
+    def _rescale(self, original_size: ImgSize, size: ImgSize) -> None:
+        if len(self.masks) == 0:
+            return
+        mask_array = self.masks
+        if not isinstance(mask_array, MaskArray):
+            mask_array = MaskArray.from_masks(
+                self.masks, original_size.height, original_size.width
+            )
+        masks = [
+            cv2.resize(mask, tuple(size), interpolation=cv2.INTER_NEAREST)
+            for mask in mask_array.data
+        ]
+        mask_array = MaskArray(np.array(masks))
+        # masks stay compressed if they were
+        if isinstance(self.masks, MaskArray):
+            self.masks = mask_array
+        else:
+            self.masks = mask_array.to_erles(size.height, size.width)
 
     def _unload(self):
-        # TODO: SLOW: Maybe cause slowdowns?
-        self.masks = self.masks.to_erles(self.composite.height, self.composite.width)
+        # masks are only decoded by transforms, compress them again to not carry
+        # the dense arrays around after the batch is created
+        if isinstance(self.masks, MaskArray):
+            self.masks = self.masks.to_erles(
+                self.composite.height, self.composite.width
+            )
 
     def _num_annotations(self) -> Dict[str, int]:
         return {"masks": len(self.masks)}
@@ -430,6 +502,11 @@ class AreasRecordComponent(RecordComponent):
     def setup_transform(self, tfm) -> None:
         tfm.setup_areas(self)
 
+    def _rescale(self, original_size: ImgSize, size: ImgSize) -> None:
+        scale_x = size.width / original_size.width
+        scale_y = size.height / original_size.height
+        self.areas = [area * scale_x * scale_y for area in self.areas]
+
     def _num_annotations(self) -> Dict[str, int]:
         return {"areas": len(self.areas)}
 
@@ -487,6 +564,16 @@ class KeyPointsRecordComponent(RecordComponent):
     def setup_transform(self, tfm) -> None:
         tfm.setup_keypoints(self)
 
+    def _rescale(self, original_size: ImgSize, size: ImgSize) -> None:
+        scale_x = size.width / original_size.width
+        scale_y = size.height / original_size.height
+        self.keypoints = [
+            KeyPoints(
+                o.keypoints * np.tile([scale_x, scale_y, 1], len(o.xy)), o.metadata
+            )
+            for o in self.keypoints
+        ]
+
     def as_dict(self) -> dict:
         return {"keypoints": self.keypoints}
 
@@ -1,4 +1,8 @@
 from icevision.data.data_splitter import *
 from icevision.data.dataset import *
 from icevision.data.prediction import *
+from icevision.data.prediction_sinks import *
+from icevision.data.presize import *
+from icevision.data.samplers import *
+from icevision.data.prefetcher import *
 from icevision.data.convert_records_to_coco_style import *
@@ -61,7 +61,7 @@ def create_coco_eval(
 
     coco_eval = COCOeval(target_ds, pred_ds, metric_type)
     if iou_thresholds is not None:
-        coco_eval.iouThrs = iou_thresholds
+        coco_eval.params.iouThrs = np.array(iou_thresholds)
 
     return coco_eval
 
@@ -88,15 +88,14 @@ def convert_record_to_coco_annotations(record):
         annotations_dict["image_id"].append(record.record_id)
         annotations_dict["category_id"].append(label)
 
-    for bbox in record.detection.bboxes:
-        annotations_dict["bbox"].append(list(bbox.xywh))
+    bboxes = BBoxes.from_bboxes(record.detection.bboxes)
+    annotations_dict["bbox"].extend(bboxes.xywh.tolist())
 
     if hasattr(record.detection, "areas"):
         for area in record.detection.areas:
             annotations_dict["area"].append(area)
     else:
-        for bbox in record.detection.bboxes:
-            annotations_dict["area"].append(bbox.area)
+        annotations_dict["area"].extend(bboxes.area.tolist())
 
     # HACK: Because of prepare_record, mask should always be `MaskArray`,
     # maybe the for loop is not required?
@@ -1,6 +1,7 @@
 __all__ = ["Dataset"]
 
 from icevision.imports import *
+from icevision.utils import *
 from icevision.core import *
 from icevision.tfms import *
 
@@ -16,15 +17,25 @@ class Dataset:
     # Arguments
         records: A list of records.
         tfm: Transforms to be applied to each item.
+        img_cache: Optional `ImageCache`, images are decoded only the first time they
+            are loaded. Can be shared by multiple datasets.
+        draft_decode: If `True`, JPEGs are decoded at the smallest scale (1/2, 1/4 or
+            1/8) that is still larger than the size the first resize of `tfm`
+            shrinks them to (see `Transform.min_img_size`), the annotations are
+            scaled to match.
     """
 
     def __init__(
         self,
         records: List[dict],
         tfm: Optional[Transform] = None,
+        img_cache: Optional[ImageCache] = None,
+        draft_decode: bool = False,
     ):
         self.records = records
         self.tfm = tfm
+        self.img_cache = img_cache
+        self.draft_decode = draft_decode
         # if self.tfm is not None:
         #     self.tfm.setup(records[0].components_cls)
 
@@ -32,7 +43,12 @@ class Dataset:
         return len(self.records)
 
     def __getitem__(self, i):
-        record = self.records[i].load()
+        min_img_size = None
+        if self.draft_decode and self.tfm is not None:
+            min_img_size = self.tfm.min_img_size
+        record = self.records[i].load(
+            img_cache=self.img_cache, min_img_size=min_img_size
+        )
         if self.tfm is not None:
             record = self.tfm(record)
         else:
@@ -0,0 +1,240 @@
+__all__ = ["PredictionSink", "JSONLSink", "COCOResultsSink", "NpzSink"]
+
+from icevision.imports import *
+from icevision.core import *
+from icevision.data.prediction import Prediction
+
+
+class PredictionSink(ABC):
+    """Writes predictions to disk one batch at a time, so `predict_from_dl(...,
+    sink=sink)` does not need to keep the predictions of the whole dataset in memory.
+
+    The number of batches completely written is saved to `<path>.progress` after
+    every batch. If the process stops, creating the sink again with `resume=True`
+    discards the partially written batch and `predict_from_dl` continues from the
+    next one, the dataloader must yield the batches in the same order.
+
+    # Arguments
+        path: Output file (or directory for `NpzSink`).
+        resume: If `True`, continues from the saved progress instead of overwriting
+            the output. Starts from scratch if there is no saved progress.
+    """
+
+    def __init__(self, path: Union[str, Path], resume: bool = False):
+        self.path = Path(path)
+        self.progress_path = self.path.with_name(self.path.name + ".progress")
+        self.num_batches = 0
+
+        progress = self._load_progress() if resume else None
+        if progress is None:
+            self._start()
+        else:
+            self.num_batches = progress["num_batches"]
+            self._resume(progress)
+
+    def write(self, preds: Sequence[Prediction]) -> None:
+        "Writes a batch of predictions and saves the progress"
+        self._write(preds)
+        self.num_batches += 1
+        self._save_progress()
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @abstractmethod
+    def _start(self) -> None:
+        "Creates the output, overwriting previous results"
+
+    @abstractmethod
+    def _resume(self, progress: dict) -> None:
+        "Removes what was written after the last saved progress"
+
+    @abstractmethod
+    def _write(self, preds: Sequence[Prediction]) -> None:
+        "Writes a batch, the data must be on disk when it returns"
+
+    def _progress(self) -> dict:
+        "Extra state saved with the number of batches"
+        return {}
+
+    def _load_progress(self) -> Optional[dict]:
+        if not self.progress_path.exists():
+            return None
+        return json.loads(self.progress_path.read_text())
+
+    def _save_progress(self) -> None:
+        progress = {"num_batches": self.num_batches, **self._progress()}
+        # replacing the file is atomic, progress is never partially written
+        tmp_path = self.progress_path.with_name(self.progress_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(progress))
+        os.replace(tmp_path, self.progress_path)
+
+
+class _FileSink(PredictionSink):
+    "Sink that appends to a single file, resumes by truncating to the saved offset"
+
+    header: bytes = b""
+    footer: bytes = b""
+
+    def _start(self) -> None:
+        self._file = open(self.path, "wb")
+        self._file.write(self.header)
+        self._offset = self._file.tell()
+
+    def _resume(self, progress: dict) -> None:
+        self._offset = progress["offset"]
+        self._file = open(self.path, "r+b")
+        self._file.truncate(self._offset)
+        self._file.seek(self._offset)
+
+    def _write(self, preds: Sequence[Prediction]) -> None:
+        data = self._encode(preds)
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._offset += len(data)
+
+    def _progress(self) -> dict:
+        return {"offset": self._offset}
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.write(self.footer)
+            self._file.close()
+
+    @abstractmethod
+    def _encode(self, preds: Sequence[Prediction]) -> bytes:
+        pass
+
+
+class JSONLSink(_FileSink):
+    """Writes one JSON line per image with `record_id`, `label_ids`, `scores`,
+    `bboxes` (xyxy) and, if predicted, `keypoints` (x, y, visible) and `masks`
+    (COCO RLEs).
+    """
+
+    def _encode(self, preds: Sequence[Prediction]) -> bytes:
+        lines = []
+        for pred in preds:
+            line = {"record_id": _to_builtin(pred.record_id)}
+            line.update(_prediction_columns(pred))
+            lines.append(json.dumps(line) + "\n")
+        return "".join(lines).encode()
+
+
+class COCOResultsSink(_FileSink):
+    """Writes the predictions in the [COCO results format](https://cocodataset.org/#format-results),
+    a json list with one object per detection that can be loaded with `COCO.loadRes`.
+    The list is closed by `close`.
+    """
+
+    header = b"["
+    footer = b"]"
+
+    def _encode(self, preds: Sequence[Prediction]) -> bytes:
+        results = []
+        for pred in preds:
+            image_id = _to_builtin(pred.record_id)
+            columns = _prediction_columns(pred)
+            for i, label_id in enumerate(columns["label_ids"]):
+                x1, y1, x2, y2 = columns["bboxes"][i]
+                result = {
+                    "image_id": image_id,
+                    "category_id": label_id,
+                    "bbox": [x1, y1, x2 - x1, y2 - y1],
+                    "score": columns["scores"][i],
+                }
+                if "keypoints" in columns:
+                    result["keypoints"] = list(
+                        itertools.chain(*columns["keypoints"][i])
+                    )
+                if "masks" in columns:
+                    result["segmentation"] = columns["masks"][i]
+                results.append(json.dumps(result))
+
+        if not results:
+            return b""
+        # separator from the previous batch, the header is the only thing before the
+        # first result
+        separator = "" if self._offset == len(self.header) else ","
+        return (separator + ",".join(results)).encode()
+
+
+class NpzSink(PredictionSink):
+    """Writes one `batch_{i:06d}.npz` file per batch inside the `path` directory.
+
+    Each file has the arrays `record_ids` and `num_detections` (one value per image)
+    and `label_ids`, `scores`, `bboxes` (xyxy) and, if predicted, `keypoints` with
+    the detections of all images concatenated. Masks are not stored.
+    """
+
+    def _start(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._remove_batches(start=0)
+
+    def _resume(self, progress: dict) -> None:
+        self._remove_batches(start=self.num_batches)
+
+    def _write(self, preds: Sequence[Prediction]) -> None:
+        columns = [_prediction_columns(pred, masks=False) for pred in preds]
+
+        def _concat(key: str, dtype) -> np.ndarray:
+            return np.array([v for o in columns for v in o[key]], dtype=dtype)
+
+        arrays = {
+            "record_ids": np.array([pred.record_id for pred in preds]),
+            "num_detections": np.array([len(o["label_ids"]) for o in columns]),
+            "label_ids": _concat("label_ids", np.int64),
+            "scores": _concat("scores", np.float64),
+            "bboxes": _concat("bboxes", np.float64).reshape(-1, 4),
+        }
+        if columns and "keypoints" in columns[0]:
+            arrays["keypoints"] = _concat("keypoints", np.float64)
+
+        filepath = self._batch_filepath(self.num_batches)
+        tmp_filepath = filepath.with_name(filepath.stem + ".tmp.npz")
+        np.savez(tmp_filepath, **arrays)
+        os.replace(tmp_filepath, filepath)
+
+    def _batch_filepath(self, i: int) -> Path:
+        return self.path / f"batch_{i:06d}.npz"
+
+    def _remove_batches(self, start: int) -> None:
+        for filepath in self.path.glob("batch_*.npz"):
+            i = filepath.name[len("batch_") :].split(".")[0]
+            if not i.isdigit() or int(i) >= start:
+                filepath.unlink()
+
+
+def _prediction_columns(pred: Prediction, masks: bool = True) -> dict:
+    "Detections of `pred` as json serializable lists"
+    detection = pred.detection
+    columns = {
+        "label_ids": [int(o) for o in detection.label_ids],
+        "scores": np.asarray(detection.scores, dtype=float).tolist(),
+        "bboxes": BBoxes.from_bboxes(detection.bboxes).xyxy.tolist(),
+    }
+    if hasattr(detection, "keypoints"):
+        columns["keypoints"] = [
+            o.keypoints.reshape(-1, 3).tolist() for o in detection.keypoints
+        ]
+    if masks and hasattr(detection, "masks"):
+        erles = detection.masks.to_erles(pred.height, pred.width).erles
+        columns["masks"] = [
+            {"size": o["size"], "counts": _to_builtin(o["counts"])} for o in erles
+        ]
+    return columns
+
+
+def _to_builtin(o):
+    if isinstance(o, bytes):
+        return o.decode("ascii")
+    if isinstance(o, np.generic):
+        return o.item()
+    return o
@@ -0,0 +1,120 @@
+__all__ = ["DevicePrefetcher"]
+
+import queue
+import threading
+from icevision.imports import *
+from icevision.core import *
+
+_END = object()
+
+
+class DevicePrefetcher:
+    """Iterates a dataloader created by the `*_dl` functions of the models, loading
+    the next batches and moving them to `device` on a background thread while the
+    current batch is used.
+
+    All the tensors of a batch are moved, whatever the batch structure of the model
+    family (lists of dicts for torchvision, dicts for efficientdet and mmdet). On
+    cuda devices tensors are pinned (unless the dataloader already pins them) and
+    copied with `non_blocking=True` on a separate stream, so the copy overlaps with
+    the computations of the current batch.
+
+    # Arguments
+        dl: Dataloader yielding `(batch, records)` tuples.
+        device: Device the batches are moved to.
+        num_batches: Maximum number of batches loaded ahead.
+    """
+
+    def __init__(self, dl: Iterable, device: torch.device, num_batches: int = 2):
+        self.dl = dl
+        self.device = torch.device(device)
+        self.num_batches = num_batches
+
+    def __len__(self) -> int:
+        return len(self.dl)
+
+    def __iter__(self) -> Iterator[Tuple[Any, List[BaseRecord]]]:
+        is_cuda = self.device.type == "cuda"
+        compute_stream = torch.cuda.current_stream(self.device) if is_cuda else None
+        batches = queue.Queue(maxsize=self.num_batches)
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=self._load_batches,
+            args=(batches, stop, compute_stream),
+            daemon=True,
+        )
+        thread.start()
+
+        try:
+            while True:
+                item = batches.get()
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                batch, records, copied = item
+                if copied is not None:
+                    compute_stream.wait_event(copied)
+                yield batch, records
+        finally:
+            stop.set()
+            # unblocks the thread if it's waiting for space in the queue
+            while thread.is_alive():
+                try:
+                    batches.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            thread.join()
+
+    def _load_batches(
+        self,
+        batches: queue.Queue,
+        stop: threading.Event,
+        compute_stream: Optional["torch.cuda.Stream"],
+    ) -> None:
+        copy_stream = None
+        if compute_stream is not None:
+            copy_stream = torch.cuda.Stream(self.device)
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            for batch, records in self.dl:
+                copied = None
+                if copy_stream is None:
+                    batch = _to_device(batch, self.device)
+                else:
+                    with torch.cuda.stream(copy_stream):
+                        batch = _to_device(batch, self.device, compute_stream)
+                    copied = copy_stream.record_event()
+                if not put((batch, records, copied)):
+                    return
+        except Exception as e:
+            put(e)
+            return
+        put(_END)
+
+
+def _to_device(o, device: torch.device, compute_stream=None):
+    if isinstance(o, torch.Tensor):
+        if compute_stream is None:
+            return o.to(device)
+        if o.device.type == "cpu" and not o.is_pinned():
+            o = o.pin_memory()
+        o = o.to(device, non_blocking=True)
+        # the memory was allocated on the copy stream but it's used on the compute
+        # stream, it must not be reused before the compute stream is done with it
+        o.record_stream(compute_stream)
+        return o
+    if isinstance(o, dict):
+        return {k: _to_device(v, device, compute_stream) for k, v in o.items()}
+    if isinstance(o, (list, tuple)):
+        return type(o)(_to_device(v, device, compute_stream) for v in o)
+    return o
@@ -0,0 +1,143 @@
+__all__ = ["presize_records", "load_original_img_sizes"]
+
+import multiprocessing
+from icevision.imports import *
+from icevision.utils import *
+from icevision.core import *
+
+_INDEX_FILENAME = "presize.json"
+
+
+def presize_records(
+    records: Sequence[BaseRecord],
+    presize: Union[int, Tuple[int, int]],
+    dst_dir: Union[str, Path],
+    num_workers: int = 0,
+    quality: int = 95,
+    show_pbar: bool = True,
+) -> List[BaseRecord]:
+    """Resizes the images of `records` once and saves them to `dst_dir`, so training
+    reads small images instead of decoding the full resolution originals every epoch.
+
+    Images are resized like `aug_tfms(presize=presize)` does: if an `int` is given
+    the smallest side is resized to `presize` keeping the aspect ratio (images are
+    never upscaled), if a `tuple` is given the images are resized to (height, width).
+    JPEGs are decoded at a reduced scale when possible (see `open_img`).
+    Images that were already saved to `dst_dir` are not resized again, unless they
+    were saved with a different `presize` or from a different source image.
+
+    The original sizes are stored in `dst_dir`, use `load_original_img_sizes` and
+    `BaseRecord.rescale` to map predictions back to the original images.
+
+    # Arguments
+        records: Records with a `FilepathRecordComponent` and the image size set.
+        presize: Size the images are resized to.
+        dst_dir: Directory where the resized images are saved.
+        num_workers: Number of processes used to resize the images, `0` resizes them
+            in the main process.
+        quality: Quality of the saved JPEGs, other formats are saved losslessly.
+        show_pbar: Whether or not to show a progress bar.
+
+    # Returns
+        Copies of the records pointing to the resized images, with the image size
+        and the annotations scaled to match.
+    """
+    dst_dir = Path(dst_dir)
+    dst_dir.mkdir(parents=True, exist_ok=True)
+    index_filepath = dst_dir / _INDEX_FILENAME
+    saved_index = _load_saved_index(index_filepath, presize)
+
+    presized_records, jobs, index = [], [], []
+    for record in records:
+        size = _presize_img_size(record.img_size, presize)
+        filepath = dst_dir / f"{record.record_id}{record.filepath.suffix.lower()}"
+        entry = {
+            "record_id": record.record_id,
+            "filepath": str(record.filepath),
+            "width": record.width,
+            "height": record.height,
+        }
+        if saved_index.get(record.record_id) != entry and filepath.exists():
+            # saved by a previous call with a different presize or source image
+            filepath.unlink()
+        if not filepath.exists():
+            # images that are already small enough are copied without re-encoding
+            job_size = size if size != record.img_size else None
+            jobs.append((record.filepath, filepath, job_size, quality))
+
+        if size != record.img_size:
+            presized_record = record.rescale(size)
+        else:
+            presized_record = record.clone()
+        presized_record.set_filepath(filepath)
+        presized_records.append(presized_record)
+        index.append(entry)
+
+    # written before resizing (stale images are already removed) so the images
+    # saved by an interrupted call are reused
+    index_filepath.write_text(json.dumps({"presize": presize, "records": index}))
+
+    if num_workers == 0:
+        for job in pbar(jobs, show_pbar):
+            _presize_img(job)
+    else:
+        with multiprocessing.Pool(num_workers) as pool:
+            results = pool.imap_unordered(_presize_img, jobs, chunksize=4)
+            for _ in pbar(results, show_pbar, len(jobs)):
+                pass
+
+    return presized_records
+
+
+def load_original_img_sizes(dst_dir: Union[str, Path]) -> Dict[Hashable, ImgSize]:
+    "Sizes of the original images, by record id, of records presized to `dst_dir`"
+    index = json.loads((Path(dst_dir) / _INDEX_FILENAME).read_text())
+    return {
+        o["record_id"]: ImgSize(width=o["width"], height=o["height"])
+        for o in index["records"]
+    }
+
+
+def _load_saved_index(
+    index_filepath: Path, presize: Union[int, Tuple[int, int]]
+) -> Dict[Hashable, dict]:
+    "Index entries by record id of a previous call with the same `presize`"
+    if not index_filepath.exists():
+        return {}
+    index = json.loads(index_filepath.read_text())
+    # tuples are saved as lists
+    if index["presize"] != json.loads(json.dumps(presize)):
+        return {}
+    return {o["record_id"]: o for o in index["records"]}
+
+
+def _presize_img_size(
+    img_size: ImgSize, presize: Union[int, Tuple[int, int]]
+) -> ImgSize:
+    if not isinstance(presize, int):
+        height, width = presize
+        return ImgSize(width=width, height=height)
+
+    width, height = img_size
+    scale = presize / min(width, height)
+    if scale >= 1:
+        return img_size
+    # same rounding as albumentations `SmallestMaxSize`
+    return ImgSize(width=round(width * scale), height=round(height * scale))
+
+
+def _presize_img(job: Tuple[Path, Path, Optional[ImgSize], int]) -> None:
+    src, dst, size, quality = job
+    # written with a temporary name so interrupted runs don't leave partial images
+    tmp_dst = dst.with_name(f".{dst.name}")
+    if size is None:
+        shutil.copyfile(src, tmp_dst)
+    else:
+        img = np.asarray(open_img(src, draft_size=size))
+        height, width = img.shape[:2]
+        shrink = size.width <= width and size.height <= height
+        interpolation = cv2.INTER_AREA if shrink else cv2.INTER_LINEAR
+        img = cv2.resize(img, tuple(size), interpolation=interpolation)
+        img_format = PIL.Image.registered_extensions()[dst.suffix]
+        PIL.Image.fromarray(img).save(tmp_dst, format=img_format, quality=quality)
+    os.replace(tmp_dst, dst)
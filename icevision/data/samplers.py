@@ -0,0 +1,100 @@
+__all__ = ["AspectRatioBatchSampler"]
+
+from icevision.imports import *
+from icevision.core import *
+from torch.utils.data import Sampler
+
+
+class AspectRatioBatchSampler(Sampler):
+    """Batch sampler that only puts images with a similar aspect ratio and size in the
+    same batch, so less padding is needed when the images are stacked (by
+    `ImgPadStack` or by the torchvision models).
+
+    Records are grouped into aspect ratio buckets using the `img_size` of each record,
+    images are not loaded. When shuffling, the records of each bucket are shuffled
+    and split in windows of `sort_window` batches, each window is sorted by image area
+    before being cut in batches, and the order of all batches is shuffled. Shuffling
+    is deterministic, it only depends on `seed` and on the epoch, which is
+    incremented every time the sampler is iterated (or set with `set_epoch`).
+
+    Use it with the dataloaders of any model, instead of `batch_size` and `shuffle`:
+    `model_type.train_dl(train_ds, batch_sampler=AspectRatioBatchSampler(train_ds, 8))`
+
+    # Arguments
+        records: The `Dataset` (or list of records) the batches are sampled from.
+        batch_size: Maximum number of images in a batch.
+        shuffle: If `False`, batches are yielded bucket after bucket, sorted by area.
+        drop_last: Drop the last batch of each bucket if it's incomplete.
+        aspect_ratio_boundaries: Width / height values that separate the buckets,
+            by default seven boundaries from 1/2 to 2.
+        sort_window: Number of batches sorted by area together.
+        seed: Seed used for shuffling.
+    """
+
+    def __init__(
+        self,
+        records: Union[Sequence[BaseRecord], "Dataset"],
+        batch_size: int,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        aspect_ratio_boundaries: Optional[Sequence[float]] = None,
+        sort_window: int = 50,
+        seed: int = 0,
+    ):
+        records = getattr(records, "records", records)
+        if aspect_ratio_boundaries is None:
+            aspect_ratio_boundaries = 2 ** np.linspace(-1, 1, 7)
+
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.sort_window = sort_window
+        self.seed = seed
+        self.epoch = 0
+
+        sizes = np.array([record.img_size for record in records], dtype=float)
+        sizes = sizes.reshape(-1, 2)
+        self.areas = sizes[:, 0] * sizes[:, 1]
+        self.bucket_ids = np.digitize(
+            sizes[:, 0] / sizes[:, 1], aspect_ratio_boundaries
+        )
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def __len__(self) -> int:
+        bucket_sizes = np.bincount(self.bucket_ids)
+        if self.drop_last:
+            return int((bucket_sizes // self.batch_size).sum())
+        return int(np.ceil(bucket_sizes / self.batch_size).sum())
+
+    def __iter__(self) -> Iterator[List[int]]:
+        rng = np.random.default_rng([self.seed, self.epoch])
+        self.epoch += 1
+
+        batches = []
+        for bucket_id in np.unique(self.bucket_ids):
+            idxs = np.flatnonzero(self.bucket_ids == bucket_id)
+            if self.shuffle:
+                idxs = rng.permutation(idxs)
+                window = self.sort_window * self.batch_size
+                windows = [idxs[i : i + window] for i in range(0, len(idxs), window)]
+            else:
+                windows = [idxs]
+
+            for idxs in windows:
+                idxs = idxs[np.argsort(self.areas[idxs], kind="stable")]
+                batches.extend(self._split_batches(idxs))
+
+        if self.shuffle:
+            batches = [batches[i] for i in rng.permutation(len(batches))]
+        yield from batches
+
+    def _split_batches(self, idxs: np.ndarray) -> List[List[int]]:
+        batches = [
+            idxs[i : i + self.batch_size].tolist()
+            for i in range(0, len(idxs), self.batch_size)
+        ]
+        if self.drop_last and batches and len(batches[-1]) < self.batch_size:
+            batches.pop()
+        return batches
@@ -13,6 +13,31 @@ def convert_dataloader_to_fastai(dataloader: DataLoader):
         def create_batch(self, b):
             return (dataloader.collate_fn, raise_error_convert)[self.prebatched](b)
 
+    if dataloader.batch_size is None:
+        # custom batch sampler (e.g. `AspectRatioBatchSampler`), fastai gets one
+        # list of indexes per batch
+        batch_sampler = dataloader.batch_sampler
+
+        class FastaiDataLoaderWithBatchSampler(FastaiDataLoaderWithCollate):
+            def __init__(self, *args, **kwargs):
+                kwargs.update(bs=None, n=len(batch_sampler), drop_last=False)
+                super().__init__(*args, **kwargs)
+
+            def get_idxs(self):
+                return list(batch_sampler)
+
+            def create_item(self, s):
+                return [self.dataset[i] for i in s]
+
+            def create_batch(self, b):
+                return dataloader.collate_fn(b)
+
+        return FastaiDataLoaderWithBatchSampler(
+            dataset=dataloader.dataset,
+            num_workers=dataloader.num_workers,
+            pin_memory=dataloader.pin_memory,
+        )
+
     # use the type of sampler to determine if shuffle is true or false
     if isinstance(dataloader.sampler, SequentialSampler):
         shuffle = False
@@ -19,7 +19,7 @@ class FastaiMetricAdapter(fastai.Metric):
     def value(self) -> Dict[str, float]:
         # return self.metric.finalize()
         # HACK: Return single item from dict
-        logs = self.metric.finalize()
+        logs = self.metric.finalize_distributed()
         return next(iter(logs.values()))
 
     @property
@@ -16,6 +16,6 @@ class LightningModelAdapter(pl.LightningModule, ABC):
 
     def finalize_metrics(self) -> None:
         for metric in self.metrics:
-            metric_logs = metric.finalize()
+            metric_logs = metric.finalize_distributed()
             for k, v in metric_logs.items():
                 self.log(f"{metric.name}/{k}", v)
@@ -1 +1,2 @@
 from icevision.metrics.coco_metric.coco_metric import *
+from icevision.metrics.coco_metric.coco_evaluator import *
@@ -0,0 +1,582 @@
+__all__ = ["COCOEvaluator"]
+
+from icevision.imports import *
+from icevision.utils import *
+from icevision.core import *
+from icevision.data.convert_records_to_coco_style import create_coco_api
+from pycocotools import mask as mask_utils
+from pycocotools.cocoeval import COCOeval
+
+# sigmas of the 17 COCO person keypoints, from cocoapi
+_COCO_KPT_SIGMAS = (
+    np.array(
+        [0.26, 0.25, 0.25, 0.35, 0.35, 0.79, 0.79, 0.72, 0.72]
+        + [0.62, 0.62, 1.07, 1.07, 0.87, 0.87, 0.89, 0.89]
+    )
+    / 10.0
+)
+
+
+class COCOEvaluator:
+    """NumPy implementation of the [cocoapi](https://github.com/cocodataset/cocoapi)
+    evaluator (`COCOeval`) that works directly on records.
+
+    Follows the same steps (`evaluate`, `accumulate` and `summarize`) and produces the
+    same `stats`, but skips the conversion of records to COCO dicts and matches the
+    detections of all images, categories, area ranges and IoU thresholds at once
+    instead of one detection at a time.
+
+    Records can also be added in batches with `update`, only compact arrays with the
+    annotations needed for the evaluation are kept (masks as RLEs), so memory grows
+    with the number of annotations and not with the size of the records.
+
+    # Arguments
+        records: Ground truth records.
+        preds: Predictions, `preds[i]` are the predictions for `records[i]`.
+        metric_type: One of "bbox", "segm" or "keypoints".
+        iou_thresholds: Defaults to `[0.5, 0.55, ..., 0.95]`.
+        kpt_sigmas: Per keypoint standard deviations used by OKS, defaults to the
+            sigmas of the 17 COCO person keypoints.
+    """
+
+    def __init__(
+        self,
+        records: Optional[Sequence[RecordType]] = None,
+        preds: Optional[Sequence[RecordType]] = None,
+        metric_type: str = "bbox",
+        iou_thresholds: Optional[Sequence[float]] = None,
+        kpt_sigmas: Optional[Sequence[float]] = None,
+    ):
+        if metric_type not in ("bbox", "segm", "keypoints"):
+            raise ValueError(f"Unknown metric_type {metric_type}")
+        self.metric_type = metric_type
+
+        self.custom_iou_thresholds = iou_thresholds is not None
+        if iou_thresholds is None:
+            iou_thresholds = np.linspace(
+                0.5, 0.95, int(np.round((0.95 - 0.5) / 0.05)) + 1, endpoint=True
+            )
+        self.iou_thresholds = np.asarray(iou_thresholds, dtype=np.float64).reshape(-1)
+        self.rec_thresholds = np.linspace(
+            0.0, 1.00, int(np.round((1.00 - 0.0) / 0.01)) + 1, endpoint=True
+        )
+        if metric_type == "keypoints":
+            self.max_dets = [20]
+            self.area_ranges = [[0, 1e5 ** 2], [32 ** 2, 96 ** 2], [96 ** 2, 1e5 ** 2]]
+            self.area_labels = ["all", "medium", "large"]
+        else:
+            self.max_dets = [1, 10, 100]
+            self.area_ranges = [
+                [0 ** 2, 1e5 ** 2],
+                [0 ** 2, 32 ** 2],
+                [32 ** 2, 96 ** 2],
+                [96 ** 2, 1e5 ** 2],
+            ]
+            self.area_labels = ["all", "small", "medium", "large"]
+        self.kpt_sigmas = (
+            np.asarray(kpt_sigmas, dtype=np.float64)
+            if kpt_sigmas is not None
+            else _COCO_KPT_SIGMAS
+        )
+
+        self.record_ids, self.img_sizes = [], []
+        self._gt_batches, self._dt_batches = [], []
+        if records is not None:
+            self.update(records, preds)
+
+        self.stats = None
+        self.precision, self.recall = None, None
+
+    def __len__(self):
+        return len(self.record_ids)
+
+    def update(self, records: Sequence[RecordType], preds: Sequence[RecordType]):
+        """Adds the annotations of a batch of records and their predictions.
+
+        The records are not kept, they can be freed right after calling this.
+        """
+        assert len(records) == len(preds)
+        first = len(self.record_ids)
+        record_idxs = range(first, first + len(records))
+        self._gt_batches.append(self._gather(records, record_idxs, is_pred=False))
+        self._dt_batches.append(self._gather(preds, record_idxs, is_pred=True))
+        self.record_ids.extend(record.record_id for record in records)
+        self.img_sizes.extend((record.width, record.height) for record in records)
+
+    def _gather(
+        self, records: Sequence[RecordType], record_idxs: Sequence[int], is_pred: bool
+    ) -> dict:
+        "Concatenates the annotations of `records` into flat arrays"
+        anns = {k: [] for k in self._ann_shapes(is_pred)}
+        masks = []
+        for record, record_idx in zip(records, record_idxs):
+            detection = record.detection
+            n = len(detection.label_ids)
+            if n == 0:
+                continue
+
+            bboxes = BBoxes.from_bboxes(detection.bboxes)
+            anns["img"].append(np.full(n, record_idx, dtype=np.int64))
+            anns["cat"].append(np.asarray(detection.label_ids, dtype=np.int64))
+            anns["bbox"].append(np.asarray(bboxes.xywh, dtype=np.float64))
+            areas = getattr(detection, "areas", None) or bboxes.area
+            anns["area"].append(np.asarray(areas, dtype=np.float64))
+            iscrowds = getattr(detection, "iscrowds", None) or [0] * n
+            anns["iscrowd"].append(np.asarray(iscrowds, dtype=bool))
+            if is_pred:
+                anns["score"].append(np.asarray(detection.scores, dtype=np.float64))
+
+            if self.metric_type == "segm":
+                record_masks = detection.masks
+                if isinstance(record_masks, MaskArray):
+                    record_masks = record_masks.to_erles(record.height, record.width)
+                if not isinstance(record_masks, EncodedRLEs):
+                    raise RuntimeError(
+                        f"Masks of type {type(record_masks)} are not supported"
+                    )
+                masks.extend(record_masks.erles)
+            elif self.metric_type == "keypoints":
+                kpts = [o.keypoints.reshape(-1, 3) for o in detection.keypoints]
+                anns["keypoints"].append(np.asarray(kpts, dtype=np.float64))
+
+        gathered = {
+            k: np.concatenate(v) if v else np.zeros(shape, dtype=dtype)
+            for (k, v), (shape, dtype) in zip(
+                anns.items(), self._ann_shapes(is_pred).values()
+            )
+        }
+        if self.metric_type == "segm":
+            gathered["masks"] = masks
+        return gathered
+
+    def _ann_shapes(self, is_pred: bool) -> Dict[str, tuple]:
+        "Shape and dtype of the empty annotation arrays"
+        shapes = {
+            "img": ((0,), np.int64),
+            "cat": ((0,), np.int64),
+            "bbox": ((0, 4), np.float64),
+            "area": ((0,), np.float64),
+            "iscrowd": ((0,), bool),
+        }
+        if is_pred:
+            shapes["score"] = ((0,), np.float64)
+        if self.metric_type == "keypoints":
+            shapes["keypoints"] = ((0, len(self.kpt_sigmas), 3), np.float64)
+        return shapes
+
+    def _merge_batches(self, batches: List[dict], is_pred: bool) -> dict:
+        if not batches:
+            return self._gather([], [], is_pred=is_pred)
+        anns = {
+            k: np.concatenate([batch[k] for batch in batches])
+            for k in batches[0]
+            if k != "masks"
+        }
+        if self.metric_type == "segm":
+            anns["masks"] = list(itertools.chain(*(o["masks"] for o in batches)))
+        return anns
+
+    def _concat_batches(self, batches: List[dict], is_pred: bool) -> dict:
+        anns = self._merge_batches(batches, is_pred=is_pred)
+        # record positions to indexes of the sorted image ids
+        anns["img"] = self._record_img_idxs[anns["img"]]
+        return anns
+
+    def get_state(self) -> dict:
+        "Picklable copy of the annotations added with `update`"
+        return {
+            "record_ids": list(self.record_ids),
+            "img_sizes": list(self.img_sizes),
+            "gts": self._merge_batches(self._gt_batches, is_pred=False),
+            "dts": self._merge_batches(self._dt_batches, is_pred=True),
+        }
+
+    def load_states(self, states: Sequence[dict]) -> None:
+        """Replaces the annotations by the ones of `states`, returned by `get_state`
+        of evaluators that saw different records (e.g. in different processes).
+
+        Records already present in a previous state are skipped, so samples repeated
+        across processes (like the padding of `DistributedSampler`) count only once.
+        """
+        self.record_ids, self.img_sizes = [], []
+        self._gt_batches, self._dt_batches = [], []
+        seen = set()
+        for state in states:
+            keep = np.array([o not in seen for o in state["record_ids"]], dtype=bool)
+            seen.update(state["record_ids"])
+            # old record positions to positions in the merged records
+            positions = np.cumsum(keep) - 1 + len(self.record_ids)
+            self.record_ids.extend(itertools.compress(state["record_ids"], keep))
+            self.img_sizes.extend(itertools.compress(state["img_sizes"], keep))
+
+            for batches, anns in [
+                (self._gt_batches, state["gts"]),
+                (self._dt_batches, state["dts"]),
+            ]:
+                idxs = np.where(keep[anns["img"]])[0]
+                batch = {k: _take(v, idxs) for k, v in anns.items()}
+                batch["img"] = positions[batch["img"]]
+                batches.append(batch)
+
+    def to_coco_eval(self) -> COCOeval:
+        """Creates the pycocotools `COCOeval` from the stored annotations, like
+        `create_coco_eval` does from the records.
+        """
+        self._check_not_empty()
+        img_ids = self.img_ids
+        images = [
+            {"id": record_id, "width": width, "height": height}
+            for record_id, (width, height) in zip(self.record_ids, self.img_sizes)
+        ]
+        datasets = []
+        for batches, is_pred in [(self._gt_batches, False), (self._dt_batches, True)]:
+            anns = self._concat_batches(batches, is_pred=is_pred)
+            annotations = []
+            for i in range(len(anns["cat"])):
+                annotation = {
+                    "id": i + 1,
+                    "image_id": img_ids[anns["img"][i]],
+                    "category_id": int(anns["cat"][i]),
+                    "bbox": anns["bbox"][i].tolist(),
+                    "area": float(anns["area"][i]),
+                    "iscrowd": int(anns["iscrowd"][i]),
+                }
+                if "score" in anns:
+                    annotation["score"] = float(anns["score"][i])
+                if "masks" in anns:
+                    annotation["segmentation"] = anns["masks"][i]
+                if "keypoints" in anns:
+                    kpts = anns["keypoints"][i]
+                    annotation["keypoints"] = kpts.reshape(-1).tolist()
+                    annotation["num_keypoints"] = int((kpts[:, 2] > 0).sum())
+                annotations.append(annotation)
+            datasets.append({"images": images, "annotations": annotations})
+        cat_ids = set(o["category_id"] for o in datasets[0]["annotations"])
+        datasets[0]["categories"] = [{"id": i} for i in cat_ids]
+
+        coco_eval = COCOeval(
+            create_coco_api(datasets[0]), create_coco_api(datasets[1]), self.metric_type
+        )
+        if self.custom_iou_thresholds:
+            coco_eval.params.iouThrs = self.iou_thresholds
+        if self.metric_type == "keypoints":
+            coco_eval.params.kpt_oks_sigmas = self.kpt_sigmas
+        return coco_eval
+
+    def _check_not_empty(self):
+        if not self.record_ids:
+            raise RuntimeError("No records to evaluate, call update() first")
+
+    @property
+    def img_ids(self) -> list:
+        return sorted(set(self.record_ids))
+
+    @property
+    def _record_img_idxs(self) -> np.ndarray:
+        img_idxs = {img_id: i for i, img_id in enumerate(self.img_ids)}
+        return np.array([img_idxs[o] for o in self.record_ids], dtype=np.int64)
+
+    def evaluate(self) -> None:
+        "Matches the detections to the ground truths of each image and category"
+        self._check_not_empty()
+        gts = self._concat_batches(self._gt_batches, is_pred=False)
+        dts = self._concat_batches(self._dt_batches, is_pred=True)
+        self.cat_ids = np.unique(gts["cat"])
+        num_cats = len(self.cat_ids)
+
+        if self.metric_type == "keypoints":
+            num_kpts = gts["keypoints"].shape[1]
+            if num_kpts != len(self.kpt_sigmas):
+                raise ValueError(
+                    f"Records have {num_kpts} keypoints but {len(self.kpt_sigmas)} "
+                    f"kpt_sigmas were given"
+                )
+
+        # detections of categories that are not in the ground truth are not evaluated
+        dt_keep = np.isin(dts["cat"], self.cat_ids)
+        dts = {k: _take(v, np.nonzero(dt_keep)[0]) for k, v in dts.items()}
+        gts["cat"] = np.searchsorted(self.cat_ids, gts["cat"])
+        dts["cat"] = np.searchsorted(self.cat_ids, dts["cat"])
+
+        # sort by (image, category), detections also by descending score,
+        # lexsort is stable so ties keep the original order like in cocoapi
+        gt_order = np.lexsort((gts["cat"], gts["img"]))
+        gts = {k: _take(v, gt_order) for k, v in gts.items()}
+        dt_order = np.lexsort((-dts["score"], dts["cat"], dts["img"]))
+        dts = {k: _take(v, dt_order) for k, v in dts.items()}
+
+        gt_keys = gts["img"] * num_cats + gts["cat"]
+        dt_keys = dts["img"] * num_cats + dts["cat"]
+        dt_rank = np.arange(len(dt_keys)) - np.searchsorted(dt_keys, dt_keys)
+        dt_keep = dt_rank < self.max_dets[-1]
+        dts = {k: _take(v, np.nonzero(dt_keep)[0]) for k, v in dts.items()}
+        dt_keys, dts["rank"] = dt_keys[dt_keep], dt_rank[dt_keep]
+        self._gts, self._dts = gts, dts
+
+        areas = np.array(self.area_ranges)
+        gt_ignore = gts["iscrowd"].copy()
+        if self.metric_type == "keypoints":
+            gt_ignore |= (gts["keypoints"][..., 2] > 0).sum(-1) == 0
+        self._gt_ignore = (
+            gt_ignore[None]
+            | (gts["area"][None] < areas[:, :1])
+            | (gts["area"][None] > areas[:, 1:])
+        )
+        dt_area_out = (dts["area"][None] < areas[:, :1]) | (
+            dts["area"][None] > areas[:, 1:]
+        )
+
+        # one lane for each (area range, iou threshold)
+        num_areas, num_thrs = len(areas), len(self.iou_thresholds)
+        self._lane_areas = np.repeat(np.arange(num_areas), num_thrs)
+        self._lane_thrs = np.minimum(np.tile(self.iou_thresholds, num_areas), 1 - 1e-10)
+        num_lanes = len(self._lane_thrs)
+        self._dt_matched = np.zeros((num_lanes, len(dt_keys)), dtype=bool)
+        self._dt_ignore = np.zeros((num_lanes, len(dt_keys)), dtype=bool)
+
+        pair_keys = np.union1d(gt_keys, dt_keys)
+        gt_starts = np.searchsorted(gt_keys, pair_keys, side="left")
+        gt_counts = np.searchsorted(gt_keys, pair_keys, side="right") - gt_starts
+        dt_starts = np.searchsorted(dt_keys, pair_keys, side="left")
+        dt_counts = np.searchsorted(dt_keys, pair_keys, side="right") - dt_starts
+
+        # only pairs with both detections and ground truths can have matches
+        has_both = np.nonzero((gt_counts > 0) & (dt_counts > 0))[0]
+        for chunk in _chunks(gt_counts[has_both], dt_counts[has_both], num_lanes):
+            chunk = has_both[chunk]
+            self._match_chunk(
+                gt_starts[chunk], gt_counts[chunk], dt_starts[chunk], dt_counts[chunk]
+            )
+
+        self._dt_ignore |= ~self._dt_matched & dt_area_out[self._lane_areas]
+
+    def _match_chunk(self, gt_starts, gt_counts, dt_starts, dt_counts) -> None:
+        "Greedy matching of cocoapi `evaluateImg`, vectorized over pairs and lanes"
+        n, G, D = len(gt_starts), gt_counts.max(), dt_counts.max()
+        gt_valid = np.arange(G) < gt_counts[:, None]
+        dt_valid = np.arange(D) < dt_counts[:, None]
+        gt_idxs = np.where(gt_valid, gt_starts[:, None] + np.arange(G), 0)
+        dt_idxs = np.where(dt_valid, dt_starts[:, None] + np.arange(D), 0)
+
+        ious = self._compute_ious(dt_idxs, dt_counts, gt_idxs, gt_counts)
+        ious[~(dt_valid[:, :, None] & gt_valid[:, None, :])] = -1
+
+        num_lanes = len(self._lane_thrs)
+        lanes = np.arange(num_lanes)
+        # (n, lanes, G)
+        gt_ignore = self._gt_ignore[:, gt_idxs].transpose(1, 0, 2)[:, self._lane_areas]
+        gt_crowd = self._gts["iscrowd"][gt_idxs] & gt_valid
+        # crowd ground truths can be matched multiple times
+        gt_available = np.ones((n, num_lanes, G), dtype=bool)
+        dt_matched = np.zeros((n, num_lanes, D), dtype=bool)
+        dt_ignore = np.zeros((n, num_lanes, D), dtype=bool)
+
+        # ground truths that are not ignored are always preferred, shifting the
+        # ious of the ignored ones below 0 allows finding the match with one argmax
+        ignore_offset = np.where(gt_ignore, -2.0, 0.0)
+        thrs = self._lane_thrs[None, :, None]
+        pair_range = np.arange(n)[:, None]
+        for d in range(D):
+            iou = ious[:, d, None, :]
+            candidates = (iou >= thrs) & gt_available
+            scores = np.where(candidates, iou + ignore_offset, -np.inf)
+            # ties are resolved to the last ground truth like in cocoapi
+            best = G - 1 - np.argmax(scores[..., ::-1], axis=-1)
+            found = np.isfinite(scores[pair_range, lanes, best])
+
+            dt_matched[:, :, d] = found
+            dt_ignore[:, :, d] = found & gt_ignore[pair_range, lanes, best]
+            pair_idxs, lane_idxs = np.nonzero(found & ~gt_crowd[pair_range, best])
+            gt_available[pair_idxs, lane_idxs, best[pair_idxs, lane_idxs]] = False
+
+        flat_idxs = dt_idxs[dt_valid]
+        self._dt_matched[:, flat_idxs] = dt_matched.transpose(1, 0, 2)[:, dt_valid]
+        self._dt_ignore[:, flat_idxs] = dt_ignore.transpose(1, 0, 2)[:, dt_valid]
+
+    def _compute_ious(self, dt_idxs, dt_counts, gt_idxs, gt_counts) -> np.ndarray:
+        "(n,D,G) IoUs (or OKS) between the padded detections and ground truths"
+        if self.metric_type == "bbox":
+            return _bbox_ious(
+                self._dts["bbox"][dt_idxs],
+                self._gts["bbox"][gt_idxs],
+                self._gts["iscrowd"][gt_idxs],
+            )
+
+        if self.metric_type == "keypoints":
+            return _keypoints_oks(
+                self._dts["keypoints"][dt_idxs],
+                self._gts["keypoints"][gt_idxs],
+                self._gts["bbox"][gt_idxs],
+                self._gts["area"][gt_idxs],
+                self.kpt_sigmas,
+            )
+
+        ious = np.zeros((*dt_idxs.shape, gt_idxs.shape[1]))
+        for i, (d, g) in enumerate(zip(dt_counts, gt_counts)):
+            dt_rles = [self._dts["masks"][j] for j in dt_idxs[i, :d]]
+            gt_rles = [self._gts["masks"][j] for j in gt_idxs[i, :g]]
+            iscrowd = self._gts["iscrowd"][gt_idxs[i, :g]].astype(np.uint8).tolist()
+            ious[i, :d, :g] = mask_utils.iou(dt_rles, gt_rles, iscrowd)
+        return ious
+
+    def accumulate(self) -> None:
+        "Computes the precision-recall curves of each category and area range"
+        T, R = len(self.iou_thresholds), len(self.rec_thresholds)
+        K, A, M = len(self.cat_ids), len(self.area_ranges), len(self.max_dets)
+        precision = -np.ones((T, R, K, A, M))
+        recall = -np.ones((T, K, A, M))
+
+        gts, dts = self._gts, self._dts
+        for k in range(K):
+            gt_cat, dt_cat = gts["cat"] == k, dts["cat"] == k
+            for a in range(A):
+                num_gts = np.count_nonzero(gt_cat & ~self._gt_ignore[a])
+                if num_gts == 0:
+                    continue
+                lanes = a * T + np.arange(T)
+
+                for m, max_det in enumerate(self.max_dets):
+                    idxs = np.nonzero(dt_cat & (dts["rank"] < max_det))[0]
+                    idxs = idxs[np.argsort(-dts["score"][idxs], kind="mergesort")]
+                    matched = self._dt_matched[lanes][:, idxs]
+                    ignore = self._dt_ignore[lanes][:, idxs]
+
+                    tp_sum = np.cumsum(matched & ~ignore, axis=1).astype(float)
+                    fp_sum = np.cumsum(~matched & ~ignore, axis=1).astype(float)
+                    num_dts = len(idxs)
+                    rc = tp_sum / num_gts
+                    pr = tp_sum / (fp_sum + tp_sum + np.spacing(1))
+                    recall[:, k, a, m] = rc[:, -1] if num_dts else 0
+
+                    # make precision monotonically decreasing
+                    pr = np.maximum.accumulate(pr[:, ::-1], axis=1)[:, ::-1]
+                    for t in range(T):
+                        rec_idxs = np.searchsorted(
+                            rc[t], self.rec_thresholds, side="left"
+                        )
+                        valid = rec_idxs < num_dts
+                        q = np.zeros(R)
+                        q[valid] = pr[t, rec_idxs[valid]]
+                        precision[t, :, k, a, m] = q
+
+        self.precision, self.recall = precision, recall
+
+    def _summarize(self, ap=True, iou_thr=None, area="all", max_dets=100) -> float:
+        a = self.area_labels.index(area)
+        m = self.max_dets.index(max_dets)
+        s = self.precision[..., a, m] if ap else self.recall[..., a, m]
+        if iou_thr is not None:
+            s = s[np.where(iou_thr == self.iou_thresholds)[0]]
+        mean_s = -1 if len(s[s > -1]) == 0 else np.mean(s[s > -1])
+
+        title = "Average Precision" if ap else "Average Recall"
+        type_ = "(AP)" if ap else "(AR)"
+        iou = (
+            f"{self.iou_thresholds[0]:0.2f}:{self.iou_thresholds[-1]:0.2f}"
+            if iou_thr is None
+            else f"{iou_thr:0.2f}"
+        )
+        print(
+            f" {title:<18} {type_} @[ IoU={iou:<9} | area={area:>6s} | "
+            f"maxDets={max_dets:>3d} ] = {mean_s:0.3f}"
+        )
+        return mean_s
+
+    def summarize(self) -> None:
+        "Prints the same table as cocoapi and stores the values in `stats`"
+        if self.precision is None:
+            raise RuntimeError("Please run accumulate() first")
+
+        if self.metric_type == "keypoints":
+            stats = [
+                self._summarize(True, max_dets=20),
+                self._summarize(True, max_dets=20, iou_thr=0.5),
+                self._summarize(True, max_dets=20, iou_thr=0.75),
+                self._summarize(True, max_dets=20, area="medium"),
+                self._summarize(True, max_dets=20, area="large"),
+                self._summarize(False, max_dets=20),
+                self._summarize(False, max_dets=20, iou_thr=0.5),
+                self._summarize(False, max_dets=20, iou_thr=0.75),
+                self._summarize(False, max_dets=20, area="medium"),
+                self._summarize(False, max_dets=20, area="large"),
+            ]
+        else:
+            max_dets = self.max_dets
+            stats = [
+                self._summarize(True),
+                self._summarize(True, iou_thr=0.5, max_dets=max_dets[2]),
+                self._summarize(True, iou_thr=0.75, max_dets=max_dets[2]),
+                self._summarize(True, area="small", max_dets=max_dets[2]),
+                self._summarize(True, area="medium", max_dets=max_dets[2]),
+                self._summarize(True, area="large", max_dets=max_dets[2]),
+                self._summarize(False, max_dets=max_dets[0]),
+                self._summarize(False, max_dets=max_dets[1]),
+                self._summarize(False, max_dets=max_dets[2]),
+                self._summarize(False, area="small", max_dets=max_dets[2]),
+                self._summarize(False, area="medium", max_dets=max_dets[2]),
+                self._summarize(False, area="large", max_dets=max_dets[2]),
+            ]
+        self.stats = np.array(stats)
+
+
+def _take(v: Union[np.ndarray, list], idxs: np.ndarray):
+    if isinstance(v, np.ndarray):
+        return v[idxs]
+    return [v[i] for i in idxs]
+
+
+def _chunks(gt_counts, dt_counts, num_lanes: int, max_size: int = 2 ** 16):
+    "Groups pairs of similar sizes so the padded arrays stay below `max_size`"
+    order = np.lexsort((dt_counts, gt_counts))
+    chunk, chunk_g, chunk_d = [], 0, 0
+    for i in order:
+        g, d = max(chunk_g, gt_counts[i]), max(chunk_d, dt_counts[i])
+        if chunk and (len(chunk) + 1) * max(d, num_lanes) * g > max_size:
+            yield np.array(chunk)
+            chunk, g, d = [], gt_counts[i], dt_counts[i]
+        chunk.append(i)
+        chunk_g, chunk_d = g, d
+    if chunk:
+        yield np.array(chunk)
+
+
+def _bbox_ious(dts: np.ndarray, gts: np.ndarray, iscrowd: np.ndarray) -> np.ndarray:
+    "Same formula as `maskUtils.iou` for xywh boxes, (n,D,4) x (n,G,4) -> (n,D,G)"
+    d, g = dts[:, :, None], gts[:, None]
+    w = np.minimum(d[..., 2] + d[..., 0], g[..., 2] + g[..., 0]) - np.maximum(
+        d[..., 0], g[..., 0]
+    )
+    h = np.minimum(d[..., 3] + d[..., 1], g[..., 3] + g[..., 1]) - np.maximum(
+        d[..., 1], g[..., 1]
+    )
+    overlap = (w > 0) & (h > 0)
+    inter = np.where(overlap, w * h, 0)
+    d_area, g_area = d[..., 2] * d[..., 3], g[..., 2] * g[..., 3]
+    union = np.where(iscrowd[:, None], d_area, d_area + g_area - inter)
+    return np.divide(inter, union, out=np.zeros_like(inter), where=overlap)
+
+
+def _keypoints_oks(dts, gts, gt_bboxes, gt_areas, sigmas) -> np.ndarray:
+    "Same formula as `COCOeval.computeOks`, (n,D,K,3) x (n,G,K,3) -> (n,D,G)"
+    variances = (sigmas * 2) ** 2
+    xd, yd = dts[:, :, None, :, 0], dts[:, :, None, :, 1]
+    xg, yg, vg = gts[:, None, :, :, 0], gts[:, None, :, :, 1], gts[:, None, :, :, 2]
+    visible = vg > 0
+    num_visible = visible.sum(-1)
+
+    # when no keypoint is labeled, distance to a box twice the size of the gt box
+    bb = gt_bboxes[:, None, :, None]
+    x0, x1 = bb[..., 0] - bb[..., 2], bb[..., 0] + bb[..., 2] * 2
+    y0, y1 = bb[..., 1] - bb[..., 3], bb[..., 1] + bb[..., 3] * 2
+    dx_out = np.maximum(0, x0 - xd) + np.maximum(0, xd - x1)
+    dy_out = np.maximum(0, y0 - yd) + np.maximum(0, yd - y1)
+
+    has_visible = (num_visible > 0)[..., None]
+    dx = np.where(has_visible, xd - xg, dx_out)
+    dy = np.where(has_visible, yd - yg, dy_out)
+    area = gt_areas[:, None, :, None]
+    e = (dx ** 2 + dy ** 2) / variances / (area + np.spacing(1)) / 2
+
+    oks = np.exp(-e)
+    oks_visible = (oks * visible).sum(-1) / np.maximum(num_visible, 1)
+    return np.where(num_visible > 0, oks_visible, oks.mean(-1))
@@ -1,9 +1,10 @@
-__all__ = ["COCOMetric", "COCOMetricType"]
+__all__ = ["COCOMetric", "COCOMetricType", "COCOMetricBackend"]
 
 from icevision.imports import *
 from icevision.utils import *
 from icevision.data import *
 from icevision.metrics.metric import *
+from icevision.metrics.coco_metric.coco_evaluator import *
 
 
 class COCOMetricType(Enum):
@@ -14,15 +15,28 @@ class COCOMetricType(Enum):
     keypoint = "keypoints"
 
 
+class COCOMetricBackend(Enum):
+    """Available evaluators for `COCOMetric`."""
+
+    pycocotools = "pycocotools"
+    numpy = "numpy"
+
+
 class COCOMetric(Metric):
     """Wrapper around [cocoapi evaluator](https://github.com/cocodataset/cocoapi)
 
     Calculates average precision.
 
+    The annotations of each batch are reduced to compact arrays (masks as RLEs) when
+    accumulated, the records themselves are not kept until `finalize`.
+
     # Arguments
         metric_type: Dependent on the task you're solving.
         print_summary: If `True`, prints a table with statistics.
-        show_pbar: If `True` shows pbar when preparing the data for evaluation.
+        show_pbar: Not used anymore, the data is prepared on `accumulate`.
+        backend: `pycocotools` converts the annotations to COCO dicts and uses
+            `COCOeval`, `numpy` uses `COCOEvaluator` directly and is much faster on
+            big datasets.
     """
 
     def __init__(
@@ -31,31 +45,39 @@ class COCOMetric(Metric):
         iou_thresholds: Optional[Sequence[float]] = None,
         print_summary: bool = False,
         show_pbar: bool = False,
+        backend: COCOMetricBackend = COCOMetricBackend.pycocotools,
     ):
         self.metric_type = metric_type
         self.iou_thresholds = iou_thresholds
         self.print_summary = print_summary
         self.show_pbar = show_pbar
-        self._records, self._preds = [], []
+        self.backend = backend
+        self._reset()
 
     def _reset(self):
-        self._records.clear()
-        self._preds.clear()
+        self._evaluator = COCOEvaluator(
+            metric_type=self.metric_type.value, iou_thresholds=self.iou_thresholds
+        )
 
     def accumulate(self, preds):
-        for pred in preds:
-            self._records.append(pred.ground_truth)
-            self._preds.append(pred.pred)
+        self._evaluator.update(
+            records=[pred.ground_truth for pred in preds],
+            preds=[pred.pred for pred in preds],
+        )
+
+    def get_state(self) -> dict:
+        return self._evaluator.get_state()
+
+    def load_states(self, states: Sequence[dict]) -> None:
+        self._reset()
+        self._evaluator.load_states(states)
 
     def finalize(self) -> Dict[str, float]:
         with CaptureStdout():
-            coco_eval = create_coco_eval(
-                records=self._records,
-                preds=self._preds,
-                metric_type=self.metric_type.value,
-                iou_thresholds=self.iou_thresholds,
-                show_pbar=self.show_pbar,
-            )
+            if self.backend == COCOMetricBackend.numpy:
+                coco_eval = self._evaluator
+            else:
+                coco_eval = self._evaluator.to_coco_eval()
             coco_eval.evaluate()
             coco_eval.accumulate()
 
@@ -63,6 +85,22 @@ class COCOMetric(Metric):
             coco_eval.summarize()
 
         stats = coco_eval.stats
+        if self.metric_type == COCOMetricType.keypoint:
+            logs = {
+                "AP (IoU=0.50:0.95) area=all": stats[0],
+                "AP (IoU=0.50) area=all": stats[1],
+                "AP (IoU=0.75) area=all": stats[2],
+                "AP (IoU=0.50:0.95) area=medium": stats[3],
+                "AP (IoU=0.50:0.95) area=large": stats[4],
+                "AR (IoU=0.50:0.95) area=all": stats[5],
+                "AR (IoU=0.50) area=all": stats[6],
+                "AR (IoU=0.75) area=all": stats[7],
+                "AR (IoU=0.50:0.95) area=medium": stats[8],
+                "AR (IoU=0.50:0.95) area=large": stats[9],
+            }
+            self._reset()
+            return logs
+
         logs = {
             "AP (IoU=0.50:0.95) area=all": stats[0],
             "AP (IoU=0.50) area=all": stats[1],
@@ -1,4 +1,4 @@
-__all__ = ["SimpleConfusionMatrix"]
+__all__ = ["SimpleConfusionMatrix", "MatchingPolicy"]
 
 from icevision.data.prediction import Prediction
 from icevision.metrics.metric import Metric
@@ -21,64 +21,75 @@ class SimpleConfusionMatrix(Metric):
     ):
         super(SimpleConfusionMatrix, self).__init__()
         self.print_summary = print_summary
-        self.target_labels = []
-        self.predicted_labels = []
         self._iou_threshold = iou_threshold
         self._policy = policy
         self.class_map = None
-        self.confusion_matrix: sklearn.metrics.confusion_matrix = None
+        self.confusion_matrix: np.ndarray = None
+        self._reset()
 
     def _reset(self):
-        self.target_labels = []
-        self.predicted_labels = []
+        # counts are accumulated in place, rows are targets and columns predictions
+        self._counts: Optional[np.ndarray] = None
 
     def accumulate(self, preds: Collection[Prediction]):
         for pred in preds:
             target_record = pred.ground_truth
             prediction_record = pred.pred
             self.class_map = target_record.detection.class_map
-            # skip if empty ground_truths
-            # if not target_record.detection.bboxes:
-            #     continue
-            # create matches based on iou
-            matches = match_records(
-                target=target_record,
-                prediction=prediction_record,
+
+            if self._policy == MatchingPolicy.BEST_SCORE:
+                priorities = np.asarray(prediction_record.detection.scores, dtype=float)
+            elif self._policy == MatchingPolicy.BEST_IOU:
+                priorities = None
+            else:
+                raise RuntimeError(f"policy must be one of {list(MatchingPolicy)}")
+
+            # index of the matched prediction for each target, -1 if none
+            matches = match_bboxes(
+                target_bboxes=target_record.detection.bboxes,
+                predicted_bboxes=prediction_record.detection.bboxes,
+                priorities=priorities,
                 iou_threshold=self._iou_threshold,
             )
 
-            target_labels, predicted_labels = [], []
-            # iterate over multiple targets and preds in a record
-            for target_item, prediction_items in matches:
-                if self._policy == MatchingPolicy.BEST_SCORE:
-                    predicted_item = get_best_score_item(
-                        prediction_items=prediction_items,
-                    )
-                elif self._policy == MatchingPolicy.BEST_IOU:
-                    raise NotImplementedError
-                else:
-                    raise RuntimeError(f"policy must be one of {list(MatchingPolicy)}")
-
-                # using label_id instead of named label to save memory
-                target_label = target_item["target_label_id"]
-                predicted_label = predicted_item["predicted_label_id"]
-                target_labels.append(target_label)
-                predicted_labels.append(predicted_label)
-
-            # We need to store the entire list of gts/preds to support various CM logging methods
-            assert len(predicted_labels) == len(target_labels)
-            self.target_labels.extend(target_labels)
-            self.predicted_labels.extend(predicted_labels)
+            # unmatched targets are counted as predicted background (label_id 0),
+            # appending it to the end of the array makes index -1 point to it
+            predicted_label_ids = np.append(
+                np.asarray(prediction_record.detection.label_ids, dtype=np.int64), 0
+            )[matches]
+            target_label_ids = np.asarray(
+                target_record.detection.label_ids, dtype=np.int64
+            )
+            self._update(target_label_ids, predicted_label_ids)
+
+    def _update(self, target_label_ids: np.ndarray, predicted_label_ids: np.ndarray):
+        assert len(target_label_ids) == len(predicted_label_ids)
+        if self._counts is None:
+            num_classes = len(self.class_map)
+            self._counts = np.zeros((num_classes, num_classes), dtype=np.int64)
+        np.add.at(self._counts, (target_label_ids, predicted_label_ids), 1)
+
+    def get_state(self) -> dict:
+        return {"class_map": self.class_map, "counts": self._counts}
+
+    def load_states(self, states: Sequence[dict]) -> None:
+        # counts are summed, samples repeated across processes are counted again
+        self._reset()
+        for state in states:
+            self.class_map = self.class_map or state["class_map"]
+            if state["counts"] is None:
+                continue
+            if self._counts is None:
+                self._counts = state["counts"].copy()
+            else:
+                self._counts += state["counts"]
 
     def finalize(self):
-        """Convert preds to numpy arrays and calculate the CM"""
-        assert len(self.target_labels) == len(self.predicted_labels)
-        label_ids = list(self.class_map._class2id.values())
-        self.confusion_matrix = sklearn.metrics.confusion_matrix(
-            y_true=self.target_labels,
-            y_pred=self.predicted_labels,
-            labels=label_ids,
-        )
+        """Calculate the CM from the accumulated counts"""
+        if self._counts is None:
+            num_classes = len(self.class_map)
+            self._counts = np.zeros((num_classes, num_classes), dtype=np.int64)
+        self.confusion_matrix = self._counts
         if self.print_summary:
             print(self.confusion_matrix)
         self._reset()
@@ -1,5 +1,5 @@
 from icevision.imports import *
-from icevision import BBox, BaseRecord
+from icevision import BBox, BBoxes, BaseRecord
 
 
 def get_best_score_item(prediction_items: Collection[Dict]):
@@ -18,13 +18,8 @@ def pairwise_iou_record_record(target: BaseRecord, prediction: BaseRecord):
     """
     Calculates pairwise iou on prediction and target BaseRecord. Uses torchvision implementation of `box_iou`.
     """
-    stacked_preds = [bbox.to_tensor() for bbox in prediction.detection.bboxes]
-    stacked_preds = torch.stack(stacked_preds) if stacked_preds else torch.empty(0, 4)
-
-    stacked_targets = [bbox.to_tensor() for bbox in target.detection.bboxes]
-    stacked_targets = (
-        torch.stack(stacked_targets) if stacked_targets else torch.empty(0, 4)
-    )
+    stacked_preds = BBoxes.from_bboxes(prediction.detection.bboxes).to_tensor()
+    stacked_targets = BBoxes.from_bboxes(target.detection.bboxes).to_tensor()
     return torchvision.ops.box_iou(stacked_preds, stacked_targets)
 
 
@@ -61,12 +56,43 @@ def match_records(
     ]
 
     # appending matches to targets
-    for pred_id, target_id in pairs_indices:
-        single_prediction = deepcopy(prediction_list[pred_id])
+    for pred_id, target_id in pairs_indices.tolist():
         # python value casting needs rounding cause otherwise there are 0.69999991 values
         iou_score = round(iou_table[pred_id, target_id].item(), 4)
-        single_prediction["iou_score"] = iou_score
+        single_prediction = {**prediction_list[pred_id], "iou_score": iou_score}
         # seems like a magic number, but we want to append to the list of target's matching_predictions
         target_list[target_id][1].append(single_prediction)
 
     return target_list
+
+
+def match_bboxes(
+    target_bboxes: BBoxes,
+    predicted_bboxes: BBoxes,
+    priorities: Optional[np.ndarray] = None,
+    iou_threshold: float = 0.5,
+) -> np.ndarray:
+    """
+    Vectorized matching of targets with predictions, works directly on the `(N, 4)`
+    arrays of `BBoxes` without creating intermediate python objects.
+
+    For each target, among the predictions with iou above `iou_threshold`, the one
+    with the highest priority is matched (ties go to the lowest prediction index).
+    `priorities` is either an array with one value per prediction (e.g. scores) or
+    `None`, in which case the iou itself is used.
+
+    # Returns
+    An integer array with the matched prediction index for each target, `-1` for
+    targets without matches.
+    """
+    # (n_targets, n_predictions) to reduce over predictions for each target
+    iou_table = target_bboxes.iou(predicted_bboxes)
+    if iou_table.shape[1] == 0:
+        return np.full(len(iou_table), -1, dtype=np.int64)
+
+    if priorities is None:
+        priorities = iou_table
+    candidates = np.where(iou_table > iou_threshold, priorities, -np.inf)
+    matches = candidates.argmax(axis=1)
+    matches[np.isneginf(candidates[np.arange(len(matches)), matches])] = -1
+    return matches
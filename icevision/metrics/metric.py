@@ -1,9 +1,22 @@
-__all__ = ["Metric"]
+__all__ = ["Metric", "is_distributed"]
 
 from icevision.imports import *
+import torch.distributed as dist
+
+
+def is_distributed() -> bool:
+    "`True` if running with an initialized `torch.distributed` process group"
+    return dist.is_available() and dist.is_initialized() and dist.get_world_size() > 1
 
 
 class Metric(ABC):
+    """Base class of the metrics.
+
+    Metrics that support distributed evaluation implement `get_state` and
+    `load_states`, their accumulated state is then gathered across processes by
+    `finalize_distributed` and finalized only once.
+    """
+
     def __init__(self):
         self._model = None
 
@@ -15,6 +28,51 @@ class Metric(ABC):
     def finalize(self) -> Dict[str, float]:
         """Called at the end of the validation loop"""
 
+    def get_state(self) -> Any:
+        """Compact and picklable state accumulated so far, e.g. counts or annotation
+        arrays, that is sent to the other processes.
+        """
+        raise NotImplementedError(
+            f"{self.name} does not support gathering its state across processes"
+        )
+
+    def load_states(self, states: Sequence[Any]) -> None:
+        """Replaces the accumulated state by the combination of `states` (returned by
+        `get_state` of each process), an empty sequence resets the state.
+        """
+        raise NotImplementedError(
+            f"{self.name} does not support gathering its state across processes"
+        )
+
+    def finalize_distributed(self) -> Dict[str, float]:
+        """Same as `finalize`, but when running with multiple processes the states of
+        all of them are gathered with `all_gather_object` and every process finalizes
+        the metric on the combined state, so they all return the same logs. With the
+        nccl backend each process must have set its cuda device, as DDP does.
+
+        Falls back to `finalize` on the local state if the metric does not implement
+        `get_state` or if `all_gather_object` is not available (torch<1.8).
+        """
+        if not is_distributed():
+            return self.finalize()
+
+        try:
+            state = self.get_state()
+        except NotImplementedError as e:
+            warnings.warn(f"{e}, the metric is computed on the local predictions")
+            return self.finalize()
+        if not hasattr(dist, "all_gather_object"):
+            warnings.warn(
+                "Gathering metric states across processes requires torch>=1.8, "
+                "the metric is computed on the local predictions"
+            )
+            return self.finalize()
+
+        states = [None] * dist.get_world_size()
+        dist.all_gather_object(states, state)
+        self.load_states(states)
+        return self.finalize()
+
     @property
     def name(self) -> str:
         return self.__class__.__name__
@@ -30,6 +30,7 @@ def _end2end_detect(
     label_color: Union[np.array, list, tuple, str] = ("#FF59D6"),  # Pink
     return_as_pil_img=True,
     return_img=True,
+    uint8: bool = False,
     **kwargs,
 ):
     """
@@ -51,6 +52,7 @@ def _end2end_detect(
                    the color of all the plotted labels
     return_as_pil_img: if True a PIL image is returned otherwise a numpy array is returned
     return_img: whether we should also return an image in addition to the bounding boxes, labels, and scores
+    uint8: if True the image is sent to the model as uint8, for models normalizing their inputs with `add_normalize_hook`
 
     Returns
     -------
@@ -62,7 +64,9 @@ def _end2end_detect(
         img = PIL.Image.open(Path(img))
 
     infer_ds = Dataset.from_images([np.array(img)], transforms, class_map=class_map)
-    pred = predict_fn(model, infer_ds, detection_threshold=detection_threshold)[0]
+    pred = predict_fn(
+        model, infer_ds, detection_threshold=detection_threshold, uint8=uint8
+    )[0]
     pred = process_bbox_predictions(pred, img, transforms.tfms_list)
     record = pred.pred
 
@@ -203,7 +207,6 @@ def draw_img_and_boxes(
     label_color: Union[np.array, list, tuple, str] = (255, 255, 0),
     label_border_color: Union[np.array, list, tuple, str] = (255, 255, 0),
 ) -> PIL.Image.Image:
-
     if not isinstance(img, PIL.Image.Image):
         img = np.array(img)
 
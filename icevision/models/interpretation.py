@@ -85,7 +85,6 @@ def get_stats(l: List) -> dict:
 
 
 def _move_to_device(x, y, device):
-
     if isinstance(y, list):
         x = [o.to(device) for o in x]
         y = [
@@ -134,9 +133,8 @@ class Interpretation:
         samples_plus_losses = []
 
         with torch.no_grad():
-            for (x, y), sample in pbar(dl):
+            for (x, y), sample in pbar(DevicePrefetcher(dl, device=device)):
                 torch.manual_seed(0)
-                x, y = _move_to_device(x, y, device)
                 loss = model(x, y)
                 loss = {k: float(v.cpu().numpy()) for k, v in loss.items()}
                 loss = self._rename_losses(loss)
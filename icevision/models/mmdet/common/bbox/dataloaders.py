@@ -13,30 +13,39 @@ from icevision.imports import *
 from icevision.models.utils import *
 
 
-def train_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
+def train_dl(
+    dataset, batch_tfms=None, uint8: bool = False, **dataloader_kwargs
+) -> DataLoader:
     return transform_dl(
         dataset=dataset,
         build_batch=build_train_batch,
         batch_tfms=batch_tfms,
+        build_batch_kwargs={"uint8": uint8},
         **dataloader_kwargs
     )
 
 
-def valid_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
+def valid_dl(
+    dataset, batch_tfms=None, uint8: bool = False, **dataloader_kwargs
+) -> DataLoader:
     return transform_dl(
         dataset=dataset,
         build_batch=build_valid_batch,
         batch_tfms=batch_tfms,
+        build_batch_kwargs={"uint8": uint8},
         **dataloader_kwargs
     )
 
 
-def infer_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
+def infer_dl(
+    dataset, batch_tfms=None, uint8: bool = False, **dataloader_kwargs
+) -> DataLoader:
     """A `DataLoader` with a custom `collate_fn` that batches items as required for inferring the model.
 
     # Arguments
         dataset: Possibly a `Dataset` object, but more generally, any `Sequence` that returns records.
         batch_tfms: Transforms to be applied at the batch level.
+        uint8: If `True`, uint8 images are collated as uint8 tensors, see `img_to_tensor`.
         **dataloader_kwargs: Keyword arguments that will be internally passed to a Pytorch `DataLoader`.
         The parameter `collate_fn` is already defined internally and cannot be passed here.
 
@@ -47,16 +56,17 @@ def infer_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
         dataset=dataset,
         build_batch=build_infer_batch,
         batch_tfms=batch_tfms,
+        build_batch_kwargs={"uint8": uint8},
         **dataloader_kwargs
     )
 
 
 def build_train_batch(
-    records: Sequence[RecordType],
+    records: Sequence[RecordType], uint8: bool = False
 ) -> Tuple[dict, List[Dict[str, torch.Tensor]]]:
     images, labels, bboxes, img_metas = [], [], [], []
     for record in records:
-        images.append(_img_tensor(record))
+        images.append(_img_tensor(record, uint8=uint8))
         img_metas.append(_img_meta(record))
         labels.append(_labels(record))
         bboxes.append(_bboxes(record))
@@ -72,15 +82,15 @@ def build_train_batch(
 
 
 def build_valid_batch(
-    records: Sequence[RecordType],
+    records: Sequence[RecordType], uint8: bool = False
 ) -> Tuple[dict, List[Dict[str, torch.Tensor]]]:
-    return build_train_batch(records=records)
+    return build_train_batch(records=records, uint8=uint8)
 
 
-def build_infer_batch(records):
+def build_infer_batch(records, uint8: bool = False):
     imgs, img_metas = [], []
     for record in records:
-        imgs.append(_img_tensor(record))
+        imgs.append(_img_tensor(record, uint8=uint8))
         img_metas.append(_img_meta(record))
 
     data = {
@@ -91,10 +101,11 @@ def build_infer_batch(records):
     return data, records
 
 
-def _img_tensor(record):
-    # convert from RGB to BGR
-    img = record.img[:, :, ::-1].copy()
-    return im2tensor(img)
+def _img_tensor(record, uint8: bool = False):
+    # RGB to BGR and HWC to CHW in a single copy, `img_to_tensor` gets a HWC view
+    # of the CHW copy so it doesn't need to copy it again
+    img = np.ascontiguousarray(record.img.transpose(2, 0, 1)[::-1])
+    return img_to_tensor(img.transpose(1, 2, 0), uint8=uint8)
 
 
 def _img_meta(record):
@@ -124,5 +135,4 @@ def _bboxes(record):
     if len(record.detection.label_ids) == 0:
         return torch.empty((0, 4))
     else:
-        xyxys = [bbox.xyxy for bbox in record.detection.bboxes]
-        return tensor(xyxys, dtype=torch.float32)
+        return record.detection.bboxes.to_tensor()
@@ -4,7 +4,6 @@ from icevision.imports import *
 from icevision.utils import *
 from icevision.core import *
 from icevision.data import *
-from icevision.models.interpretation import _move_to_device
 from icevision.core.record_components import LossesRecordComponent
 from icevision.models.mmdet.common.utils import mmdet_tensor_to_image
 
@@ -26,9 +25,8 @@ def loop_mmdet(dl, model, losses_stats, device):
     samples_plus_losses = []
 
     with torch.no_grad():
-        for data, sample in pbar(dl):
+        for data, sample in pbar(DevicePrefetcher(dl, device=device)):
             torch.manual_seed(0)
-            _, data = _move_to_device(None, data, device)
             loss = model(**data)
             loss = sum_losses_mmdet(loss)
 
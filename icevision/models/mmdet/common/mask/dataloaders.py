@@ -19,30 +19,39 @@ from icevision.models.mmdet.common.bbox.dataloaders import (
 )
 
 
-def train_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
+def train_dl(
+    dataset, batch_tfms=None, uint8: bool = False, **dataloader_kwargs
+) -> DataLoader:
     return transform_dl(
         dataset=dataset,
         build_batch=build_train_batch,
         batch_tfms=batch_tfms,
+        build_batch_kwargs={"uint8": uint8},
         **dataloader_kwargs
     )
 
 
-def valid_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
+def valid_dl(
+    dataset, batch_tfms=None, uint8: bool = False, **dataloader_kwargs
+) -> DataLoader:
     return transform_dl(
         dataset=dataset,
         build_batch=build_valid_batch,
         batch_tfms=batch_tfms,
+        build_batch_kwargs={"uint8": uint8},
         **dataloader_kwargs
     )
 
 
-def infer_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
+def infer_dl(
+    dataset, batch_tfms=None, uint8: bool = False, **dataloader_kwargs
+) -> DataLoader:
     """A `DataLoader` with a custom `collate_fn` that batches items as required for inferring the model.
 
     # Arguments
         dataset: Possibly a `Dataset` object, but more generally, any `Sequence` that returns records.
         batch_tfms: Transforms to be applied at the batch level.
+        uint8: If `True`, uint8 images are collated as uint8 tensors, see `img_to_tensor`.
         **dataloader_kwargs: Keyword arguments that will be internally passed to a Pytorch `DataLoader`.
         The parameter `collate_fn` is already defined internally and cannot be passed here.
 
@@ -53,22 +62,23 @@ def infer_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
         dataset=dataset,
         build_batch=build_infer_batch,
         batch_tfms=batch_tfms,
+        build_batch_kwargs={"uint8": uint8},
         **dataloader_kwargs
     )
 
 
 def build_valid_batch(
-    records: Sequence[RecordType],
+    records: Sequence[RecordType], uint8: bool = False
 ) -> Tuple[dict, List[Dict[str, torch.Tensor]]]:
-    return build_train_batch(records=records)
+    return build_train_batch(records=records, uint8=uint8)
 
 
 def build_train_batch(
-    records: Sequence[RecordType],
+    records: Sequence[RecordType], uint8: bool = False
 ) -> Tuple[dict, List[Dict[str, torch.Tensor]]]:
     images, labels, bboxes, masks, img_metas = [], [], [], [], []
     for record in records:
-        images.append(_img_tensor(record))
+        images.append(_img_tensor(record, uint8=uint8))
         img_metas.append(_img_meta_mask(record))
         labels.append(_labels(record))
         bboxes.append(_bboxes(record))
@@ -85,10 +95,10 @@ def build_train_batch(
     return data, records
 
 
-def build_infer_batch(records):
+def build_infer_batch(records, uint8: bool = False):
     imgs, img_metas = [], []
     for record in records:
-        imgs.append(_img_tensor(record))
+        imgs.append(_img_tensor(record, uint8=uint8))
         img_metas.append(_img_meta_mask(record))
 
     data = {
@@ -109,6 +119,6 @@ def _masks(record):
     if len(record.detection.masks) == 0:
         raise RuntimeError("Negative samples still needs to be implemented")
     else:
-        mask = record.detection.masks.data
+        mask = record.detection.mask_array().data
         _, h, w = mask.shape
         return BitmapMasks(mask, height=h, width=w)
@@ -9,7 +9,7 @@ from icevision.imports import *
 from icevision.utils import *
 from icevision.core import *
 from icevision.data import *
-from icevision.models.utils import _predict_from_dl
+from icevision.models.utils import _predict_from_dl, build_detection_prediction
 from icevision.models.mmdet.common.utils import *
 from icevision.models.mmdet.common.mask.dataloaders import *
 from icevision.models.mmdet.common.bbox.prediction import (
@@ -45,8 +45,9 @@ def predict(
     detection_threshold: float = 0.5,
     keep_images: bool = False,
     device: Optional[torch.device] = None,
+    uint8: bool = False,
 ) -> List[Prediction]:
-    batch, records = build_infer_batch(dataset)
+    batch, records = build_infer_batch(dataset, uint8=uint8)
 
     return _predict_batch(
         model=model,
@@ -82,7 +83,6 @@ def convert_raw_predictions(
     detection_threshold: float,
     keep_images: bool = False,
 ):
-
     # In inference, both "img" and "img_metas" are lists. Check out the `build_infer_batch()` definition
     # We need to convert that to a batch similar to train and valid batches
     if isinstance(batch["img"], list):
@@ -118,33 +118,21 @@ def convert_raw_prediction(
     keep_mask = scores > detection_threshold
     keep_scores = scores[keep_mask]
     keep_labels = labels[keep_mask]
-    keep_bboxes = [BBox.from_xyxy(*o) for o in bboxes[keep_mask]]
     keep_masks = MaskArray(np.vstack(raw_masks)[keep_mask])
 
     keep_labels = convert_background_from_last_to_zero(
         label_ids=keep_labels, class_map=record.detection.class_map
     )
 
-    pred = BaseRecord(
-        (
-            ScoresRecordComponent(),
-            ImageRecordComponent(),
-            InstancesLabelsRecordComponent(),
-            BBoxesRecordComponent(),
-            MasksRecordComponent(),
-        )
+    image = mmdet_tensor_to_image(sample["img"]) if keep_image else None
+    pred = build_detection_prediction(
+        record=record,
+        label_ids=keep_labels,
+        scores=keep_scores,
+        xyxy=bboxes[keep_mask],
+        masks=keep_masks,
+        img=image,
     )
-    pred.detection.set_class_map(record.detection.class_map)
-    pred.detection.set_scores(keep_scores)
-    pred.detection.set_labels_by_id(keep_labels)
-    pred.detection.set_bboxes(keep_bboxes)
-    pred.detection.set_masks(keep_masks)
-    pred.above_threshold = keep_mask
-
-    if keep_image:
-        image = mmdet_tensor_to_image(sample["img"])
-
-        pred.set_img(image)
-        record.set_img(image)
+    pred.pred.above_threshold = keep_mask
 
-    return Prediction(pred=pred, ground_truth=record)
+    return pred
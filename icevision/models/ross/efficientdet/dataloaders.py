@@ -11,12 +11,15 @@ from icevision.imports import *
 from icevision.models.utils import *
 
 
-def train_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
+def train_dl(
+    dataset, batch_tfms=None, uint8: bool = False, **dataloader_kwargs
+) -> DataLoader:
     """A `DataLoader` with a custom `collate_fn` that batches items as required for training the model.
 
     # Arguments
         dataset: Possibly a `Dataset` object, but more generally, any `Sequence` that returns records.
         batch_tfms: Transforms to be applied at the batch level.
+        uint8: If `True`, uint8 images are collated as uint8 tensors, see `img_to_tensor`.
         **dataloader_kwargs: Keyword arguments that will be internally passed to a Pytorch `DataLoader`.
         The parameter `collate_fn` is already defined internally and cannot be passed here.
 
@@ -27,16 +30,20 @@ def train_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
         dataset=dataset,
         build_batch=build_train_batch,
         batch_tfms=batch_tfms,
+        build_batch_kwargs={"uint8": uint8},
         **dataloader_kwargs
     )
 
 
-def valid_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
+def valid_dl(
+    dataset, batch_tfms=None, uint8: bool = False, **dataloader_kwargs
+) -> DataLoader:
     """A `DataLoader` with a custom `collate_fn` that batches items as required for validating the model.
 
     # Arguments
         dataset: Possibly a `Dataset` object, but more generally, any `Sequence` that returns records.
         batch_tfms: Transforms to be applied at the batch level.
+        uint8: If `True`, uint8 images are collated as uint8 tensors, see `img_to_tensor`.
         **dataloader_kwargs: Keyword arguments that will be internally passed to a Pytorch `DataLoader`.
         The parameter `collate_fn` is already defined internally and cannot be passed here.
 
@@ -47,16 +54,20 @@ def valid_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
         dataset=dataset,
         build_batch=build_valid_batch,
         batch_tfms=batch_tfms,
+        build_batch_kwargs={"uint8": uint8},
         **dataloader_kwargs
     )
 
 
-def infer_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
+def infer_dl(
+    dataset, batch_tfms=None, uint8: bool = False, **dataloader_kwargs
+) -> DataLoader:
     """A `DataLoader` with a custom `collate_fn` that batches items as required for inferring the model.
 
     # Arguments
         dataset: Possibly a `Dataset` object, but more generally, any `Sequence` that returns records.
         batch_tfms: Transforms to be applied at the batch level.
+        uint8: If `True`, uint8 images are collated as uint8 tensors, see `img_to_tensor`.
         **dataloader_kwargs: Keyword arguments that will be internally passed to a Pytorch `DataLoader`.
         The parameter `collate_fn` is already defined internally and cannot be passed here.
 
@@ -67,15 +78,17 @@ def infer_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
         dataset=dataset,
         build_batch=build_infer_batch,
         batch_tfms=batch_tfms,
+        build_batch_kwargs={"uint8": uint8},
         **dataloader_kwargs
     )
 
 
-def build_train_batch(records):
+def build_train_batch(records, uint8: bool = False):
     """Builds a batch in the format required by the model when training.
 
     # Arguments
         records: A `Sequence` of records.
+        uint8: If `True`, uint8 images are kept as uint8 tensors, see `img_to_tensor`.
 
     # Returns
         A tuple with two items. The first will be a tuple like `(images, targets)`,
@@ -91,7 +104,7 @@ def build_train_batch(records):
     ```
     """
     batch_images, batch_bboxes, batch_classes = zip(
-        *(process_train_record(record) for record in records)
+        *(process_train_record(record, uint8=uint8) for record in records)
     )
 
     # convert to tensors
@@ -105,11 +118,12 @@ def build_train_batch(records):
     return (batch_images, targets), records
 
 
-def build_valid_batch(records):
+def build_valid_batch(records, uint8: bool = False):
     """Builds a batch in the format required by the model when validating.
 
     # Arguments
         records: A `Sequence` of records.
+        uint8: If `True`, uint8 images are kept as uint8 tensors, see `img_to_tensor`.
 
     # Returns
         A tuple with two items. The first will be a tuple like `(images, targets)`,
@@ -124,7 +138,7 @@ def build_valid_batch(records):
     outs = model(*batch)
     ```
     """
-    (batch_images, targets), records = build_train_batch(records)
+    (batch_images, targets), records = build_train_batch(records, uint8=uint8)
 
     # convert to EffDet interface, when not training, dummy size and scale is required
     targets = dict(img_size=None, img_scale=None, **targets)
@@ -132,11 +146,12 @@ def build_valid_batch(records):
     return (batch_images, targets), records
 
 
-def build_infer_batch(records):
+def build_infer_batch(records, uint8: bool = False):
     """Builds a batch in the format required by the model when doing inference.
 
     # Arguments
         records: A `Sequence` of records.
+        uint8: If `True`, uint8 images are kept as uint8 tensors, see `img_to_tensor`.
 
     # Returns
         A tuple with two items. The first will be a tuple like `(images, targets)`,
@@ -149,7 +164,7 @@ def build_infer_batch(records):
     ```
     """
     batch_images, batch_sizes, batch_scales = zip(
-        *(process_infer_record(record) for record in records)
+        *(process_infer_record(record, uint8=uint8) for record in records)
     )
 
     # convert to tensors
@@ -163,22 +178,22 @@ def build_infer_batch(records):
     return (batch_images, targets), records
 
 
-def process_train_record(record) -> tuple:
+def process_train_record(record, uint8: bool = False) -> tuple:
     """Extracts information from record and prepares a format required by the EffDet training"""
-    image = im2tensor(record.img)
+    image = img_to_tensor(record.img, uint8=uint8)
     # background and dummy if no label in record
     classes = record.detection.label_ids if record.detection.label_ids else [0]
     bboxes = (
-        [bbox.yxyx for bbox in record.detection.bboxes]
+        record.detection.bboxes.yxyx
         if len(record.detection.label_ids) > 0
         else [[0, 0, 0, 0]]
     )
     return image, bboxes, classes
 
 
-def process_infer_record(record) -> tuple:
+def process_infer_record(record, uint8: bool = False) -> tuple:
     """Extracts information from record and prepares a format required by the EffDet inference"""
-    image = im2tensor(record.img)
+    image = img_to_tensor(record.img, uint8=uint8)
     image_size = image.shape[-2:]
     image_scale = 1.0
 
@@ -4,7 +4,7 @@ from icevision.imports import *
 from icevision.utils import *
 from icevision.core import *
 from icevision.data import *
-from icevision.models.utils import _predict_from_dl
+from icevision.models.utils import _predict_from_dl, build_detection_prediction
 from icevision.models.ross.efficientdet.dataloaders import *
 from effdet import DetBenchTrain, DetBenchPredict, unwrap_bench
 from icevision.models.inference import *
@@ -46,9 +46,9 @@ def predict(
     detection_threshold: float = 0.5,
     keep_images: bool = False,
     device: Optional[torch.device] = None,
+    uint8: bool = False,
 ) -> List[Prediction]:
-
-    batch, records = build_infer_batch(dataset)
+    batch, records = build_infer_batch(dataset, uint8=uint8)
     return _predict_batch(
         model=model,
         batch=batch,
@@ -85,31 +85,24 @@ def convert_raw_predictions(
 ) -> List[Prediction]:
     tensor_images, *_ = batch
     dets = raw_preds.detach().cpu().numpy()
+    if keep_images:
+        imgs = tensor_images.detach().cpu().numpy().transpose(0, 2, 3, 1)
+
     preds = []
-    for det, record, tensor_image in zip(dets, records, tensor_images):
+    for i, (det, record) in enumerate(zip(dets, records)):
         if detection_threshold > 0:
             scores = det[:, 4]
             keep = scores > detection_threshold
             det = det[keep]
 
-        pred = BaseRecord(
-            (
-                ScoresRecordComponent(),
-                ImageRecordComponent(),
-                InstancesLabelsRecordComponent(),
-                BBoxesRecordComponent(),
-            )
+        pred = build_detection_prediction(
+            record=record,
+            label_ids=det[:, 5].astype(int),
+            scores=det[:, 4],
+            xyxy=det[:, :4],
+            img=imgs[i] if keep_images else None,
         )
-
-        pred.detection.set_class_map(record.detection.class_map)
-        pred.detection.set_labels_by_id(det[:, 5].astype(int))
-        pred.detection.set_bboxes([BBox.from_xyxy(*xyxy) for xyxy in det[:, :4]])
-        pred.detection.set_scores(det[:, 4])
-
-        if keep_images:
-            record.set_img(tensor_to_image(tensor_image))
-
-        preds.append(Prediction(pred=pred, ground_truth=record))
+        preds.append(pred)
 
     return preds
 
@@ -0,0 +1,248 @@
+__all__ = ["MicroBatchServer"]
+
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from icevision.imports import *
+from icevision.core import *
+from icevision.data import *
+from icevision.models.inference import process_bbox_predictions
+from icevision.tfms.albumentations import albumentations_adapter
+
+
+@dataclass
+class _Request:
+    img: PIL.Image.Image
+    future: asyncio.Future
+    arrival: float
+
+
+class MicroBatchServer:
+    """Local inference server that groups concurrent requests into micro-batches.
+
+    Requests are queued, a batch is sent to the model when it has `max_batch_size`
+    images or when `max_latency` seconds passed since its first request arrived.
+    `predict_fn` (e.g. `faster_rcnn.predict`) runs once per batch in a worker
+    thread, so new requests keep being queued while the model runs. Boxes are
+    mapped back to the size of each original image like in `end2end_detect`.
+
+    Can be used directly from asyncio with `predict` or over HTTP with `serve`:
+    - `POST /predict` with an encoded image (jpg, png, ...) as body.
+    - `GET /stats` with latency percentiles and throughput.
+
+    # Arguments
+        model: Model to run inference with.
+        predict_fn: `predict` function of the model family.
+        transforms: The same transforms used for validation.
+        class_map: ClassMap with the available categories.
+        detection_threshold: Confidence threshold below which boxes are discarded.
+        max_batch_size: Maximum number of images predicted at once.
+        max_latency: Maximum time in seconds a request waits for the batch to fill.
+        predict_kwargs: Extra arguments passed to `predict_fn`, e.g. `device` or
+            `uint8=True` for models normalizing their inputs with `add_normalize_hook`.
+    """
+
+    def __init__(
+        self,
+        model: nn.Module,
+        predict_fn: Callable,
+        transforms: albumentations_adapter.Adapter,
+        class_map: ClassMap,
+        detection_threshold: float = 0.5,
+        max_batch_size: int = 8,
+        max_latency: float = 0.01,
+        **predict_kwargs,
+    ):
+        self.model = model
+        self.predict_fn = predict_fn
+        self.transforms = transforms
+        self.class_map = class_map
+        self.detection_threshold = detection_threshold
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.predict_kwargs = predict_kwargs
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
+        # a single worker, batches are predicted one at a time
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.reset_stats()
+
+    async def start(self) -> None:
+        "Starts forming batches, called by `serve` and by the first `predict`"
+        if self._batch_task is None:
+            self._queue = asyncio.Queue()
+            self._batch_task = asyncio.get_running_loop().create_task(
+                self._batch_loop()
+            )
+
+    async def stop(self) -> None:
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+            try:
+                await self._batch_task
+            except asyncio.CancelledError:
+                pass
+            self._batch_task = None
+
+    async def predict(self, img: Union[PIL.Image.Image, np.ndarray]) -> dict:
+        """Queues `img` and waits for the prediction.
+
+        # Returns
+            A json serializable dict with `labels`, `label_ids`, `scores` and
+            `bboxes` (xyxy on the original image), and the image `width` and `height`.
+        """
+        await self.start()
+        if isinstance(img, np.ndarray):
+            img = PIL.Image.fromarray(img)
+        loop = asyncio.get_running_loop()
+        request = _Request(img=img, future=loop.create_future(), arrival=loop.time())
+        await self._queue.put(request)
+        return await request.future
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = batch[0].arrival + self.max_latency
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # requests that arrived while the previous batch was running
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            imgs = [request.img for request in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self._predict_batch, imgs
+                )
+            except Exception as e:
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+
+            done = loop.time()
+            self._batch_sizes.append(len(batch))
+            for request, result in zip(batch, results):
+                self._latencies.append(done - request.arrival)
+                if not request.future.done():
+                    request.future.set_result(result)
+            self._num_requests += len(batch)
+            self._first_arrival = self._first_arrival or batch[0].arrival
+            self._last_done = done
+
+    def _predict_batch(self, imgs: List[PIL.Image.Image]) -> List[dict]:
+        infer_ds = Dataset.from_images(
+            [np.array(img) for img in imgs], self.transforms, class_map=self.class_map
+        )
+        preds = self.predict_fn(
+            self.model,
+            infer_ds,
+            detection_threshold=self.detection_threshold,
+            **self.predict_kwargs,
+        )
+        return [
+            self._pred_to_dict(
+                process_bbox_predictions(pred, img, self.transforms.tfms_list)
+            )
+            for pred, img in zip(preds, imgs)
+        ]
+
+    @staticmethod
+    def _pred_to_dict(pred: Prediction) -> dict:
+        detection = pred.pred.detection
+        height, width = pred.pred.img.shape[:2]
+        return {
+            "labels": list(detection.labels),
+            "label_ids": [int(o) for o in detection.label_ids],
+            "scores": np.asarray(detection.scores, dtype=float).tolist(),
+            "bboxes": BBoxes.from_bboxes(detection.bboxes).xyxy.tolist(),
+            "width": width,
+            "height": height,
+        }
+
+    def reset_stats(self) -> None:
+        self._latencies = deque(maxlen=10_000)
+        self._batch_sizes = deque(maxlen=10_000)
+        self._num_requests = 0
+        self._first_arrival, self._last_done = None, None
+
+    def stats(self) -> dict:
+        """Latency percentiles (in seconds) of the last 10000 requests, mean batch
+        size and throughput (requests per second) since the first request.
+        """
+        if not self._latencies:
+            return {"num_requests": 0}
+        latencies = np.array(self._latencies)
+        elapsed = self._last_done - self._first_arrival
+        return {
+            "num_requests": self._num_requests,
+            "latency_p50": float(np.percentile(latencies, 50)),
+            "latency_p99": float(np.percentile(latencies, 99)),
+            "mean_batch_size": float(np.mean(self._batch_sizes)),
+            "throughput": self._num_requests / elapsed if elapsed > 0 else None,
+        }
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080):
+        """Starts the HTTP server, returns the `asyncio` server (use `port=0` to pick
+        a free port, available at `server.sockets[0].getsockname()`).
+        """
+        await self.start()
+        return await asyncio.start_server(self._handle_http, host=host, port=port)
+
+    def run(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        "Blocking version of `serve`, runs until interrupted"
+
+        async def _run():
+            server = await self.serve(host=host, port=port)
+            async with server:
+                await server.serve_forever()
+
+        asyncio.run(_run())
+
+    async def _handle_http(self, reader, writer) -> None:
+        try:
+            status, payload = await self._route(reader)
+        except Exception as e:
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+        body = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode() + body)
+        await writer.drain()
+        writer.close()
+
+    async def _route(self, reader) -> Tuple[HTTPStatus, dict]:
+        request_line = (await reader.readline()).decode()
+        method, path, *_ = request_line.split() or [None, None]
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, value = line.decode().split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+        if method == "POST" and path == "/predict":
+            try:
+                img = PIL.Image.open(io.BytesIO(body)).convert("RGB")
+            except PIL.UnidentifiedImageError:
+                return HTTPStatus.BAD_REQUEST, {"error": "body is not a valid image"}
+            return HTTPStatus.OK, await self.predict(img)
+        if method == "GET" and path == "/stats":
+            return HTTPStatus.OK, self.stats()
+        return HTTPStatus.NOT_FOUND, {"error": f"{method} {path} not found"}
@@ -9,7 +9,11 @@ __all__ = [
 from icevision.imports import *
 from icevision.utils import *
 from icevision.core import *
-from icevision.models.utils import _predict_from_dl
+from icevision.models.utils import (
+    _predict_from_dl,
+    tensors_to_numpy,
+    build_detection_prediction,
+)
 from icevision.data import *
 from icevision.models.torchvision.faster_rcnn.dataloaders import *
 from icevision.models.inference import *
@@ -44,8 +48,9 @@ def predict(
     detection_threshold: float = 0.5,
     keep_images: bool = False,
     device: Optional[torch.device] = None,
+    uint8: bool = False,
 ) -> List[Prediction]:
-    batch, records = build_infer_batch(dataset)
+    batch, records = build_infer_batch(dataset, uint8=uint8)
     return _predict_batch(
         model=model,
         batch=batch,
@@ -80,16 +85,31 @@ def convert_raw_predictions(
     detection_threshold: float,
     keep_images: bool = False,
 ):
-    return [
-        convert_raw_prediction(
-            sample=sample,
-            raw_pred=raw_pred,
+    # outputs of all images are moved to host at once
+    keys = ["labels", "scores", "boxes"]
+    arrays = tensors_to_numpy([raw_pred[k] for raw_pred in raw_preds for k in keys])
+
+    preds = []
+    for i, (sample, record) in enumerate(zip(zip(*batch), records)):
+        labels, scores, boxes = arrays[i * len(keys) : (i + 1) * len(keys)]
+        above_threshold = scores >= detection_threshold
+
+        img = None
+        if keep_images:
+            tensor_image, *_ = sample
+            img = tensor_to_image(tensor_image)
+
+        pred = build_detection_prediction(
             record=record,
-            detection_threshold=detection_threshold,
-            keep_image=keep_images,
+            label_ids=labels[above_threshold],
+            scores=scores[above_threshold],
+            xyxy=boxes[above_threshold],
+            img=img,
         )
-        for sample, raw_pred, record in zip(zip(*batch), raw_preds, records)
-    ]
+        pred.detection.above_threshold = above_threshold
+        preds.append(pred)
+
+    return preds
 
 
 def convert_raw_prediction(
@@ -99,42 +119,13 @@ def convert_raw_prediction(
     detection_threshold: float,
     keep_image: bool = False,
 ):
-    above_threshold = raw_pred["scores"] >= detection_threshold
-
-    # convert predictions
-    labels = raw_pred["labels"][above_threshold]
-    labels = labels.detach().cpu().numpy()
-
-    scores = raw_pred["scores"][above_threshold]
-    scores = scores.detach().cpu().numpy()
-
-    boxes = raw_pred["boxes"][above_threshold]
-    bboxes = []
-    for box_tensor in boxes:
-        xyxy = box_tensor.cpu().numpy()
-        bbox = BBox.from_xyxy(*xyxy)
-        bboxes.append(bbox)
-
-    # build prediction
-    pred = BaseRecord(
-        (
-            ScoresRecordComponent(),
-            ImageRecordComponent(),
-            InstancesLabelsRecordComponent(),
-            BBoxesRecordComponent(),
-        )
-    )
-    pred.detection.set_class_map(record.detection.class_map)
-    pred.detection.set_scores(scores)
-    pred.detection.set_labels_by_id(labels)
-    pred.detection.set_bboxes(bboxes)
-    pred.detection.above_threshold = above_threshold
-
-    if keep_image:
-        tensor_image, *_ = sample
-        record.set_img(tensor_to_image(tensor_image))
-
-    return Prediction(pred=pred, ground_truth=record)
+    return convert_raw_predictions(
+        batch=[[o] for o in sample],
+        raw_preds=[raw_pred],
+        records=[record],
+        detection_threshold=detection_threshold,
+        keep_images=keep_image,
+    )[0]
 
 
 end2end_detect = partial(_end2end_detect, predict_fn=predict)
@@ -19,12 +19,15 @@ from icevision.models.torchvision.faster_rcnn.dataloaders import (
 )
 
 
-def train_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
+def train_dl(
+    dataset, batch_tfms=None, uint8: bool = False, **dataloader_kwargs
+) -> DataLoader:
     """A `DataLoader` with a custom `collate_fn` that batches items as required for training the model.
 
     # Arguments
         dataset: Possibly a `Dataset` object, but more generally, any `Sequence` that returns records.
         batch_tfms: Transforms to be applied at the batch level.
+        uint8: If `True`, uint8 images are collated as uint8 tensors, see `img_to_tensor`.
         **dataloader_kwargs: Keyword arguments that will be internally passed to a Pytorch `DataLoader`.
         The parameter `collate_fn` is already defined internally and cannot be passed here.
 
@@ -35,16 +38,20 @@ def train_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
         dataset=dataset,
         build_batch=build_train_batch,
         batch_tfms=batch_tfms,
+        build_batch_kwargs={"uint8": uint8},
         **dataloader_kwargs
     )
 
 
-def valid_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
+def valid_dl(
+    dataset, batch_tfms=None, uint8: bool = False, **dataloader_kwargs
+) -> DataLoader:
     """A `DataLoader` with a custom `collate_fn` that batches items as required for validating the model.
 
     # Arguments
         dataset: Possibly a `Dataset` object, but more generally, any `Sequence` that returns records.
         batch_tfms: Transforms to be applied at the batch level.
+        uint8: If `True`, uint8 images are collated as uint8 tensors, see `img_to_tensor`.
         **dataloader_kwargs: Keyword arguments that will be internally passed to a Pytorch `DataLoader`.
         The parameter `collate_fn` is already defined internally and cannot be passed here.
 
@@ -55,18 +62,19 @@ def valid_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
         dataset=dataset,
         build_batch=build_valid_batch,
         batch_tfms=batch_tfms,
+        build_batch_kwargs={"uint8": uint8},
         **dataloader_kwargs
     )
 
 
-def _build_keypoints_train_sample(record: RecordType):
+def _build_keypoints_train_sample(record: RecordType, uint8: bool = False):
     assert (
         len(record.detection.label_ids)
         == len(record.detection.bboxes)
         == len(record.detection.keypoints)
     )
 
-    image, target = _build_train_sample(record=record)
+    image, target = _build_train_sample(record=record, uint8=uint8)
 
     # If no labels and bboxes are present, use as negative samples as described in
     # https://github.com/pytorch/vision/releases/tag/v0.6.0
@@ -80,13 +88,14 @@ def _build_keypoints_train_sample(record: RecordType):
 
 
 def build_train_batch(
-    records: List[RecordType],
+    records: List[RecordType], uint8: bool = False
 ) -> Tuple[List[torch.Tensor], List[Dict[str, torch.Tensor]]]:
     """Builds a batch in the format required by the model when training.
 
     # Arguments
         records: A `Sequence` of records.
         batch_tfms: Transforms to be applied at the batch level.
+        uint8: If `True`, uint8 images are kept as uint8 tensors, see `img_to_tensor`.
 
     # Returns
         A tuple with two items. The first will be a tuple like `(images, targets)`,
@@ -103,7 +112,7 @@ def build_train_batch(
     """
     images, targets = [], []
     for record in records:
-        image, target = _build_keypoints_train_sample(record)
+        image, target = _build_keypoints_train_sample(record, uint8=uint8)
         images.append(image)
         targets.append(target)
 
@@ -111,13 +120,14 @@ def build_train_batch(
 
 
 def build_valid_batch(
-    records: List[RecordType],
+    records: List[RecordType], uint8: bool = False
 ) -> Tuple[List[torch.Tensor], List[Dict[str, torch.Tensor]]]:
     """Builds a batch in the format required by the model when validating.
 
     # Arguments
         records: A `Sequence` of records.
         batch_tfms: Transforms to be applied at the batch level.
+        uint8: If `True`, uint8 images are kept as uint8 tensors, see `img_to_tensor`.
 
     # Returns
         A tuple with two items. The first will be a tuple like `(images, targets)`,
@@ -132,4 +142,4 @@ def build_valid_batch(
     outs = model(*batch)
     ```
     """
-    return build_train_batch(records=records)
+    return build_train_batch(records=records, uint8=uint8)
@@ -5,15 +5,14 @@ __all__ = [
     "convert_raw_predictions",
 ]
 
-from itertools import chain
 from icevision.imports import *
 from icevision.core import *
 from icevision.utils import *
 from icevision.data import *
-from icevision.models.utils import _predict_from_dl
+from icevision.models.utils import _predict_from_dl, tensors_to_numpy
 from icevision.models.torchvision.keypoint_rcnn.dataloaders import *
 from icevision.models.torchvision.faster_rcnn.prediction import (
-    convert_raw_prediction as faster_convert_raw_prediction,
+    convert_raw_predictions as faster_convert_raw_predictions,
 )
 
 
@@ -46,8 +45,9 @@ def predict(
     detection_threshold: float = 0.5,
     keep_images: bool = False,
     device: Optional[torch.device] = None,
+    uint8: bool = False,
 ) -> List[Prediction]:
-    batch, records = build_infer_batch(dataset)
+    batch, records = build_infer_batch(dataset, uint8=uint8)
     return _predict_batch(
         model=model,
         batch=batch,
@@ -82,16 +82,30 @@ def convert_raw_predictions(
     detection_threshold: float,
     keep_images: bool = False,
 ):
-    return [
-        convert_raw_prediction(
-            sample=sample,
-            raw_pred=raw_pred,
-            record=record,
-            detection_threshold=detection_threshold,
-            keep_image=keep_images,
-        )
-        for sample, raw_pred, record in zip(zip(*batch), raw_preds, records)
-    ]
+    preds = faster_convert_raw_predictions(
+        batch=batch,
+        raw_preds=raw_preds,
+        records=records,
+        detection_threshold=detection_threshold,
+        keep_images=keep_images,
+    )
+
+    keys = ["keypoints", "keypoints_scores"]
+    arrays = tensors_to_numpy([raw_pred[k] for raw_pred in raw_preds for k in keys])
+    for i, pred in enumerate(preds):
+        above_threshold = pred.detection.above_threshold
+        kps, kps_scores = arrays[i * len(keys) : (i + 1) * len(keys)]
+        kps, kps_scores = kps[above_threshold], kps_scores[above_threshold]
+        kps = kps.reshape(len(kps), kps.shape[1] * kps.shape[2])
+        # `kps.sum(1) > 0` prevents empty `KeyPoints` objects to be instantiated.
+        # E.g. `[0, 0, 0, 0, 0, 0]` is a flattened list of 2 points `(0, 0, 0)` and `(0, 0, 0)`. We don't want a `KeyPoints` object to be created on top of this list.
+        keypoints = [KeyPoints.from_xyv(k, None) for k in kps[kps.sum(1) > 0]]
+
+        pred.pred.add_component(KeyPointsRecordComponent())
+        pred.pred.detection.add_keypoints(keypoints)
+        pred.pred.detection.keypoints_scores = kps_scores
+
+    return preds
 
 
 def convert_raw_prediction(
@@ -101,29 +115,10 @@ def convert_raw_prediction(
     detection_threshold: float,
     keep_image: bool = False,
 ):
-    pred = faster_convert_raw_prediction(
-        sample=sample,
-        raw_pred=raw_pred,
-        record=record,
+    return convert_raw_predictions(
+        batch=[[o] for o in sample],
+        raw_preds=[raw_pred],
+        records=[record],
         detection_threshold=detection_threshold,
-        keep_image=keep_image,
-    )
-
-    above_threshold = pred.detection.above_threshold
-    kps = raw_pred["keypoints"][above_threshold]
-    keypoints = []
-    for k in kps:
-        k = k.cpu().numpy()
-        k = list(chain.from_iterable(k))
-        # `if sum(k) > 0` prevents empty `KeyPoints` objects to be instantiated.
-        # E.g. `k = [0, 0, 0, 0, 0, 0]` is a flattened list of 2 points `(0, 0, 0)` and `(0, 0, 0)`. We don't want a `KeyPoints` object to be created on top of this list.
-        if sum(k) > 0:
-            keypoints.append(KeyPoints.from_xyv(k, None))
-
-    pred.pred.add_component(KeyPointsRecordComponent())
-    pred.pred.detection.add_keypoints(keypoints)
-    pred.pred.detection.keypoints_scores = (
-        raw_pred["keypoints_scores"][above_threshold].detach().cpu().numpy()
-    )
-
-    return pred
+        keep_images=keep_image,
+    )[0]
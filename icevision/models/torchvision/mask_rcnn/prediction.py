@@ -9,10 +9,10 @@ from icevision.imports import *
 from icevision.utils import *
 from icevision.core import *
 from icevision.data import *
-from icevision.models.utils import _predict_from_dl
+from icevision.models.utils import _predict_from_dl, tensors_to_numpy
 from icevision.models.torchvision.mask_rcnn.dataloaders import *
 from icevision.models.torchvision.faster_rcnn.prediction import (
-    convert_raw_prediction as faster_convert_raw_prediction,
+    convert_raw_predictions as faster_convert_raw_predictions,
 )
 
 
@@ -48,8 +48,9 @@ def predict(
     mask_threshold: float = 0.5,
     keep_images: bool = False,
     device: Optional[torch.device] = None,
+    uint8: bool = False,
 ) -> List[Prediction]:
-    batch, records = build_infer_batch(dataset)
+    batch, records = build_infer_batch(dataset, uint8=uint8)
     return _predict_batch(
         model=model,
         batch=batch,
@@ -86,17 +87,28 @@ def convert_raw_predictions(
     mask_threshold: float,
     keep_images: bool = False,
 ):
-    return [
-        convert_raw_prediction(
-            sample=sample,
-            raw_pred=raw_pred,
-            record=record,
-            detection_threshold=detection_threshold,
-            mask_threshold=mask_threshold,
-            keep_image=keep_images,
-        )
-        for sample, raw_pred, record in zip(zip(*batch), raw_preds, records)
-    ]
+    preds = faster_convert_raw_predictions(
+        batch=batch,
+        raw_preds=raw_preds,
+        records=records,
+        detection_threshold=detection_threshold,
+        keep_images=keep_images,
+    )
+
+    # masks are binarized on the device, only the ones above the detection
+    # threshold are moved to host
+    masks = []
+    for pred, raw_pred in zip(preds, raw_preds):
+        masks_probs = raw_pred["masks"]
+        above_threshold = torch.from_numpy(pred.detection.above_threshold)
+        masks_probs = masks_probs[above_threshold.to(masks_probs.device), 0]
+        masks.append(masks_probs > mask_threshold)
+
+    for pred, mask in zip(preds, tensors_to_numpy(masks)):
+        pred.pred.add_component(MasksRecordComponent())
+        pred.detection.set_masks(MaskArray(mask))
+
+    return preds
 
 
 def convert_raw_prediction(
@@ -107,22 +119,11 @@ def convert_raw_prediction(
     mask_threshold: float,
     keep_image: bool = False,
 ):
-    pred = faster_convert_raw_prediction(
-        sample=sample,
-        raw_pred=raw_pred,
-        record=record,
+    return convert_raw_predictions(
+        batch=[[o] for o in sample],
+        raw_preds=[raw_pred],
+        records=[record],
         detection_threshold=detection_threshold,
-        keep_image=keep_image,
-    )
-
-    above_threshold = pred.detection.above_threshold
-    masks_probs = raw_pred["masks"][above_threshold]
-    masks_probs = masks_probs.detach().cpu().numpy()
-    # convert probabilities to 0 or 1 based on mask_threshold
-    masks = masks_probs > mask_threshold
-    masks = MaskArray(masks.squeeze(1))
-
-    pred.pred.add_component(MasksRecordComponent())
-    pred.detection.set_masks(masks)
-
-    return pred
+        mask_threshold=mask_threshold,
+        keep_images=keep_image,
+    )[0]
@@ -12,12 +12,15 @@ from icevision.core import *
 from icevision.models.utils import *
 
 
-def train_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
+def train_dl(
+    dataset, batch_tfms=None, uint8: bool = False, **dataloader_kwargs
+) -> DataLoader:
     """A `DataLoader` with a custom `collate_fn` that batches items as required for training the model.
 
     # Arguments
         dataset: Possibly a `Dataset` object, but more generally, any `Sequence` that returns records.
         batch_tfms: Transforms to be applied at the batch level.
+        uint8: If `True`, uint8 images are collated as uint8 tensors, see `img_to_tensor`.
         **dataloader_kwargs: Keyword arguments that will be internally passed to a Pytorch `DataLoader`.
         The parameter `collate_fn` is already defined internally and cannot be passed here.
 
@@ -28,16 +31,17 @@ def train_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
         dataset=dataset,
         build_batch=build_train_batch,
         batch_tfms=batch_tfms,
+        build_batch_kwargs={"uint8": uint8},
         **dataloader_kwargs
     )
 
 
 def _build_train_sample(
-    record: RecordType,
+    record: RecordType, uint8: bool = False
 ) -> Tuple[torch.Tensor, Dict[str, torch.Tensor]]:
     assert len(record.detection.label_ids) == len(record.detection.bboxes)
 
-    image = im2tensor(record.img)
+    image = img_to_tensor(record.img, uint8=uint8)
 
     # If no labels and bboxes are present, use as negative samples
     if len(record.detection.label_ids) == 0:
@@ -46,11 +50,8 @@ def _build_train_sample(
         labels = tensor(record.detection.label_ids, dtype=torch.int64) - 1
 
         img_width, img_height = record.width, record.height
-        xyxys = [
-            bbox.relative_xcycwh(img_width, img_height)
-            for bbox in record.detection.bboxes
-        ]
-        boxes = tensor(xyxys, dtype=torch.float32)
+        xcycwhs = record.detection.bboxes.relative_xcycwh(img_width, img_height)
+        boxes = tensor(xcycwhs, dtype=torch.float32)
 
         target = torch.zeros((len(labels), 6))
         target[:, 1:] = torch.cat([labels.unsqueeze(1), boxes], 1)
@@ -59,12 +60,13 @@ def _build_train_sample(
 
 
 def build_train_batch(
-    records: Sequence[RecordType],
+    records: Sequence[RecordType], uint8: bool = False
 ) -> Tuple[List[torch.Tensor], List[Dict[str, torch.Tensor]]]:
     """Builds a batch in the format required by the model when training.
 
     # Arguments
         records: A `Sequence` of records.
+        uint8: If `True`, uint8 images are kept as uint8 tensors, see `img_to_tensor`.
 
     # Returns
         A tuple with two items. The first will be a tuple like `(images, targets)`,
@@ -81,7 +83,7 @@ def build_train_batch(
     """
     images, targets = [], []
     for i, record in enumerate(records):
-        image, target = _build_train_sample(record)
+        image, target = _build_train_sample(record, uint8=uint8)
         images.append(image)
 
         if target.numel() > 0:
@@ -92,12 +94,15 @@ def build_train_batch(
     return (torch.stack(images, 0), torch.cat(targets, 0)), records
 
 
-def valid_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
+def valid_dl(
+    dataset, batch_tfms=None, uint8: bool = False, **dataloader_kwargs
+) -> DataLoader:
     """A `DataLoader` with a custom `collate_fn` that batches items as required for validating the model.
 
     # Arguments
         dataset: Possibly a `Dataset` object, but more generally, any `Sequence` that returns records.
         batch_tfms: Transforms to be applied at the batch level.
+        uint8: If `True`, uint8 images are collated as uint8 tensors, see `img_to_tensor`.
         **dataloader_kwargs: Keyword arguments that will be internally passed to a Pytorch `DataLoader`.
         The parameter `collate_fn` is already defined internally and cannot be passed here.
 
@@ -108,17 +113,19 @@ def valid_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
         dataset=dataset,
         build_batch=build_valid_batch,
         batch_tfms=batch_tfms,
+        build_batch_kwargs={"uint8": uint8},
         **dataloader_kwargs
     )
 
 
 def build_valid_batch(
-    records: List[RecordType],
+    records: List[RecordType], uint8: bool = False
 ) -> Tuple[List[torch.Tensor], Dict[str, torch.Tensor]]:
     """Builds a batch in the format required by the model when validating.
 
     # Arguments
         records: A `Sequence` of records.
+        uint8: If `True`, uint8 images are kept as uint8 tensors, see `img_to_tensor`.
 
     # Returns
         A tuple with two items. The first will be a tuple like `(images, targets)`,
@@ -133,15 +140,18 @@ def build_valid_batch(
     outs = model(*batch)
     ```
     """
-    return build_train_batch(records=records)
+    return build_train_batch(records=records, uint8=uint8)
 
 
-def infer_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
+def infer_dl(
+    dataset, batch_tfms=None, uint8: bool = False, **dataloader_kwargs
+) -> DataLoader:
     """A `DataLoader` with a custom `collate_fn` that batches items as required for inferring the model.
 
     # Arguments
         dataset: Possibly a `Dataset` object, but more generally, any `Sequence` that returns records.
         batch_tfms: Transforms to be applied at the batch level.
+        uint8: If `True`, uint8 images are collated as uint8 tensors, see `img_to_tensor`.
         **dataloader_kwargs: Keyword arguments that will be internally passed to a Pytorch `DataLoader`.
         The parameter `collate_fn` is already defined internally and cannot be passed here.
 
@@ -152,15 +162,17 @@ def infer_dl(dataset, batch_tfms=None, **dataloader_kwargs) -> DataLoader:
         dataset=dataset,
         build_batch=build_infer_batch,
         batch_tfms=batch_tfms,
+        build_batch_kwargs={"uint8": uint8},
         **dataloader_kwargs
     )
 
 
-def build_infer_batch(records: Sequence[RecordType]):
+def build_infer_batch(records: Sequence[RecordType], uint8: bool = False):
     """Builds a batch in the format required by the model when doing inference.
 
     # Arguments
         records: A `Sequence` of records.
+        uint8: If `True`, uint8 images are kept as uint8 tensors, see `img_to_tensor`.
 
     # Returns
         A tuple with two items. The first will be a tuple like `(images, targets)`,
@@ -175,7 +187,7 @@ def build_infer_batch(records: Sequence[RecordType]):
     outs = model(*batch)
     ```
     """
-    tensor_imgs = [im2tensor(record.img) for record in records]
+    tensor_imgs = [img_to_tensor(record.img, uint8=uint8) for record in records]
     tensor_imgs = torch.stack(tensor_imgs)
 
     return (tensor_imgs,), records
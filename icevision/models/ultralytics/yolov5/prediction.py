@@ -4,7 +4,11 @@ from icevision.imports import *
 from icevision.utils import *
 from icevision.core import *
 from icevision.data import *
-from icevision.models.utils import _predict_from_dl
+from icevision.models.utils import (
+    _predict_from_dl,
+    tensors_to_numpy,
+    build_detection_prediction,
+)
 from icevision.models.ultralytics.yolov5.dataloaders import *
 from yolov5.utils.general import non_max_suppression
 from icevision.models.inference import *
@@ -53,8 +57,9 @@ def predict(
     nms_iou_threshold: float = 0.45,
     keep_images: bool = False,
     device: Optional[torch.device] = None,
+    uint8: bool = False,
 ) -> List[Prediction]:
-    batch, records = build_infer_batch(dataset)
+    batch, records = build_infer_batch(dataset, uint8=uint8)
     return _predict_batch(
         model=model,
         batch=batch,
@@ -94,28 +99,20 @@ def convert_raw_predictions(
     dets = non_max_suppression(
         raw_preds, conf_thres=detection_threshold, iou_thres=nms_iou_threshold
     )
-    dets = [d.detach().cpu().numpy() for d in dets]
-    preds = []
-    for det, record, tensor_image in zip(dets, records, batch):
+    dets = tensors_to_numpy(dets)
+    if keep_images:
+        imgs = batch.detach().cpu().numpy().transpose(0, 2, 3, 1)
 
-        pred = BaseRecord(
-            (
-                ScoresRecordComponent(),
-                ImageRecordComponent(),
-                InstancesLabelsRecordComponent(),
-                BBoxesRecordComponent(),
-            )
+    preds = []
+    for i, (det, record) in enumerate(zip(dets, records)):
+        pred = build_detection_prediction(
+            record=record,
+            label_ids=det[:, 5].astype(int) + 1,
+            scores=det[:, 4],
+            xyxy=det[:, :4],
+            img=imgs[i] if keep_images else None,
         )
-
-        pred.detection.set_class_map(record.detection.class_map)
-        pred.detection.set_labels_by_id(det[:, 5].astype(int) + 1)
-        pred.detection.set_bboxes([BBox.from_xyxy(*xyxy) for xyxy in det[:, :4]])
-        pred.detection.set_scores(det[:, 4])
-
-        if keep_images:
-            record.set_img(tensor_to_image(tensor_image))
-
-        preds.append(Prediction(pred=pred, ground_truth=record))
+        preds.append(pred)
 
     return preds
 
@@ -16,7 +16,6 @@ from icevision.models.ultralytics.yolov5.prediction import (
 )
 from icevision.models.interpretation import Interpretation
 
-from icevision.models.interpretation import _move_to_device
 from icevision.core.record_components import LossesRecordComponent
 from yolov5.utils.loss import ComputeLoss
 
@@ -51,9 +50,8 @@ def loop_yolo(dl, model, losses_stats, device):
     compute_loss = ComputeLoss(model)
 
     with torch.no_grad():
-        for (x, y), sample in pbar(dl):
+        for (x, y), sample in pbar(DevicePrefetcher(dl, device=device)):
             torch.manual_seed(0)
-            x, y = _move_to_device(x, y, device)
             preds = model(x)
             loss = compute_loss(preds, y)[0]
             loss = {
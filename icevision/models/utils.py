@@ -5,6 +5,11 @@ __all__ = [
     "transform_dl",
     "apply_batch_tfms",
     "_predict_from_dl",
+    "tensors_to_numpy",
+    "build_detection_prediction",
+    "img_to_tensor",
+    "normalize_imgs",
+    "add_normalize_hook",
 ]
 
 from icevision.imports import *
@@ -13,6 +18,9 @@ from icevision.core import *
 from icevision.data import *
 from icevision.parsers import *
 
+if SoftDependencies.effdet:
+    from effdet import DetBenchTrain, DetBenchPredict
+
 BN_TYPES = (nn.BatchNorm1d, nn.BatchNorm2d, nn.BatchNorm3d)
 
 
@@ -90,24 +98,262 @@ def unload_records(build_batch):
     return inner
 
 
-@torch.no_grad()
 def _predict_from_dl(
     predict_fn,
     model: nn.Module,
     infer_dl: DataLoader,
     keep_images: bool = False,
     show_pbar: bool = True,
+    sink: Optional[PredictionSink] = None,
+    stream: bool = False,
+    **predict_kwargs,
+) -> Union[List[Prediction], Iterator[Prediction], None]:
+    """Predicts on all batches of `infer_dl`.
+
+    # Arguments
+        sink: If given, the predictions of each batch are written to it and not kept
+            in memory. Batches already written by a resumed sink are skipped, the
+            sink is closed once all the batches are written.
+        stream: If `True`, returns a generator that predicts one batch at a time
+            instead of a list.
+
+    # Returns
+        A list with all predictions, a generator if `stream=True` or `None` if a
+        `sink` is given (and `stream=False`).
+    """
+    batches = _predict_batches_from_dl(
+        predict_fn=predict_fn,
+        model=model,
+        infer_dl=infer_dl,
+        keep_images=keep_images,
+        show_pbar=show_pbar,
+        sink=sink,
+        **predict_kwargs,
+    )
+    if stream:
+        return itertools.chain.from_iterable(batches)
+    if sink is not None:
+        for _ in batches:
+            pass
+        return None
+    return list(itertools.chain.from_iterable(batches))
+
+
+def _predict_batches_from_dl(
+    predict_fn,
+    model: nn.Module,
+    infer_dl: DataLoader,
+    keep_images: bool = False,
+    show_pbar: bool = True,
+    sink: Optional[PredictionSink] = None,
     **predict_kwargs,
-) -> List[Prediction]:
-    all_preds = []
+) -> Iterator[List[Prediction]]:
+    if sink is not None:
+        infer_dl = _skip_batches(infer_dl, sink.num_batches)
+    # the next batches are moved to the device while the model predicts
+    device = predict_kwargs.get("device")
+    if device is None and model is not None:
+        device = model_device(model)
+    if device is not None:
+        infer_dl = DevicePrefetcher(infer_dl, device=device)
+
     for batch, records in pbar(infer_dl, show=show_pbar):
-        preds = predict_fn(
-            model=model,
-            batch=batch,
-            records=records,
-            keep_images=keep_images,
-            **predict_kwargs,
+        with torch.no_grad():
+            preds = predict_fn(
+                model=model,
+                batch=batch,
+                records=records,
+                keep_images=keep_images,
+                **predict_kwargs,
+            )
+        if sink is not None:
+            sink.write(preds)
+        yield preds
+
+    if sink is not None:
+        sink.close()
+
+
+def _skip_batches(dl: DataLoader, n: int) -> Iterable:
+    "Skips the first `n` batches of `dl`, without loading them if possible"
+    if n == 0:
+        return dl
+    if dl.batch_sampler is None:
+        return itertools.islice(dl, n, None)
+
+    # only the indexes of the skipped batches are generated, `drop_last` was already
+    # applied by the batch sampler
+    batch_sampler = list(dl.batch_sampler)[n:]
+    worker_kwargs = {}
+    if dl.num_workers > 0:
+        worker_kwargs = dict(
+            prefetch_factor=dl.prefetch_factor,
+            persistent_workers=dl.persistent_workers,
+        )
+    return DataLoader(
+        dataset=dl.dataset,
+        batch_sampler=batch_sampler,
+        num_workers=dl.num_workers,
+        collate_fn=dl.collate_fn,
+        pin_memory=dl.pin_memory,
+        timeout=dl.timeout,
+        worker_init_fn=dl.worker_init_fn,
+        multiprocessing_context=dl.multiprocessing_context,
+        generator=dl.generator,
+        **worker_kwargs,
+    )
+
+
+def tensors_to_numpy(tensors: Sequence[torch.Tensor]) -> List[np.ndarray]:
+    """Copies `tensors` to host memory with a single transfer for each device and
+    dtype, instead of one transfer (and synchronization) per tensor.
+
+    The tensors are flattened and concatenated on their device, the host array is
+    then split back into views with the original shapes. Tensors already on the cpu
+    are not copied.
+    """
+    arrays = [None] * len(tensors)
+    groups = defaultdict(list)
+    for i, tensor in enumerate(tensors):
+        groups[(tensor.device, tensor.dtype)].append(i)
+
+    for (device, _), idxs in groups.items():
+        if device.type == "cpu":
+            for i in idxs:
+                arrays[i] = tensors[i].detach().numpy()
+            continue
+
+        flat = torch.cat([tensors[i].detach().reshape(-1) for i in idxs])
+        flat = flat.cpu().numpy()
+        ends = np.cumsum([tensors[i].numel() for i in idxs])
+        for i, end in zip(idxs, ends):
+            arrays[i] = flat[end - tensors[i].numel() : end].reshape(tensors[i].shape)
+
+    return arrays
+
+
+def build_detection_prediction(
+    record: BaseRecord,
+    label_ids: np.ndarray,
+    scores: np.ndarray,
+    xyxy: np.ndarray,
+    masks: Optional[MaskArray] = None,
+    keypoints: Optional[List[KeyPoints]] = None,
+    img: Optional[np.ndarray] = None,
+) -> Prediction:
+    """Creates the `Prediction` of `record` from arrays already converted to numpy,
+    shared by the `convert_raw_predictions` of all model families.
+
+    # Arguments
+        label_ids: `(N,)` label ids, with background as 0.
+        scores: `(N,)` scores.
+        xyxy: `(N, 4)` boxes.
+        masks: If given, a `MasksRecordComponent` is added.
+        keypoints: If given, a `KeyPointsRecordComponent` is added.
+        img: If given, it's set as the image of `record` (and of the prediction).
+    """
+    components = [
+        ScoresRecordComponent(),
+        ImageRecordComponent(),
+        InstancesLabelsRecordComponent(),
+        BBoxesRecordComponent(),
+    ]
+    if masks is not None:
+        components.append(MasksRecordComponent())
+    if keypoints is not None:
+        components.append(KeyPointsRecordComponent())
+
+    pred = BaseRecord(components)
+    pred.detection.set_class_map(record.detection.class_map)
+    pred.detection.set_scores(scores)
+    pred.detection.set_labels_by_id(np.asarray(label_ids).tolist())
+    pred.detection.set_bboxes(BBoxes.from_xyxy(xyxy))
+    if masks is not None:
+        pred.detection.set_masks(masks)
+    if keypoints is not None:
+        pred.detection.add_keypoints(keypoints)
+
+    if img is not None:
+        record.set_img(img)
+
+    return Prediction(pred=pred, ground_truth=record)
+
+
+def img_to_tensor(img: np.ndarray, uint8: bool = False) -> Tensor:
+    """Converts a (H,W,C) image to a (C,H,W) tensor like `im2tensor`, uint8 images
+    are scaled to floats in [0, 1]. If `uint8=True` uint8 images are kept as uint8
+    (4 times less memory to send from the workers and to the device), normalize them
+    on the device with `add_normalize_hook`.
+    """
+    if uint8 and img.dtype == np.uint8:
+        return torch.from_numpy(img.transpose(2, 0, 1)).contiguous()
+    return im2tensor(img)
+
+
+def normalize_imgs(
+    imgs: Tensor,
+    mean: Sequence[float] = IMAGENET_STATS[0],
+    std: Sequence[float] = IMAGENET_STATS[1],
+    max_pixel_value: float = 255.0,
+) -> Tensor:
+    """Converts uint8 (C,H,W) or (B,C,H,W) images to normalized float32 images, like
+    `tfms.A.Normalize` does, with a single float copy. Float images are returned as is.
+    """
+    if imgs.dtype != torch.uint8:
+        return imgs
+    mean = torch.tensor(mean, device=imgs.device) * max_pixel_value
+    std = torch.tensor(std, device=imgs.device) * max_pixel_value
+    imgs = imgs.to(torch.float32).sub_(mean[:, None, None])
+    return imgs.mul_(std.reciprocal()[:, None, None])
+
+
+class _NormalizeImgsHook:
+    def __init__(self, mean: Sequence[float], std: Sequence[float], max_pixel_value):
+        self.mean = mean
+        self.std = std
+        self.max_pixel_value = max_pixel_value
+
+    def normalize(self, imgs: Tensor) -> Tensor:
+        return normalize_imgs(
+            imgs, mean=self.mean, std=self.std, max_pixel_value=self.max_pixel_value
         )
-        all_preds.extend(preds)
 
-    return all_preds
+    def __call__(self, module: nn.Module, inputs: tuple) -> tuple:
+        imgs, *rest = inputs
+        if isinstance(imgs, Tensor):
+            imgs = self.normalize(imgs)
+        else:
+            imgs = [self.normalize(img) for img in imgs]
+        return (imgs, *rest)
+
+
+def add_normalize_hook(
+    model: nn.Module,
+    mean: Sequence[float] = IMAGENET_STATS[0],
+    std: Sequence[float] = IMAGENET_STATS[1],
+    max_pixel_value: float = 255.0,
+) -> torch.utils.hooks.RemovableHandle:
+    """Normalizes (with `normalize_imgs`) the uint8 images the model receives, on the
+    device they were moved to. Use it with transforms that don't include
+    `tfms.A.Normalize` and pass `uint8=True` to the dataloaders, to `predict`, to
+    `end2end_detect` and to `MicroBatchServer`. Float images are not normalized.
+
+    # Arguments
+        model: A model of any of the model families.
+        mean: Mean of each (RGB) channel, in [0, 1].
+        std: Standard deviation of each (RGB) channel, in [0, 1].
+        max_pixel_value: Value the mean and standard deviation are scaled by.
+
+    # Returns
+        The handle of the hook, call `remove` on it to stop normalizing images.
+    """
+    module = model
+    # mmdet detectors are called with keyword arguments and receive BGR images
+    if hasattr(model, "extract_feat"):
+        module, mean, std = model.backbone, mean[::-1], std[::-1]
+    # the train and predict benches of efficientdet wrap the same model
+    if SoftDependencies.effdet and isinstance(model, (DetBenchTrain, DetBenchPredict)):
+        module = model.model
+
+    hook = _NormalizeImgsHook(mean=mean, std=std, max_pixel_value=max_pixel_value)
+    return module.register_forward_pre_hook(hook)
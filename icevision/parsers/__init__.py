@@ -1,3 +1,4 @@
+from icevision.parsers.parse_cache import *
 from icevision.parsers.parser import *
 
 from icevision.parsers.coco_parser import *
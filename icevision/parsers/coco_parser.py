@@ -29,15 +29,30 @@ def coco(
 
 
 class COCOBaseParser(Parser):
+    """Base parser for COCO style annotations.
+
+    # Arguments
+        annotations_filepath: Path to the json annotations file.
+        img_dir: Directory containing the images.
+        idmap: Maps from filenames to unique ids, pass an `IDMap()` if you need this information.
+        img_size_from_annotations: Use the `width` and `height` of the `images` entries
+            instead of reading the images. The size of images without those fields is
+            read from the image headers, using a thread pool.
+    """
+
     def __init__(
         self,
         annotations_filepath: Union[str, Path],
         img_dir: Union[str, Path],
         idmap: Optional[IDMap] = None,
+        img_size_from_annotations: bool = True,
     ):
 
-        self.annotations_dict = json.loads(Path(annotations_filepath).read_bytes())
+        self.annotations_filepath = Path(annotations_filepath)
+        self.annotations_dict = json.loads(self.annotations_filepath.read_bytes())
         self.img_dir = Path(img_dir)
+        self.img_size_from_annotations = img_size_from_annotations
+        self._img_sizes = None
 
         self._record_id2info = {o["id"]: o for o in self.annotations_dict["images"]}
 
@@ -74,11 +89,44 @@ class COCOBaseParser(Parser):
     def record_id(self, o) -> int:
         return o["image_id"]
 
+    def sample_source(self, o) -> Path:
+        return self.annotations_filepath
+
+    def _cache_key(self) -> str:
+        return (
+            f"{super()._cache_key()}:{self.img_dir.resolve()}:"
+            f"{self.img_size_from_annotations}"
+        )
+
     def filepath(self, o) -> Path:
         return self.img_dir / self._info["file_name"]
 
     def img_size(self, o) -> ImgSize:
-        return get_img_size(self.filepath(o))
+        if self.img_size_from_annotations and self._has_img_size(self._info):
+            return ImgSize(width=self._info["width"], height=self._info["height"])
+
+        if self._img_sizes is None:
+            self.prepare_workers()
+        return self._img_sizes[self._info["id"]]
+
+    def prepare_workers(self):
+        # read the size of all the images missing it at once, with a thread pool,
+        # in the main process so the workers don't read all the headers again
+        if self._img_sizes is not None:
+            return
+        infos = [self._record_id2info[id] for id in self._annotated_img_ids()]
+        if self.img_size_from_annotations:
+            infos = [info for info in infos if not self._has_img_size(info)]
+        filepaths = [self.img_dir / info["file_name"] for info in infos]
+        img_sizes = get_img_sizes(filepaths)
+        self._img_sizes = {o["id"]: size for o, size in zip(infos, img_sizes)}
+
+    def _annotated_img_ids(self) -> List[int]:
+        return list(dict.fromkeys(o["image_id"] for o in self))
+
+    @staticmethod
+    def _has_img_size(info: dict) -> bool:
+        return info.get("width") is not None and info.get("height") is not None
 
     def labels_ids(self, o) -> List[Hashable]:
         return [o["category_id"]]
@@ -0,0 +1,131 @@
+__all__ = ["ParseCache"]
+
+import sqlite3
+from icevision.imports import *
+from icevision.core import *
+
+_SQLITE_HEADER = b"SQLite format 3\x00"
+
+
+class ParseCache:
+    """Incremental cache of parsed records, stored in a sqlite database.
+
+    The records parsed from each source file (e.g. a VOC xml file or a COCO json
+    file) are stored in a separate row together with a fingerprint of the file
+    (modification time and size). Rows are only read and unpickled when requested,
+    so only the sources that changed since the last parse need to be parsed again.
+
+    All rows are discarded if the cache was created by a different parser class. A
+    cache pickled by older versions (a list of splits of records) found at `filepath`
+    is moved to `<filepath>.old` and replaced, any other file that is not a sqlite
+    database raises an error.
+
+    # Arguments
+        filepath: Path of the sqlite database, created if it does not exist.
+        parser_key: Identifies the parser that created the cache.
+    """
+
+    version = 3
+
+    def __init__(self, filepath: Union[str, Path], parser_key: str):
+        self.filepath = Path(filepath)
+        self.parser_key = f"{parser_key}:{self.version}"
+
+        if not _is_sqlite_file(self.filepath):
+            if not _is_pickled_splits(self.filepath):
+                raise ValueError(
+                    f"{self.filepath} is not a parse cache, pass another "
+                    "`cache_filepath` or delete the file"
+                )
+            old_filepath = self.filepath.with_name(self.filepath.name + ".old")
+            logger.warning(
+                "{} was created by an older version, it was moved to {} and will "
+                "be replaced",
+                str(self.filepath),
+                str(old_filepath),
+            )
+            self.filepath.replace(old_filepath)
+
+        self.conn = sqlite3.connect(str(self.filepath))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sources "
+            "(source TEXT PRIMARY KEY, fingerprint TEXT, data BLOB)"
+        )
+
+        row = self.conn.execute("SELECT value FROM meta WHERE key='parser'").fetchone()
+        if row is None or row[0] != self.parser_key:
+            self.clear()
+
+    @staticmethod
+    def fingerprint(source: Optional[Union[str, Path]]) -> str:
+        if source is None:
+            return ""
+        stat = Path(source).stat()
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def get(self, source: str, fingerprint: str) -> Optional[Any]:
+        "Cached value for `source`, `None` if missing or if the file changed"
+        row = self.conn.execute(
+            "SELECT data FROM sources WHERE source=? AND fingerprint=?",
+            (source, fingerprint),
+        ).fetchone()
+        return pickle.loads(row[0]) if row is not None else None
+
+    def set(self, source: str, fingerprint: str, value: Any) -> None:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sources VALUES (?, ?, ?)",
+            (source, fingerprint, data),
+        )
+
+    def prune(self, sources: Collection[str]) -> None:
+        "Deletes the rows of the sources that are not in `sources`"
+        cached_sources = [o for o, in self.conn.execute("SELECT source FROM sources")]
+        removed = set(cached_sources).difference(sources)
+        self.conn.executemany(
+            "DELETE FROM sources WHERE source=?", [(o,) for o in removed]
+        )
+
+    def clear(self) -> None:
+        self.conn.execute("DELETE FROM sources")
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta VALUES ('parser', ?)", (self.parser_key,)
+        )
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+
+
+def _is_sqlite_file(filepath: Path) -> bool:
+    "`False` if `filepath` exists and is not a sqlite database, empty files are fine"
+    if not filepath.exists():
+        return True
+    with open(filepath, "rb") as f:
+        header = f.read(len(_SQLITE_HEADER))
+    return header in (b"", _SQLITE_HEADER)
+
+
+def _is_pickled_splits(filepath: Path) -> bool:
+    "Whether `filepath` is a cache pickled by older versions, a list of record lists"
+    try:
+        with open(filepath, "rb") as f:
+            splits = pickle.load(f)
+    except Exception:
+        return False
+    return isinstance(splits, list) and all(
+        isinstance(split, list) and all(isinstance(o, BaseRecord) for o in split)
+        for split in splits
+    )
@@ -1,10 +1,12 @@
 __all__ = ["ParserInterface", "Parser"]
 
+import multiprocessing
 from icevision.imports import *
 from icevision.utils import *
 from icevision.utils.code_template import *
 from icevision.core import *
 from icevision.data import *
+from icevision.parsers.parse_cache import *
 
 
 def camel_to_snake(name):
@@ -61,12 +63,26 @@ class Parser(ParserInterface, ABC):
         pass
 
     def create_record(self) -> BaseRecord:
-        return deepcopy(self.template_record)
+        return self.template_record.clone()
 
     def prepare(self, o):
         pass
 
-    def parse_dicted(self, show_pbar: bool = True) -> Dict[int, RecordType]:
+    def prepare_workers(self):
+        """Called in the main process before the parser is sent to the worker
+        processes when `num_workers > 0`. Compute here the state shared by all the
+        samples, so each worker does not compute it again.
+        """
+        pass
+
+    def parse_dicted(
+        self, show_pbar: bool = True, num_workers: int = 0
+    ) -> Dict[int, RecordType]:
+        if num_workers > 0:
+            return self._parse_dicted_parallel(
+                show_pbar=show_pbar, num_workers=num_workers
+            )
+
         records = {}
 
         for sample in pbar(self, show_pbar):
@@ -97,6 +113,233 @@ class Parser(ParserInterface, ABC):
 
         return dict(records)
 
+    def _parse_shard(
+        self, samples: Sequence[Any], autofix: bool = False
+    ) -> Tuple[dict, dict, dict]:
+        """Parses `samples` without touching `idmap`, records are keyed by their
+        true record_id. Runs inside the worker processes when `num_workers > 0`.
+        """
+        records, sample_idxs = {}, defaultdict(list)
+
+        for i, sample in enumerate(samples):
+            try:
+                self.prepare(sample)
+                true_record_id = self.record_id(sample)
+                sample_idxs[true_record_id].append(i)
+
+                try:
+                    record = records[true_record_id]
+                    is_new = False
+                except KeyError:
+                    record = self.create_record()
+                    record.set_record_id(true_record_id)
+                    records[true_record_id] = record
+                    is_new = True
+
+                self.parse_fields(sample, record=record, is_new=is_new)
+
+            except AbortParseRecord as e:
+                logger.warning(
+                    "Record with record_id: {} was skipped because: {}",
+                    true_record_id,
+                    str(e),
+                )
+
+        if autofix:
+            records = {
+                record.record_id: record
+                for record in autofix_records(list(records.values()), show_pbar=False)
+            }
+
+        return records, dict(sample_idxs), self._class_maps()
+
+    def _parse_dicted_parallel(
+        self, show_pbar: bool, num_workers: int
+    ) -> Dict[int, RecordType]:
+        samples = list(self)
+        shards = _split_samples(samples, num_shards=min(len(samples), num_workers * 4))
+
+        results = self._parse_shards(
+            shards, show_pbar=show_pbar, num_workers=num_workers
+        )
+        return self._merge_shards(shards, results)
+
+    def _parse_dicted_cached(
+        self,
+        cache_filepath: Union[str, Path],
+        show_pbar: bool,
+        num_workers: int,
+        autofix: bool,
+    ) -> Dict[int, RecordType]:
+        # samples are grouped by the file they come from, only the groups of files
+        # that changed since the last parse are parsed again
+        groups = defaultdict(list)
+        for sample in self:
+            groups[self.sample_source(sample)].append(sample)
+        sources, groups = list(groups.keys()), list(groups.values())
+        keys = [str(source) if source is not None else "" for source in sources]
+        fingerprints = [ParseCache.fingerprint(source) for source in sources]
+
+        # the records are autofixed before they are stored in the cache
+        parser_key = self._cache_key() if autofix else f"{self._cache_key()}:no_autofix"
+        with ParseCache(cache_filepath, parser_key=parser_key) as cache:
+            # each cached value holds the lengths of the shards the group was split
+            # in and the result of parsing each of them
+            cached = [cache.get(k, fp) for k, fp in zip(keys, fingerprints)]
+            missing = [i for i, value in enumerate(cached) if value is None]
+            logger.info(
+                f"Loaded {len(groups) - len(missing)} of {len(groups)} sources "
+                f"from {cache_filepath}, parsing {len(missing)}"
+            )
+
+            # groups are split in shards of about the same size, so a big source
+            # (e.g. a COCO json file) is still parsed by all the workers
+            num_samples = sum(len(groups[i]) for i in missing)
+            shard_size = math.ceil(num_samples / (num_workers * 4 or 1))
+            group_shards = {
+                i: _split_samples(groups[i], math.ceil(len(groups[i]) / shard_size))
+                for i in missing
+            }
+
+            missing_results = iter(
+                list(
+                    self._parse_shards(
+                        [shard for i in missing for shard in group_shards[i]],
+                        show_pbar=show_pbar,
+                        num_workers=num_workers,
+                        autofix=autofix,
+                    )
+                )
+            )
+            for i in missing:
+                lengths = [len(shard) for shard in group_shards[i]]
+                cached[i] = (lengths, [next(missing_results) for _ in lengths])
+                cache.set(keys[i], fingerprints[i], cached[i])
+
+            cache.prune(keys)
+
+        shards, results = [], []
+        for samples, (lengths, group_results) in zip(groups, cached):
+            bounds = np.cumsum([0] + lengths).tolist()
+            shards.extend(samples[start:end] for start, end in zip(bounds, bounds[1:]))
+            results.extend(group_results)
+
+        return self._merge_shards(shards, results, autofix=autofix)
+
+    def _parse_shards(
+        self,
+        shards: List[list],
+        show_pbar: bool,
+        num_workers: int,
+        autofix: bool = False,
+    ) -> Iterator[Tuple[dict, dict, dict]]:
+        if num_workers == 0:
+            parse_shard = partial(self._parse_shard, autofix=autofix)
+            yield from pbar(map(parse_shard, shards), show_pbar, len(shards))
+            return
+
+        self.prepare_workers()
+        chunksize = max(1, len(shards) // (num_workers * 4))
+        with multiprocessing.Pool(
+            num_workers, initializer=_init_parse_worker, initargs=(self,)
+        ) as pool:
+            # `imap` yields the shards in order, so records and `idmap` ids are
+            # created in the same order as the serial loop would create them
+            parse_shard = partial(_parse_shard, autofix=autofix)
+            results = pool.imap(parse_shard, shards, chunksize=chunksize)
+            yield from pbar(results, show_pbar, len(shards))
+
+    def _merge_shards(
+        self,
+        shards: List[list],
+        results: Iterable[Tuple[dict, dict, dict]],
+        autofix: bool = False,
+    ) -> Dict[int, RecordType]:
+        records, shard_ids = {}, defaultdict(list)
+        for shard_idx, (shard_records, sample_idxs, class_maps) in enumerate(results):
+            shard_class_maps = self._shard_class_maps(class_maps)
+            # records removed by autofix still get an id, like in the serial loop
+            for true_record_id in sample_idxs:
+                record_id = self.idmap[true_record_id]
+                shard_ids[true_record_id].append((shard_idx, sample_idxs))
+                record = shard_records.get(true_record_id)
+                if record is None:
+                    continue
+                record.set_record_id(record_id)
+                self._remap_class_maps(record, shard_class_maps)
+                records.setdefault(record_id, record)
+
+        # records whose samples were split across shards are parsed again from all
+        # their samples (in the original order) instead of merging partial records
+        for true_record_id, locations in shard_ids.items():
+            if len(locations) == 1:
+                continue
+            record_id = self.idmap[true_record_id]
+            record = self.create_record()
+            record.set_record_id(record_id)
+            is_new = True
+            for shard_idx, sample_idxs in locations:
+                for i in sample_idxs[true_record_id]:
+                    sample = shards[shard_idx][i]
+                    try:
+                        self.prepare(sample)
+                        self.parse_fields(sample, record=record, is_new=is_new)
+                    except AbortParseRecord:
+                        # the warning was already logged when parsing the shard
+                        pass
+                    is_new = False
+            records[record_id] = record
+            if autofix and not autofix_records([record], show_pbar=False):
+                del records[record_id]
+
+        return records
+
+    def sample_source(self, o) -> Optional[Union[str, Path]]:
+        """File the sample `o` was read from, e.g. a VOC xml file.
+
+        Used by the parse cache to only parse again the samples of files that changed.
+        If `None` is returned the cached records are used until the cache is deleted.
+        """
+        return None
+
+    def _cache_key(self) -> str:
+        """Identifies the records stored in the parse cache, parsers add the settings
+        (e.g. the images directory) that change the records parsed from a source.
+        """
+        return f"{self.__class__.__module__}.{self.__class__.__qualname__}"
+
+    def _class_maps(self) -> Dict[str, ClassMap]:
+        return {k: v for k, v in vars(self).items() if isinstance(v, ClassMap)}
+
+    def _shard_class_maps(self, class_maps: Dict[str, ClassMap]) -> dict:
+        """Maps the id of the `ClassMap`s unpickled from a worker to the ones of this
+        parser and whether the label ids created by the worker are still valid.
+        """
+        own_class_maps = self._class_maps()
+        return {
+            id(class_map): (own_class_maps[name], class_map == own_class_maps[name])
+            for name, class_map in class_maps.items()
+        }
+
+    @staticmethod
+    def _remap_class_maps(record: BaseRecord, shard_class_maps: dict) -> None:
+        for component in record.components:
+            if not isinstance(component, ClassMapRecordComponent):
+                continue
+            try:
+                class_map, same_ids = shard_class_maps[id(component.class_map)]
+            except KeyError:
+                continue
+            component.set_class_map(class_map)
+            # workers may add new classes to an unlocked `ClassMap` in a different
+            # order, recompute the ids from the names with the main `ClassMap`
+            if (
+                not same_ids
+                and isinstance(component, BaseLabelsRecordComponent)
+                and len(component.labels) == len(component.label_ids)
+            ):
+                component.set_labels(component.labels)
+
     def _check_path(self, path: Union[str, Path] = None):
         if path is None:
             return False
@@ -109,44 +352,54 @@ class Parser(ParserInterface, ABC):
         autofix: bool = True,
         show_pbar: bool = True,
         cache_filepath: Union[str, Path] = None,
+        num_workers: int = 0,
     ) -> List[List[BaseRecord]]:
         """Loops through all data points parsing the required fields.
 
         # Arguments
             data_splitter: How to split the parsed data, defaults to a [0.8, 0.2] random split.
             show_pbar: Whether or not to show a progress bar while parsing the data.
-            cache_filepath: Path to save records in pickle format. Defaults to None, e.g.
+            cache_filepath: Path of the parse cache. Defaults to None, e.g.
                             if the user does not specify a path, no saving nor loading happens.
+                            The parsed records are stored per source file (see `sample_source`),
+                            when parsing again only the files that changed are parsed.
+                            The records are autofixed before they are stored, loading them
+                            does not autofix them again.
+            num_workers: Number of processes used to parse the data, `0` parses it
+                in the main process. The annotations are split in contiguous shards,
+                the records and the ids assigned by `idmap` are the same as when
+                parsing serially.
 
         # Returns
             A list of records for each split defined by `data_splitter`.
         """
-        if self._check_path(cache_filepath):
-            logger.info(
-                f"Loading cached records from {cache_filepath}",
+        data_splitter = data_splitter or RandomSplitter([0.8, 0.2])
+        if cache_filepath is not None:
+            records = self._parse_dicted_cached(
+                cache_filepath,
+                show_pbar=show_pbar,
+                num_workers=num_workers,
+                autofix=autofix,
             )
-            return pickle.load(open(Path(cache_filepath), "rb"))
         else:
-            data_splitter = data_splitter or RandomSplitter([0.8, 0.2])
-            records = self.parse_dicted(show_pbar=show_pbar)
-
-            splits = data_splitter(idmap=self.idmap)
-            all_splits_records = []
-            if autofix:
-                logger.opt(colors=True).info("<blue><bold>Autofixing records</></>")
-            for ids in splits:
-                split_records = [records[i] for i in ids if i in records]
+            records = self.parse_dicted(show_pbar=show_pbar, num_workers=num_workers)
+        # cached records were already autofixed
+        autofix_splits = autofix and cache_filepath is None
 
-                if autofix:
-                    split_records = autofix_records(split_records, show_pbar=show_pbar)
+        splits = data_splitter(idmap=self.idmap)
+        all_splits_records = []
+        if autofix_splits:
+            logger.opt(colors=True).info("<blue><bold>Autofixing records</></>")
+        for ids in splits:
+            split_records = [records[i] for i in ids if i in records]
 
-                all_splits_records.append(split_records)
+            if autofix_splits:
+                split_records = autofix_records(split_records, show_pbar=show_pbar)
 
-            # self.class_map.lock()
-            if cache_filepath is not None:
-                pickle.dump(all_splits_records, open(Path(cache_filepath), "wb"))
+            all_splits_records.append(split_records)
 
-            return all_splits_records
+        # self.class_map.lock()
+        return all_splits_records
 
     @classmethod
     def _templates(cls) -> List[str]:
@@ -172,3 +425,21 @@ class Parser(ParserInterface, ABC):
         template.add_lines(record_builder_template, 2)
 
         template.display()
+
+
+_worker_parser: Optional[Parser] = None
+
+
+def _init_parse_worker(parser: Parser) -> None:
+    global _worker_parser
+    _worker_parser = parser
+
+
+def _parse_shard(samples: Sequence[Any]) -> Tuple[dict, dict, dict]:
+    return _worker_parser._parse_shard(samples)
+
+
+def _split_samples(samples: list, num_shards: int) -> List[list]:
+    "Splits `samples` in `num_shards` contiguous shards of about the same size"
+    bounds = np.linspace(0, len(samples), num_shards + 1).astype(int).tolist()
+    return [samples[start:end] for start, end in zip(bounds, bounds[1:])]
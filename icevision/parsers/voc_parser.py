@@ -69,6 +69,12 @@ class VOCBBoxParser(Parser):
     def record_id(self, o) -> Hashable:
         return str(Path(self._filename).stem)
 
+    def sample_source(self, o) -> Path:
+        return o
+
+    def _cache_key(self) -> str:
+        return f"{super()._cache_key()}:{self.images_dir.resolve()}"
+
     def prepare(self, o):
         tree = ET.parse(str(o))
         self._root = tree.getroot()
@@ -157,6 +163,9 @@ class VOCMaskParser(VOCBBoxParser):
         record.add_component(MasksRecordComponent())
         return record
 
+    def _cache_key(self) -> str:
+        return f"{super()._cache_key()}:{Path(self.masks_dir).resolve()}"
+
     def record_id_mask(self, o) -> Hashable:
         """Should return the same as `record_id` from parent parser."""
         return str(Path(o).stem)
@@ -11,6 +11,7 @@ __all__ = [
 ]
 
 import albumentations as A
+import time
 from itertools import chain
 
 from icevision.imports import *
@@ -23,6 +24,19 @@ from icevision.tfms.albumentations.albumentations_helpers import (
 )
 
 
+# transforms that can be applied before or after resizing with the same result
+_RESOLUTION_INDEPENDENT_TFMS = (
+    A.HorizontalFlip,
+    A.VerticalFlip,
+    A.Flip,
+    A.RGBShift,
+    A.RandomBrightnessContrast,
+    A.HueSaturationValue,
+    A.ToGray,
+    A.Normalize,
+)
+
+
 @dataclass
 class CollectOp:
     fn: Callable
@@ -98,15 +112,14 @@ class AlbumentationsBBoxesComponent(AlbumentationsAdapterComponent):
         # TODO: albumentations has a way of sending information that can be used for tasks
 
         # TODO HACK: Will not work for multitask, will fail silently
-        self.adapter._albu_in["bboxes"] = [o.xyxy for o in record_component.bboxes]
+        self.adapter._albu_in["bboxes"] = record_component.bboxes.xyxy.tolist()
 
         self.adapter._collect_ops.append(CollectOp(self.collect))
 
-    def collect(self, record) -> List[BBox]:
+    def collect(self, record) -> BBoxes:
         # TODO: quickfix from 576
         # bboxes_xyxy = [_clip_bboxes(xyxy, img_h, img_w) for xyxy in d["bboxes"]]
-        bboxes_xyxy = [xyxy for xyxy in self.adapter._albu_out["bboxes"]]
-        bboxes = [BBox.from_xyxy(*xyxy) for xyxy in bboxes_xyxy]
+        bboxes = BBoxes.from_xyxy(np.array(self.adapter._albu_out["bboxes"]))
         # TODO HACK: Will not work for multitask, will fail silently
         record.detection.set_bboxes(bboxes)
 
@@ -128,7 +141,8 @@ class AlbumentationsBBoxesComponent(AlbumentationsAdapterComponent):
 
 class AlbumentationsMasksComponent(AlbumentationsAdapterComponent):
     def setup_masks(self, record):
-        self.adapter._albu_in["masks"] = list(record.masks.data)
+        # decoding is delayed until the masks are transformed
+        self.adapter._albu_in["masks"] = list(record.mask_array().data)
         self.adapter._collect_ops.append(CollectOp(self.collect))
 
     def collect(self, record):
@@ -252,26 +266,91 @@ class Adapter(Transform, Composite):
         AlbumentationsKeypointsComponent,
     }
 
-    def __init__(self, tfms):
+    def __init__(
+        self,
+        tfms,
+        timing_hook: Optional[Callable[[Dict[str, float]], None]] = None,
+    ):
+        """Applies albumentations transforms to records.
+
+        # Arguments
+            tfms: List of albumentations transforms.
+            timing_hook: Called after every sample with the time in seconds spent
+                on `setup` (preparing the inputs), `augment` (running the
+                albumentations pipeline) and `collect` (writing the outputs back
+                to the record). Useful to measure the overhead of the adapter.
+        """
         super().__init__()
         self.tfms_list = tfms
+        self.timing_hook = timing_hook
+        self._compiled_tfms = {}
+
+    def min_img_size(self, img_size: ImgSize) -> Optional[ImgSize]:
+        """Size the image is shrunk to by the first resize of the pipeline, if it's an
+        always applied `LongestMaxSize`, `SmallestMaxSize` or `Resize` only preceded
+        by flips and color transforms, which give the same result at any resolution.
+        """
+        for tfm in self.tfms_list:
+            if not isinstance(tfm, _RESOLUTION_INDEPENDENT_TFMS):
+                break
+        else:
+            return None
+        if not (tfm.always_apply or tfm.p == 1):
+            return None
+
+        width, height = img_size
+        if isinstance(tfm, (A.LongestMaxSize, A.SmallestMaxSize)):
+            # `max_size` is a list of sizes to sample from in newer versions
+            max_size = max(np.atleast_1d(tfm.max_size))
+            side = max if isinstance(tfm, A.LongestMaxSize) else min
+            scale = max_size / side(width, height)
+            new_width, new_height = math.ceil(width * scale), math.ceil(height * scale)
+        elif isinstance(tfm, A.Resize):
+            new_width, new_height = tfm.width, tfm.height
+        else:
+            return None
+
+        if new_width >= width and new_height >= height:
+            return None
+        return ImgSize(width=min(new_width, width), height=min(new_height, height))
 
     def create_tfms(self):
         return A.Compose(self.tfms_list, **self._compose_kwargs)
 
+    def get_tfms(self) -> A.Compose:
+        """Returns the pipeline for the targets set up by the current record.
+
+        Pipelines are only created once for each combination of targets
+        (e.g. bboxes, masks and keypoints).
+        """
+        key = tuple(sorted(self._compose_kwargs))
+        try:
+            return self._compiled_tfms[key]
+        except KeyError:
+            tfms = self._compiled_tfms[key] = self.create_tfms()
+            return tfms
+
     def apply(self, record):
+        if self.timing_hook is not None:
+            start = time.perf_counter()
+
         # setup
         self._compose_kwargs = {}
         self._keep_mask = None
         self._albu_in = {}
         self._collect_ops = []
         record.setup_transform(tfm=self)
+        tfms = self.get_tfms()
+
+        if self.timing_hook is not None:
+            setup_end = time.perf_counter()
 
-        # TODO: composing every time
-        tfms = self.create_tfms()
         # apply transform
         self._albu_out = tfms(**self._albu_in)
 
+        if self.timing_hook is not None:
+            augment_end = time.perf_counter()
+
         # store additional info (might be used by components on `collect`)
         height, width, _ = self._albu_out["image"].shape
         height, width = get_size_without_padding(
@@ -283,6 +362,15 @@ class Adapter(Transform, Composite):
         for collect_op in sorted(self._collect_ops, key=lambda x: x.order):
             collect_op.fn(record)
 
+        if self.timing_hook is not None:
+            self.timing_hook(
+                {
+                    "setup": setup_end - start,
+                    "augment": augment_end - setup_end,
+                    "collect": time.perf_counter() - augment_end,
+                }
+            )
+
         return record
 
     # def apply(self, record):
@@ -1,2 +1,3 @@
 from icevision.tfms.batch.batch_transform import *
 from icevision.tfms.batch.img_pad_stack import *
+from icevision.tfms.batch.tensor_tfms import *
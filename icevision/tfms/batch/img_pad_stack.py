@@ -6,23 +6,60 @@ from icevision.tfms.batch.batch_transform import BatchTransform
 
 
 class ImgPadStack(BatchTransform):
-    def __init__(self, pad_value: Union[float, Sequence[float]] = 0.0):
+    """Pads the images of a batch to the same size, so they can be stacked.
+
+    The images are copied once into a (B,C,H,W) buffer and `record.img` becomes a
+    (H,W,C) view of its slice, so `im2tensor` doesn't need another copy to make the
+    image contiguous when the batch is built. Only the padding is filled with
+    `pad_value`. The buffer is kept and reused by the next batches (of each worker)
+    once the views of the previous batch are released.
+
+    # Arguments
+        pad_value: Value of the padded pixels, a single value or one per channel.
+        stride: Height and width are padded to a multiple of `stride`, e.g. the
+            largest stride of the model (32 for yolov5).
+    """
+
+    def __init__(self, pad_value: Union[float, Sequence[float]] = 0.0, stride: int = 1):
         # reshape makes sure array always have one dimension (for the single float case)
         self.pad_value = np.array(pad_value).reshape(-1)
+        self.stride = stride
+        self._buffer = np.empty(0)
+
+    def __getstate__(self):
+        # the buffer is not sent to the dataloader workers, each allocates its own
+        state = self.__dict__.copy()
+        state["_buffer"] = np.empty(0)
+        return state
 
     def apply(self, records: List[RecordType]) -> List[RecordType]:
-        max_sizes = np.zeros(3, dtype=int)
-        for record in records:
-            max_sizes = np.maximum(max_sizes, record.img.shape)
+        height, width, channels = np.max([record.img.shape for record in records], 0)
+        height = math.ceil(height / self.stride) * self.stride
+        width = math.ceil(width / self.stride) * self.stride
 
         img_dtype = records[0].img.dtype
-        padded_imgs = np.ones((len(records), *max_sizes), dtype=img_dtype)
-        padded_imgs *= self.pad_value
+        padded_imgs = self._get_buffer(
+            (len(records), channels, height, width), img_dtype
+        )
+        pad_value = np.broadcast_to(self.pad_value, channels).astype(img_dtype)
         for record, padded_img in zip(records, padded_imgs):
             img = record.img
+            padded_img = padded_img.transpose(1, 2, 0)
 
-            xmax, ymax, zmax = img.shape
-            padded_img[:xmax, :ymax, :zmax] = img
+            h, w, c = img.shape
+            padded_img[:h, :w, :c] = img
+            padded_img[h:] = pad_value
+            padded_img[:h, w:] = pad_value
+            padded_img[:h, :w, c:] = pad_value[c:]
             record.img = padded_img
 
         return records
+
+    def _get_buffer(self, shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        size = np.prod(shape)
+        # views of the buffer (the images of a batch that is still used) hold a
+        # reference to it, the buffer is only overwritten when there are none
+        in_use = sys.getrefcount(self._buffer) > 2
+        if in_use or self._buffer.dtype != dtype or self._buffer.size < size:
+            self._buffer = np.empty(max(size, self._buffer.size), dtype=dtype)
+        return self._buffer[:size].reshape(shape)
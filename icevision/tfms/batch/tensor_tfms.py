@@ -0,0 +1,536 @@
+__all__ = [
+    "TensorBatch",
+    "TensorTransform",
+    "BatchAugment",
+    "BatchResize",
+    "BatchHorizontalFlip",
+    "BatchAffine",
+    "BatchColorJitter",
+    "BatchNormalize",
+]
+
+import torch.nn.functional as F
+
+from icevision.imports import *
+from icevision.utils import *
+from icevision.core import *
+from icevision.tfms.batch.batch_transform import BatchTransform
+
+
+class TensorBatch:
+    """Images and annotations of a batch of records packed as tensors.
+
+    Annotations of all records are concatenated, `idxs` holds the index of the
+    record each instance belongs to.
+
+    # Arguments
+        imgs: (B,C,H,W) tensor with pixel values in the range [0, 255], or a list of
+            (C,H,W) tensors if the images have different sizes. uint8 images are
+            kept as uint8, transforms that interpolate or change the pixel values
+            compute in float32 and round the result back.
+        bboxes: (N,4) float tensor with boxes in xyxy format.
+        idxs: (N,) long tensor with the record index of each instance.
+        masks: (N,H,W) uint8 tensor, a list of (n,H,W) tensors (one per record) if the
+            images have different sizes, or `None`.
+        keypoints: (N,K,3) float tensor with the xyv of each keypoint, or `None`.
+        keep: (N,) bool tensor, instances that are still inside the image.
+    """
+
+    def __init__(
+        self,
+        imgs: Union[torch.Tensor, List[torch.Tensor]],
+        bboxes: torch.Tensor,
+        idxs: torch.Tensor,
+        masks: Optional[Union[torch.Tensor, List[torch.Tensor]]] = None,
+        keypoints: Optional[torch.Tensor] = None,
+        keep: Optional[torch.Tensor] = None,
+    ):
+        self.imgs = imgs
+        self.bboxes = bboxes
+        self.idxs = idxs
+        self.masks = masks
+        self.keypoints = keypoints
+        self.keep = ifnone(keep, torch.ones(len(idxs), dtype=torch.bool))
+        self.normalized = False
+
+    def __len__(self):
+        return len(self.imgs)
+
+    @property
+    def is_stacked(self) -> bool:
+        return isinstance(self.imgs, torch.Tensor)
+
+    @property
+    def img_sizes(self) -> List[Tuple[int, int]]:
+        "(height, width) of each image"
+        return [tuple(img.shape[-2:]) for img in self.imgs]
+
+    def stack(self) -> "TensorBatch":
+        """Stacks the images (and masks) into a single tensor, all images need
+        to have the same size.
+        """
+        if self.is_stacked:
+            return self
+        if len(set(self.img_sizes)) > 1:
+            raise ValueError(
+                f"Images have different sizes {self.img_sizes}, add a "
+                f"BatchResize as the first transform"
+            )
+        self.imgs = torch.stack(self.imgs)
+        if self.masks is not None:
+            self.masks = torch.cat(self.masks)
+        return self
+
+    @classmethod
+    def from_records(cls, records: Sequence[RecordType]) -> "TensorBatch":
+        imgs, bboxes, idxs, masks, keypoints = [], [], [], [], []
+        for i, record in enumerate(records):
+            img = torch.from_numpy(np.ascontiguousarray(record.img))
+            imgs.append(img.permute(2, 0, 1))
+
+            detection = getattr(record, "detection", None)
+            if detection is None or not hasattr(detection, "bboxes"):
+                continue
+
+            bboxes.append(torch.from_numpy(detection.bboxes.xyxy.astype(np.float32)))
+            idxs.append(torch.full((len(detection.bboxes),), i, dtype=torch.long))
+            if hasattr(detection, "masks"):
+                masks.append(torch.from_numpy(detection.mask_array().data))
+            if hasattr(detection, "keypoints"):
+                keypoints.extend(
+                    o.keypoints.reshape(-1, 3) for o in detection.keypoints
+                )
+
+        bboxes = torch.cat(bboxes) if bboxes else torch.zeros((0, 4))
+        idxs = torch.cat(idxs) if idxs else torch.zeros(0, dtype=torch.long)
+        keypoints = (
+            torch.from_numpy(np.stack(keypoints).astype(np.float32))
+            if keypoints
+            else None
+        )
+        batch = cls(
+            imgs=imgs,
+            bboxes=bboxes,
+            idxs=idxs,
+            masks=masks or None,
+            keypoints=keypoints,
+        )
+        if len(set(batch.img_sizes)) == 1:
+            batch.stack()
+        return batch
+
+    def to_records(self, records: Sequence[RecordType]) -> List[RecordType]:
+        "Writes the images and the instances that were kept back to `records`"
+        imgs = self.imgs
+        if not self.normalized:
+            imgs = _cast_imgs(imgs, torch.uint8)
+        # (H,W,C) views of the (C,H,W) images, `im2tensor` converts them back
+        # without copying
+        imgs = imgs.permute(0, 2, 3, 1).numpy()
+
+        for i, record in enumerate(records):
+            record.set_img(imgs[i])
+
+            detection = getattr(record, "detection", None)
+            if detection is None or not hasattr(detection, "bboxes"):
+                continue
+
+            instance_idxs = (self.idxs == i).nonzero().view(-1)
+            keep_mask = self.keep[instance_idxs].numpy()
+            instance_idxs = instance_idxs[self.keep[instance_idxs]]
+
+            def _filter(v):
+                return [o for o, keep in zip(v, keep_mask) if keep]
+
+            detection.set_labels_by_id(_filter(detection.label_ids))
+            detection.set_bboxes(BBoxes.from_xyxy(self.bboxes[instance_idxs].numpy()))
+            if hasattr(detection, "iscrowds"):
+                detection.set_iscrowds(_filter(detection.iscrowds))
+            if hasattr(detection, "areas"):
+                detection.set_areas(_filter(detection.areas))
+            if hasattr(detection, "masks"):
+                masks = self.masks.index_select(0, instance_idxs)
+                detection.set_masks(MaskArray(masks.numpy()))
+            if hasattr(detection, "keypoints"):
+                kpts = self.keypoints[instance_idxs].numpy()
+                kpts = [
+                    KeyPoints.from_xyv(xyv.reshape(-1), original.metadata)
+                    for xyv, original in zip(kpts, _filter(detection.keypoints))
+                ]
+                detection.set_keypoints(kpts)
+
+        return list(records)
+
+    def update_keypoints(self, xy: torch.Tensor) -> None:
+        """Sets the new keypoints coordinates, keypoints that end outside the image
+        are marked as not visible and moved to (0, 0).
+        """
+        h, w = self.imgs.shape[-2:]
+        x, y = xy[..., 0], xy[..., 1]
+        inside = (x >= 0) & (x <= w) & (y >= 0) & (y <= h)
+        visible = (self.keypoints[..., 2] > 0) & inside
+        self.keypoints[..., :2] = xy * visible[..., None]
+        self.keypoints[..., 2] *= visible
+
+    def clip_bboxes(self) -> None:
+        "Clips the boxes to the image and drops the ones that end up empty"
+        h, w = self.imgs.shape[-2:]
+        self.bboxes[:, 0::2].clamp_(0, w)
+        self.bboxes[:, 1::2].clamp_(0, h)
+        width = self.bboxes[:, 2] - self.bboxes[:, 0]
+        height = self.bboxes[:, 3] - self.bboxes[:, 1]
+        self.keep &= (width > 0) & (height > 0)
+
+
+class TensorTransform(ABC):
+    """Transform applied to a whole `TensorBatch` at once.
+
+    Random parameters are sampled independently for every image of the batch.
+    """
+
+    def __call__(self, batch: TensorBatch) -> TensorBatch:
+        return self.apply(batch)
+
+    @abstractmethod
+    def apply(self, batch: TensorBatch) -> TensorBatch:
+        """Transforms the images and annotations of `batch`."""
+
+    @staticmethod
+    def _sample_apply(batch: TensorBatch, p: float) -> torch.Tensor:
+        "(B,) bool tensor, images the transform should be applied on"
+        return torch.rand(len(batch)) < p
+
+
+class BatchAugment(BatchTransform):
+    """Batched augmentation engine, an alternative to `tfms.A.Adapter` that transforms
+    all the images of a batch at once with vectorized torch operations.
+
+    Images, boxes, masks and keypoints of the records are packed into a
+    `TensorBatch`, transformed by `tfms` and written back to the records. Instances
+    are filtered like in the albumentations components: boxes that end outside of
+    the image are removed together with their labels, masks, iscrowds, areas and
+    keypoints.
+
+    Images need to have the same size unless the first transform is a `BatchResize`.
+
+    # Arguments
+        tfms: List of `TensorTransform`s applied in order.
+
+    # Examples
+
+    ```python
+    batch_tfms = tfms.batch.BatchAugment(
+        [
+            tfms.batch.BatchResize(384),
+            tfms.batch.BatchHorizontalFlip(),
+            tfms.batch.BatchAffine(),
+            tfms.batch.BatchColorJitter(),
+            tfms.batch.BatchNormalize(),
+        ]
+    )
+    train_dl = model_type.train_dl(train_ds, batch_tfms=batch_tfms, batch_size=16)
+    ```
+    """
+
+    def __init__(self, tfms: Sequence[TensorTransform]):
+        self.tfms = tfms
+
+    def apply(self, records: List[RecordType]) -> List[RecordType]:
+        batch = TensorBatch.from_records(records)
+        for tfm in self.tfms:
+            batch = tfm(batch)
+        return batch.stack().to_records(records)
+
+
+class BatchResize(TensorTransform):
+    """Resizes all images to the same size, the images can have different sizes.
+
+    # Arguments
+        size: An int for square images or a (height, width) tuple.
+    """
+
+    def __init__(self, size: Union[int, Tuple[int, int]]):
+        self.size = (size, size) if isinstance(size, int) else tuple(size)
+
+    def apply(self, batch: TensorBatch) -> TensorBatch:
+        height, width = self.size
+        img_sizes = batch.img_sizes
+
+        if batch.is_stacked:
+            batch.imgs = self._resize_imgs(batch.imgs)
+            if batch.masks is not None:
+                batch.masks = self._resize_masks(batch.masks)
+        else:
+            # images with different sizes cannot be resized in a single call
+            batch.imgs = torch.cat([self._resize_imgs(img[None]) for img in batch.imgs])
+            if batch.masks is not None:
+                batch.masks = torch.cat([self._resize_masks(o) for o in batch.masks])
+
+        scales = torch.tensor(
+            [(width / w, height / h) for h, w in img_sizes], dtype=torch.float32
+        )
+        scales = scales[batch.idxs]
+        batch.bboxes *= scales.repeat(1, 2)
+        if batch.keypoints is not None:
+            batch.keypoints[..., :2] *= scales[:, None]
+
+        return batch
+
+    def _resize_imgs(self, imgs: torch.Tensor) -> torch.Tensor:
+        resized = F.interpolate(
+            imgs.float(), size=self.size, mode="bilinear", align_corners=False
+        )
+        return _cast_imgs(resized, imgs.dtype)
+
+    def _resize_masks(self, masks: torch.Tensor) -> torch.Tensor:
+        if len(masks) == 0:
+            return masks.new_zeros((0, *self.size))
+        masks = F.interpolate(masks[None].float(), size=self.size, mode="nearest")
+        return masks[0].to(torch.uint8)
+
+
+class BatchHorizontalFlip(TensorTransform):
+    """Flips images horizontally with probability `p`."""
+
+    def __init__(self, p: float = 0.5):
+        self.p = p
+
+    def apply(self, batch: TensorBatch) -> TensorBatch:
+        batch.stack()
+        flip = self._sample_apply(batch, self.p)
+        w = batch.imgs.shape[-1]
+
+        _flip_rows(batch.imgs, flip.nonzero().view(-1))
+
+        instance_flip = flip[batch.idxs]
+        x1, x2 = batch.bboxes[:, 0].clone(), batch.bboxes[:, 2].clone()
+        batch.bboxes[:, 0] = torch.where(instance_flip, w - x2, x1)
+        batch.bboxes[:, 2] = torch.where(instance_flip, w - x1, x2)
+
+        if batch.masks is not None:
+            _flip_rows(batch.masks, instance_flip.nonzero().view(-1))
+
+        if batch.keypoints is not None:
+            # same convention as albumentations for keypoints
+            x = batch.keypoints[..., 0]
+            flipped_x = torch.where(instance_flip[:, None], (w - 1) - x, x)
+            xy = torch.stack([flipped_x, batch.keypoints[..., 1]], dim=-1)
+            batch.update_keypoints(xy)
+
+        return batch
+
+
+class BatchAffine(TensorTransform):
+    """Random rotation, scale and translation around the center of the image,
+    applied with probability `p`.
+
+    Boxes are replaced by the box enclosing their transformed corners, clipped to
+    the image.
+
+    # Arguments
+        degrees: Maximum rotation angle in degrees, sampled from [-degrees, degrees].
+        scale: (min, max) scale factor.
+        translate: Maximum translation as a fraction of the (width, height).
+        p: Probability of applying the transform to each image.
+        pad_value: Value of the pixels outside of the original image.
+    """
+
+    def __init__(
+        self,
+        degrees: float = 15,
+        scale: Tuple[float, float] = (0.9, 1.1),
+        translate: Tuple[float, float] = (0.1, 0.1),
+        p: float = 0.5,
+        pad_value: float = 0,
+    ):
+        self.degrees = degrees
+        self.scale = scale
+        self.translate = translate
+        self.p = p
+        self.pad_value = pad_value
+
+    def sample_matrices(self, batch: TensorBatch) -> torch.Tensor:
+        "(B,3,3) matrices mapping input pixel coordinates to output coordinates"
+        n = len(batch)
+        h, w = batch.imgs.shape[-2:]
+
+        angles = torch.empty(n).uniform_(-self.degrees, self.degrees)
+        angles = angles * math.pi / 180
+        scales = torch.empty(n).uniform_(*self.scale)
+        tx = torch.empty(n).uniform_(-self.translate[0], self.translate[0]) * w
+        ty = torch.empty(n).uniform_(-self.translate[1], self.translate[1]) * h
+
+        cos, sin = torch.cos(angles) * scales, torch.sin(angles) * scales
+        cx, cy = w / 2, h / 2
+        matrices = torch.zeros((n, 3, 3))
+        matrices[:, 0, 0], matrices[:, 0, 1] = cos, -sin
+        matrices[:, 1, 0], matrices[:, 1, 1] = sin, cos
+        matrices[:, 0, 2] = cx + tx - cos * cx + sin * cy
+        matrices[:, 1, 2] = cy + ty - sin * cx - cos * cy
+        matrices[:, 2, 2] = 1
+
+        skip = ~self._sample_apply(batch, self.p)
+        matrices[skip] = torch.eye(3)
+        return matrices
+
+    def apply(self, batch: TensorBatch) -> TensorBatch:
+        batch.stack()
+        return self.apply_matrices(batch, self.sample_matrices(batch))
+
+    def apply_matrices(self, batch: TensorBatch, matrices: torch.Tensor) -> TensorBatch:
+        h, w = batch.imgs.shape[-2:]
+        # images with an identity matrix are left untouched
+        warp = ~(matrices == torch.eye(3)).flatten(1).all(dim=1)
+        if not warp.any():
+            return batch
+        warp_idxs = warp.nonzero().view(-1)
+
+        # affine_grid maps normalized output coordinates to input coordinates
+        to_norm = torch.tensor(
+            [[2 / w, 0, -1], [0, 2 / h, -1], [0, 0, 1]], dtype=torch.float32
+        )
+        thetas = to_norm @ torch.inverse(matrices[warp_idxs]) @ torch.inverse(to_norm)
+        imgs = batch.imgs.index_select(0, warp_idxs).float()
+        grid = F.affine_grid(thetas[:, :2], list(imgs.shape), align_corners=False)
+
+        if self.pad_value != 0:
+            imgs -= self.pad_value
+        imgs = F.grid_sample(imgs, grid, mode="bilinear", align_corners=False)
+        if self.pad_value != 0:
+            imgs += self.pad_value
+        _copy_rows(batch.imgs, warp_idxs, _cast_imgs(imgs, batch.imgs.dtype))
+
+        if batch.masks is not None:
+            # masks of the same image are sampled together as channels
+            for grid_idx, i in enumerate(warp_idxs.tolist()):
+                instance_idxs = (batch.idxs == i).nonzero().view(-1)
+                if len(instance_idxs) == 0:
+                    continue
+                masks = F.grid_sample(
+                    batch.masks.index_select(0, instance_idxs)[None].float(),
+                    grid[grid_idx : grid_idx + 1],
+                    mode="nearest",
+                    align_corners=False,
+                )
+                _copy_rows(batch.masks, instance_idxs, masks[0].to(torch.uint8))
+
+        instance_matrices = matrices[batch.idxs]
+        x1, y1, x2, y2 = batch.bboxes.unbind(-1)
+        corners = torch.stack(
+            [
+                torch.stack([x1, y1], -1),
+                torch.stack([x2, y1], -1),
+                torch.stack([x1, y2], -1),
+                torch.stack([x2, y2], -1),
+            ],
+            dim=1,
+        )
+        corners = _transform_points(corners, instance_matrices)
+        batch.bboxes = torch.cat(
+            [corners.min(dim=1).values, corners.max(dim=1).values], dim=-1
+        )
+        batch.clip_bboxes()
+
+        if batch.keypoints is not None:
+            xy = _transform_points(batch.keypoints[..., :2], instance_matrices)
+            batch.update_keypoints(xy)
+
+        return batch
+
+
+class BatchColorJitter(TensorTransform):
+    """Randomly changes the brightness, contrast and saturation of the images,
+    applied with probability `p`.
+
+    Each factor is sampled from [1 - value, 1 + value].
+    """
+
+    def __init__(
+        self,
+        brightness: float = 0.2,
+        contrast: float = 0.2,
+        saturation: float = 0.2,
+        p: float = 0.5,
+    ):
+        self.brightness = brightness
+        self.contrast = contrast
+        self.saturation = saturation
+        self.p = p
+
+    def _sample_factors(self, n: int, value: float) -> torch.Tensor:
+        return torch.empty(n).uniform_(1 - value, 1 + value).view(-1, 1, 1, 1)
+
+    def apply(self, batch: TensorBatch) -> TensorBatch:
+        batch.stack()
+        apply_idxs = self._sample_apply(batch, self.p).nonzero().view(-1)
+        n = len(apply_idxs)
+        if n == 0:
+            return batch
+        imgs = batch.imgs.index_select(0, apply_idxs).float()
+        brightness = self._sample_factors(n, self.brightness)
+        contrast = self._sample_factors(n, self.contrast)
+        saturation = self._sample_factors(n, self.saturation)
+
+        # brightness, contrast and saturation are linear in the image and its
+        # grayscale, they're applied at once as `imgs * scale + offset`
+        gray = _grayscale(imgs)
+        mean = gray.mean(dim=(-3, -2, -1), keepdim=True)
+        scale = brightness * contrast
+        offset = gray * (scale * (1 - saturation)) + brightness * mean * (1 - contrast)
+        imgs.mul_(scale * saturation).add_(offset).clamp_(0, 255)
+
+        _copy_rows(batch.imgs, apply_idxs, _cast_imgs(imgs, batch.imgs.dtype))
+        return batch
+
+
+class BatchNormalize(TensorTransform):
+    """Normalizes the images with `mean` and `std` in the range [0, 1] (like
+    `A.Normalize`), the records will receive float32 images.
+    """
+
+    def __init__(
+        self,
+        mean: Sequence[float] = (0.485, 0.456, 0.406),
+        std: Sequence[float] = (0.229, 0.224, 0.225),
+    ):
+        self.mean = torch.tensor(mean, dtype=torch.float32).view(1, -1, 1, 1) * 255
+        self.std = torch.tensor(std, dtype=torch.float32).view(1, -1, 1, 1) * 255
+
+    def apply(self, batch: TensorBatch) -> TensorBatch:
+        batch.stack()
+        imgs = batch.imgs.to(torch.float32)
+        batch.imgs = imgs.sub_(self.mean).mul_(self.std.reciprocal())
+        batch.normalized = True
+        return batch
+
+
+def _cast_imgs(imgs: torch.Tensor, dtype: torch.dtype) -> torch.Tensor:
+    "Casts float images back to `dtype`, rounding and clipping them for uint8"
+    if imgs.dtype == dtype:
+        return imgs
+    if dtype == torch.uint8:
+        imgs = imgs.round().clamp_(0, 255)
+    return imgs.to(dtype)
+
+
+def _copy_rows(dst: torch.Tensor, idxs: torch.Tensor, src: torch.Tensor) -> None:
+    "Same as `dst[idxs] = src`, copying whole rows is much faster on the cpu"
+    for i, row in zip(idxs.tolist(), src):
+        dst[i].copy_(row)
+
+
+def _flip_rows(t: torch.Tensor, idxs: torch.Tensor) -> None:
+    "Flips the last dimension of `t[idxs]` in place"
+    _copy_rows(t, idxs, t.index_select(0, idxs).flip(-1))
+
+
+def _transform_points(points: torch.Tensor, matrices: torch.Tensor) -> torch.Tensor:
+    "Applies (N,3,3) affine `matrices` to (N,P,2) `points`"
+    return points @ matrices[:, :2, :2].transpose(1, 2) + matrices[:, None, :2, 2]
+
+
+def _grayscale(imgs: torch.Tensor) -> torch.Tensor:
+    if imgs.shape[1] == 1:
+        return imgs
+    weights = imgs.new_tensor([0.299, 0.587, 0.114]).view(1, 3, 1, 1)
+    return (imgs * weights).sum(dim=1, keepdim=True)
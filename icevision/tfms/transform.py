@@ -1,6 +1,7 @@
 __all__ = ["Transform"]
 
 from icevision.imports import *
+from icevision.utils import *
 from icevision.core import *
 
 
@@ -17,3 +18,10 @@ class Transform(ABC):
               dict: Modified values, the keys of the dictionary should have the same
               names as the keys received by this function
         """
+
+    def min_img_size(self, img_size: ImgSize) -> Optional[ImgSize]:
+        """Smallest size an image of `img_size` can be loaded at without reducing the
+        resolution of the transformed image, `None` if it has to be loaded at full
+        resolution. Used by `Dataset(..., draft_decode=True)`.
+        """
+        return None
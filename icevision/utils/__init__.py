@@ -1,6 +1,7 @@
 from icevision.utils.utils import *
 from icevision.utils.torch_utils import *
 from icevision.utils.imageio import *
+from icevision.utils.img_cache import *
 from icevision.utils.get_files import *
 from icevision.utils.download_utils import *
 from icevision.utils.data_dir import *
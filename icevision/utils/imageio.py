@@ -1,12 +1,16 @@
 __all__ = [
     "ImgSize",
     "open_img",
+    "open_img_with_size",
     "get_image_size",
     "get_img_size",
+    "get_img_sizes",
     "show_img",
     "plot_grid",
 ]
 
+import struct
+from concurrent.futures import ThreadPoolExecutor
 from icevision.imports import *
 from PIL import ExifTags
 
@@ -17,19 +21,49 @@ for _EXIF_ORIENTATION_TAG in ExifTags.TAGS.keys():
     if PIL.ExifTags.TAGS[_EXIF_ORIENTATION_TAG] == "Orientation":
         break
 
+# orientations for which width and height are swapped by `exif_transpose`
+_EXIF_TRANSPOSED_ORIENTATIONS = [5, 6, 7, 8]
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# start of frame markers contain the image size, 0xC4, 0xC8 and 0xCC are not SOFs
+_JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
 # from enum import Enum
 
 # class PILMode(Enum):
 #     blah
 
+
 # FIXME
-def open_img(fn, gray=False) -> PIL.Image.Image:
-    "Open an image from disk `fn` as a PIL Image"
+def open_img(fn, gray=False, draft_size: Optional[ImgSize] = None) -> PIL.Image.Image:
+    """Open an image from disk `fn` as a PIL Image.
+
+    If `draft_size` is given, JPEGs are decoded at the smallest scale (1/2, 1/4 or
+    1/8) that is still at least `draft_size` (after the EXIF orientation is applied),
+    which is much faster than decoding the full image. Other formats are always
+    decoded at full resolution.
+    """
+    return open_img_with_size(fn, gray=gray, draft_size=draft_size)[0]
+
+
+def open_img_with_size(
+    fn, gray=False, draft_size: Optional[ImgSize] = None
+) -> Tuple[PIL.Image.Image, ImgSize]:
+    """Same as `open_img`, also returns the full resolution size of the image (after
+    the EXIF orientation is applied), which is not the size of the returned image
+    when it was decoded at a reduced scale.
+    """
     color = "L" if gray else "RGB"
     image = PIL.Image.open(str(fn))
+    original_size = None
+    if draft_size is not None and image.format == "JPEG":
+        original_size = ImgSize(*image.size)
+        if image.getexif().get(_EXIF_ORIENTATION_TAG) in _EXIF_TRANSPOSED_ORIENTATIONS:
+            draft_size = draft_size[::-1]
+            original_size = ImgSize(*original_size[::-1])
+        image.draft(color, tuple(draft_size))
     image = PIL.ImageOps.exif_transpose(image)
     image = image.convert(color)
-    return image
+    return image, original_size or ImgSize(*image.size)
 
 
 # TODO: Deprecated
@@ -44,14 +78,27 @@ def get_image_size(filepath: Union[str, Path]) -> Tuple[int, int]:
 
 def get_img_size(filepath: Union[str, Path]) -> ImgSize:
     """
-    Returns image (width, height)
+    Returns image (width, height), taking the EXIF orientation into account.
+
+    The size of JPEG and PNG images is read from the file header, other formats
+    are opened with PIL. The image is never decoded.
     """
+    try:
+        image_size = _read_header_img_size(filepath)
+    except (OSError, struct.error):
+        image_size = None
+    if image_size is not None:
+        return image_size
+
     with PIL.Image.open(filepath) as image:
         image_size = image.size
 
     try:
         exif = image._getexif()
-        if exif is not None and exif[_EXIF_ORIENTATION_TAG] in [6, 8]:
+        if (
+            exif is not None
+            and exif[_EXIF_ORIENTATION_TAG] in _EXIF_TRANSPOSED_ORIENTATIONS
+        ):
             image_size = image_size[::-1]
     except (AttributeError, KeyError, IndexError):
         # cases: image don't have getexif
@@ -60,6 +107,75 @@ def get_img_size(filepath: Union[str, Path]) -> ImgSize:
     return ImgSize(*image_size)
 
 
+def get_img_sizes(
+    filepaths: Sequence[Union[str, Path]], num_workers: int = 8
+) -> List[ImgSize]:
+    "Calls `get_img_size` for all `filepaths` using a pool of `num_workers` threads"
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        return list(executor.map(get_img_size, filepaths))
+
+
+def _read_header_img_size(filepath: Union[str, Path]) -> Optional[ImgSize]:
+    "Reads the size of a JPEG or PNG image from its header, `None` for other formats"
+    with open(filepath, "rb") as f:
+        header = f.read(24)
+        if header.startswith(_PNG_SIGNATURE) and header[12:16] == b"IHDR":
+            width, height = struct.unpack(">II", header[16:24])
+            return ImgSize(width=width, height=height)
+        if header.startswith(b"\xff\xd8"):
+            f.seek(2)
+            return _read_jpeg_size(f)
+    return None
+
+
+def _read_jpeg_size(f) -> Optional[ImgSize]:
+    orientation = 1
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        # markers can be preceded by any number of fill bytes
+        while code == 0xFF:
+            fill = f.read(1)
+            if not fill:
+                return None
+            code = fill[0]
+        # standalone markers have no length
+        if code == 0x01 or 0xD0 <= code <= 0xD8:
+            continue
+
+        (length,) = struct.unpack(">H", f.read(2))
+        if code in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">xHH", f.read(5))
+            if orientation in _EXIF_TRANSPOSED_ORIENTATIONS:
+                width, height = height, width
+            return ImgSize(width=width, height=height)
+        if code == 0xE1:
+            orientation = _exif_orientation(f.read(length - 2)) or orientation
+        else:
+            f.seek(length - 2, 1)
+
+
+def _exif_orientation(app1: bytes) -> Optional[int]:
+    "Orientation tag of the first IFD of an APP1 segment, `None` if missing"
+    if not app1.startswith(b"Exif\x00\x00"):
+        return None
+    tiff = app1[6:]
+    endian = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if endian is None:
+        return None
+
+    (offset,) = struct.unpack(endian + "I", tiff[4:8])
+    (num_entries,) = struct.unpack(endian + "H", tiff[offset : offset + 2])
+    for i in range(num_entries):
+        start = offset + 2 + 12 * i
+        tag, _, _, value = struct.unpack(endian + "HHIH", tiff[start : start + 10])
+        if tag == _EXIF_ORIENTATION_TAG:
+            return value
+    return None
+
+
 def show_img(img, ax=None, show: bool = False, **kwargs):
     img = img.squeeze().copy()
     cmap = "gray" if len(img.shape) == 2 else None
@@ -0,0 +1,221 @@
+__all__ = ["ImageCache"]
+
+import hashlib
+import tempfile
+import weakref
+from icevision.imports import *
+from icevision.utils.imageio import ImgSize, open_img_with_size
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+
+_SHM_DIR = Path("/dev/shm")
+_STATS = ["hits", "misses", "evictions", "num_bytes"]
+
+
+class ImageCache:
+    """Cache of decoded images shared by all the processes that use it, e.g. the
+    workers of a `DataLoader`.
+
+    Pass it to `Dataset(..., img_cache=cache)` and the images of records with a
+    `FilepathRecordComponent` are decoded only the first time they are loaded, the
+    following loads read the uint8 array from the cache (as a `np.ndarray` instead
+    of a `PIL.Image`). Transforms are applied after the cache, so random
+    augmentations are not affected.
+
+    Each image is stored as a `.npy` file in `cache_dir`, by default a temporary
+    directory in shared memory (`/dev/shm`) that is removed when the cache is
+    garbage collected by the process that created it. When the stored images use
+    more than `max_bytes` the least recently used ones are evicted. Images are
+    identified by filepath, modification time and size, so a modified file is
+    decoded again.
+
+    # Arguments
+        max_bytes: Memory budget for the decoded images.
+        cache_dir: Directory where the images are stored, can be reused between runs.
+            Use a directory in a tmpfs (like `/dev/shm`) to keep it in memory.
+    """
+
+    def __init__(self, max_bytes: int, cache_dir: Optional[Union[str, Path]] = None):
+        self.max_bytes = max_bytes
+        if cache_dir is None:
+            tmp_dir = _SHM_DIR if _SHM_DIR.is_dir() else None
+            cache_dir = tempfile.mkdtemp(prefix="icevision_img_cache_", dir=tmp_dir)
+            # only the process that created the directory removes it
+            weakref.finalize(self, _remove_cache_dir, cache_dir, os.getpid())
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # counters shared by all processes, also used as lock
+        self._stats_path = self.cache_dir / "stats"
+        with open(self._stats_path, "ab") as f:
+            if f.tell() < len(_STATS) * 8:
+                f.truncate(len(_STATS) * 8)
+        self._stats_file, self._stats = None, None
+        self._warned_full = False
+
+        # images already cached in a reused directory don't count as used space
+        available_bytes = shutil.disk_usage(self.cache_dir).free + sum(
+            entry.stat().st_size for entry in self._entries()
+        )
+        if self.max_bytes > available_bytes:
+            logger.warning(
+                "Only {} MB are available in {}, the image cache budget is reduced "
+                "from {} MB",
+                available_bytes // 2 ** 20,
+                str(self.cache_dir),
+                self.max_bytes // 2 ** 20,
+            )
+            self.max_bytes = available_bytes
+
+    def __getstate__(self):
+        # file handles are opened again by each process
+        state = self.__dict__.copy()
+        state["_stats_file"], state["_stats"] = None, None
+        return state
+
+    def load(
+        self, filepath: Union[str, Path], draft_size: Optional[ImgSize] = None
+    ) -> np.ndarray:
+        "Returns the cached image, decodes it with `open_img` and caches it if missing"
+        return self.load_with_size(filepath, draft_size=draft_size)[0]
+
+    def load_with_size(
+        self, filepath: Union[str, Path], draft_size: Optional[ImgSize] = None
+    ) -> Tuple[np.ndarray, ImgSize]:
+        """Same as `load`, also returns the full resolution size of the image, which
+        is stored with the image (see `open_img_with_size`).
+        """
+        key = self._key(filepath, draft_size)
+        entry = self._get(key)
+        if entry is None:
+            img, original_size = open_img_with_size(filepath, draft_size=draft_size)
+            # a copy, so it's writable like the arrays loaded from the cache
+            entry = np.array(img), original_size
+            self._put(key, *entry)
+        return entry
+
+    def stats(self) -> dict:
+        "Counters aggregated over all the processes using the cache"
+        with self._lock():
+            stats = dict(zip(_STATS, self._stats.tolist()))
+        num_loads = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / num_loads if num_loads else None
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._lock():
+            for i, name in enumerate(_STATS):
+                if name != "num_bytes":
+                    self._stats[i] = 0
+
+    def clear(self) -> None:
+        "Removes all the cached images"
+        with self._lock():
+            for entry in self._entries():
+                os.unlink(entry.path)
+            self._stats[_STATS.index("num_bytes")] = 0
+
+    def _key(self, filepath: Union[str, Path], draft_size: Optional[ImgSize]) -> str:
+        stat = os.stat(filepath)
+        name = f"{os.path.abspath(filepath)}:{stat.st_mtime_ns}:{stat.st_size}"
+        if draft_size is not None:
+            name += f":{draft_size.width}x{draft_size.height}"
+        return hashlib.sha1(name.encode()).hexdigest()
+
+    def _get(self, key: str) -> Optional[Tuple[np.ndarray, ImgSize]]:
+        entry_path = self.cache_dir / f"{key}.npy"
+        try:
+            # the full resolution size is saved after the image in the same file
+            with open(entry_path, "rb") as f:
+                img = np.load(f)
+                entry = img, ImgSize(*np.load(f).tolist())
+            # the modification time is used as last access time by the eviction
+            os.utime(entry_path)
+        except FileNotFoundError:
+            entry = None
+
+        with self._lock():
+            self._stats[_STATS.index("hits" if entry is not None else "misses")] += 1
+        return entry
+
+    def _put(self, key: str, img: np.ndarray, original_size: ImgSize) -> None:
+        if img.nbytes > self.max_bytes:
+            return
+
+        entry_path = self.cache_dir / f"{key}.npy"
+        # written to a temporary file so other processes never read a partial image
+        tmp_path = self.cache_dir / f"{key}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, img)
+                np.save(f, np.array(original_size))
+        except OSError as e:
+            # e.g. the filesystem is full, the image is just not cached
+            if tmp_path.exists():
+                os.unlink(tmp_path)
+            if not self._warned_full:
+                logger.warning(
+                    "Could not write to the image cache in {}, images that do not "
+                    "fit are not cached: {}",
+                    str(self.cache_dir),
+                    str(e),
+                )
+                self._warned_full = True
+            return
+        num_bytes = tmp_path.stat().st_size
+
+        with self._lock():
+            if entry_path.exists():
+                # cached by another process in the meantime
+                os.unlink(tmp_path)
+                return
+            os.replace(tmp_path, entry_path)
+            self._stats[_STATS.index("num_bytes")] += num_bytes
+            if self._stats[_STATS.index("num_bytes")] > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        "Removes the least recently used images, the lock must be held"
+        entries = sorted(self._entries(), key=lambda o: o.stat().st_mtime_ns)
+        num_bytes = sum(entry.stat().st_size for entry in entries)
+        # evicts a bit more than necessary so the directory is not scanned on
+        # every new image once the cache is full
+        target_bytes = 0.9 * self.max_bytes
+        num_evicted = 0
+        for entry in entries:
+            if num_bytes <= target_bytes:
+                break
+            num_bytes -= entry.stat().st_size
+            os.unlink(entry.path)
+            num_evicted += 1
+
+        self._stats[_STATS.index("num_bytes")] = num_bytes
+        self._stats[_STATS.index("evictions")] += num_evicted
+
+    def _entries(self) -> List[os.DirEntry]:
+        return [o for o in os.scandir(self.cache_dir) if o.name.endswith(".npy")]
+
+    @contextmanager
+    def _lock(self):
+        if self._stats is None:
+            self._stats_file = open(self._stats_path, "r+b")
+            self._stats = np.memmap(
+                self._stats_file, dtype=np.int64, mode="r+", shape=(len(_STATS),)
+            )
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._stats_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._stats_file, fcntl.LOCK_UN)
+
+
+def _remove_cache_dir(cache_dir: str, pid: int) -> None:
+    # copies of the cache in forked workers are garbage collected too
+    if os.getpid() == pid:
+        shutil.rmtree(cache_dir, ignore_errors=True)
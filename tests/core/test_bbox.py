@@ -29,3 +29,71 @@ def test_bbox_autofix():
     bbox = BBox.from_xyxy(-1, 1, 4, 4)
     bbox.autofix(img_w=3, img_h=2)
     assert bbox.xyxy == (0, 1, 3, 2)
+
+
+def test_bboxes_simple():
+    bboxes = BBoxes.from_xyxy(np.array([[1, 2, 3, 4], [10, 20, 40, 30]]))
+
+    assert len(bboxes) == 2
+    np.testing.assert_equal(bboxes.yxyx, [[2, 1, 4, 3], [20, 10, 30, 40]])
+    np.testing.assert_equal(bboxes.xywh, [[1, 2, 2, 2], [10, 20, 30, 10]])
+    np.testing.assert_equal(bboxes.area, [4, 300])
+    assert bboxes[1] == BBox.from_xyxy(10, 20, 40, 30)
+    assert list(bboxes) == [BBox.from_xyxy(1, 2, 3, 4), BBox.from_xyxy(10, 20, 40, 30)]
+    assert bboxes == [BBox.from_xyxy(1, 2, 3, 4), BBox.from_xyxy(10, 20, 40, 30)]
+    assert BBoxes.from_xywh(bboxes.xywh) == bboxes
+    assert BBoxes.from_yxyx(bboxes.yxyx) == bboxes
+    assert BBoxes() == []
+
+
+def test_bboxes_relative_xcycwh():
+    w, h = 640, 480
+    xcycwh = np.array([[0.7, 0.2, 0.1, 0.2]])
+    bboxes = BBoxes.from_relative_xcycwh(xcycwh, img_width=w, img_height=h)
+    assert bboxes.xyxy.tolist() == [[416, 48, 480, 144]]
+    np.testing.assert_allclose(bboxes.relative_xcycwh(w, h), xcycwh)
+
+
+def test_bboxes_autofix():
+    bboxes = BBoxes.from_xyxy(
+        np.array([[-1, 1, 4, 4], [1, 2, 2, 2], [-2, 1, -1, 2], [0, 0, 1, 1]])
+    )
+    success = bboxes.autofix(img_w=3, img_h=2)
+
+    assert success.tolist() == [True, False, False, True]
+    assert bboxes[0].xyxy == (0, 1, 3, 2)
+    assert bboxes[3].xyxy == (0, 0, 1, 1)
+
+
+def test_bboxes_autofix_log():
+    messages = []
+    handler_id = logger.add(messages.append, format="{message}")
+    try:
+        bboxes = BBoxes.from_xyxy(np.array([[5, 0, 6, 1], [0, -2, 1, -1]]))
+        bboxes.autofix(img_w=3, img_h=2)
+    finally:
+        logger.remove(handler_id)
+
+    assert any("xmin from 5.0 to image width 3.0" in o for o in messages)
+    assert any("ymax from -1.0 to 0.0" in o for o in messages)
+
+
+def test_bboxes_iou():
+    bboxes = BBoxes.from_xyxy(np.array([[0, 0, 2, 2], [1, 1, 3, 3]]))
+    other = BBoxes.from_xyxy(np.array([[0, 0, 2, 2], [5, 5, 6, 6], [0, 0, 0, 0]]))
+
+    expected = torchvision.ops.box_iou(bboxes.to_tensor(), other.to_tensor())
+    np.testing.assert_allclose(bboxes.iou(other), expected.numpy(), atol=1e-6)
+    assert bboxes.iou(BBoxes()).shape == (2, 0)
+
+
+def test_bboxes_list_ops():
+    bboxes = BBoxes()
+    bboxes.extend([BBox.from_xyxy(1, 2, 3, 4)])
+    bboxes.append(BBox.from_xyxy(5, 6, 7, 8))
+    bboxes.extend(BBoxes.from_xyxy(np.array([[0, 0, 1, 1]])))
+    assert len(bboxes) == 3
+
+    assert bboxes.pop(1) == BBox.from_xyxy(5, 6, 7, 8)
+    assert bboxes == [BBox.from_xyxy(1, 2, 3, 4), BBox.from_xyxy(0, 0, 1, 1)]
+    assert bboxes[1:] == [BBox.from_xyxy(0, 0, 1, 1)]
@@ -82,3 +82,45 @@ def test_mask_unconnected_polygon(samples_source):
     mask = poly.to_erles(h, w).to_mask(h, w)
 
     assert mask.shape == (1, h, w)
+
+
+@pytest.fixture
+def random_masks():
+    rng = np.random.RandomState(42)
+    masks = rng.rand(5, 13, 7) > 0.5
+    # edge cases: empty, full and starting with ones
+    masks[0] = False
+    masks[1] = True
+    masks[2, 0, 0] = True
+    return MaskArray(masks)
+
+
+def test_mask_array_to_coco_rle_round_trip(random_masks):
+    h, w = 13, 7
+    for mask, rle in zip(random_masks.data, random_masks.to_coco_rle(h=h, w=w)):
+        assert sum(rle["counts"]) == h * w
+        decoded = RLE.from_coco(rle["counts"]).to_mask(h=h, w=w)
+        np.testing.assert_equal(decoded.data[0], mask)
+
+    erles = random_masks.to_erles(h=h, w=w)
+    np.testing.assert_equal(erles.to_mask(h=h, w=w).data, random_masks.data)
+
+
+def test_mask_array_to_kaggle_rle_round_trip(random_masks):
+    h, w = 13, 7
+    kaggle_rles = random_masks.to_kaggle_rle(h=h, w=w)
+    assert kaggle_rles[0] == []
+    assert kaggle_rles[1] == [1, h * w]
+
+    for mask, kaggle_counts in zip(random_masks.data, kaggle_rles):
+        decoded = RLE.from_kaggle(kaggle_counts).to_mask(h=h, w=w)
+        np.testing.assert_equal(decoded.data[0], mask)
+
+
+def test_rle_to_kaggle(kaggle_counts, coco_counts):
+    # the zero length run at the end is dropped
+    assert RLE.from_coco(coco_counts).to_kaggle() == kaggle_counts[:-2]
+
+    mask = RLE.from_kaggle(kaggle_counts[:-2]).to_mask(17, 1)
+    expected = [1, 1, 1, 0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 1, 0, 0]
+    assert mask.data.reshape(-1).tolist() == expected
@@ -71,16 +71,40 @@ def test_record_load(record):
     record_loaded = record.load()
 
     assert isinstance(record_loaded.img, PIL.Image.Image)
-    assert isinstance(record_loaded.detection.masks, MaskArray)
+    # masks are only decoded when needed
+    assert isinstance(record_loaded.detection.masks, EncodedRLEs)
+    assert record_loaded.detection.mask_array().shape == (2, 375, 500)
 
     # test original record is not modified
     assert record.img == None
     assert isinstance(record.detection.masks, EncodedRLEs)
 
     # test unload
+    record_loaded.detection.set_masks(record_loaded.detection.mask_array())
     record_loaded.unload()
     assert record_loaded.img == None
     assert isinstance(record_loaded.detection.masks, EncodedRLEs)
+    assert record_loaded.detection.masks == record.detection.masks
+
+
+def test_record_clone(record):
+    record.detection.iscrowds = [0, 0]
+    record_clone = record.clone()
+
+    assert record_clone.record_id == record.record_id
+    assert record_clone.detection.class_map is record.detection.class_map
+    assert record_clone.detection.bboxes == record.detection.bboxes
+    assert record_clone.detection.iscrowds == [0, 0]
+
+    # modifying the clone in place should not affect the original record
+    record_clone.remove_annotation(0, task_name="detection")
+    record_clone.set_record_id(42)
+    assert record_clone.detection.label_ids == [2]
+    assert len(record_clone.detection.masks) == 1
+    assert record.detection.label_ids == [1, 2]
+    assert len(record.detection.bboxes) == 2
+    assert len(record.detection.masks) == 2
+    assert record.record_id == 1
 
 
 class TestKeypointsMetadata(KeypointsMetadata):
@@ -0,0 +1,121 @@
+import pytest
+from icevision.all import *
+
+
+@pytest.fixture
+def records(coco_mask_records):
+    return coco_mask_records[:4]
+
+
+@pytest.fixture
+def record_collection(records):
+    return RecordCollection.from_records(records)
+
+
+def check_record_equal(record, expected):
+    assert record.record_id == expected.record_id
+    assert record.filepath == expected.filepath
+    assert record.img_size == expected.img_size
+    assert record.detection.class_map == expected.detection.class_map
+    assert record.detection.label_ids == expected.detection.label_ids
+    assert record.detection.labels == expected.detection.labels
+    assert record.detection.bboxes == expected.detection.bboxes
+    assert record.detection.areas == pytest.approx(expected.detection.areas)
+    assert record.detection.iscrowds == expected.detection.iscrowds
+    assert record.detection.masks == expected.detection.masks
+
+
+def test_record_collection_from_records(record_collection, records):
+    assert len(record_collection) == 4
+
+    num_annotations = [len(o.detection.label_ids) for o in records]
+    assert record_collection.num_annotations().tolist() == num_annotations
+    assert record_collection.columns["detection"]["bboxes"].shape == (
+        sum(num_annotations),
+        4,
+    )
+
+    for record, expected in zip(record_collection, records):
+        check_record_equal(record, expected)
+
+
+def test_record_collection_take(record_collection, records):
+    subset = record_collection[[3, 1]]
+    assert isinstance(subset, RecordCollection)
+    assert len(subset) == 2
+    check_record_equal(subset[0], records[3])
+    check_record_equal(subset[1], records[1])
+
+    subset = record_collection[1:3]
+    assert [o.record_id for o in subset] == [o.record_id for o in records[1:3]]
+    check_record_equal(record_collection[-1], records[-1])
+
+    with pytest.raises(IndexError):
+        record_collection[4]
+
+
+def test_record_collection_view_is_independent(record_collection):
+    record = record_collection[0]
+    record.detection.set_labels_by_id([])
+    assert len(record_collection[0].detection.label_ids) > 0
+
+
+def test_record_collection_dataset(record_collection, records):
+    ds = Dataset(record_collection)
+    sample = ds[0]
+    assert sample.img.shape == (records[0].height, records[0].width, 3)
+    assert isinstance(sample.detection.masks, EncodedRLEs)
+
+    (images, targets), batch_records = models.torchvision.mask_rcnn.build_train_batch(
+        [ds[0], ds[1]]
+    )
+    assert len(images) == len(targets) == 2
+    assert len(targets[0]["boxes"]) == len(records[0].detection.bboxes)
+
+
+def test_record_collection_pickle(record_collection):
+    loaded = pickle.loads(pickle.dumps(record_collection))
+    assert len(loaded) == len(record_collection)
+    check_record_equal(loaded[2], record_collection[2])
+
+
+def test_record_collection_different_components(records):
+    record = BaseRecord((FilepathRecordComponent(),))
+    record.set_record_id(100)
+    record.set_filepath("none.jpg")
+    with pytest.raises(ValueError):
+        RecordCollection.from_records([records[0], record])
+
+
+def test_record_collection_multiple_tasks():
+    record = BaseRecord(
+        (
+            ClassificationLabelsRecordComponent(),
+            InstancesLabelsRecordComponent(),
+            BBoxesRecordComponent(),
+        )
+    )
+    record.set_record_id(1)
+    record.set_img_size(ImgSize(10, 10))
+    record.classification.set_class_map(ClassMap(["cat", "dog"]))
+    record.classification.set_labels(["dog"])
+    record.detection.set_class_map(ClassMap(["a", "b"]))
+    record.detection.set_labels(["a", "b"])
+    record.detection.set_bboxes(
+        [BBox.from_xyxy(1, 2, 3, 4), BBox.from_xyxy(5, 6, 7, 8)]
+    )
+
+    loaded = RecordCollection.from_records([record])[0]
+    assert loaded.classification.labels == ["dog"]
+    assert loaded.detection.labels == ["a", "b"]
+    assert loaded.detection.bboxes == record.detection.bboxes
+
+
+def test_record_collection_annotations_without_labels():
+    record = BaseRecord(
+        (InstancesLabelsRecordComponent(), BBoxesRecordComponent(task=tasks.common))
+    )
+    record.set_record_id(1)
+    record.detection.set_class_map(ClassMap(["a"]))
+    with pytest.raises(ValueError, match="no labels component"):
+        RecordCollection.from_records([record])
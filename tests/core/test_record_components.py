@@ -65,3 +65,19 @@ def test_one_hot_encodings(dummy_class_map_elaborate, label_ids):
     one_hot_values = rec.classification.one_hot_encoded()
     assert one_hot_values.sum() == len(label_ids)
     assert np.unique(one_hot_values).tolist() == [0, 1]
+
+
+def test_set_bboxes_does_not_share_container():
+    bboxes = [BBox.from_xyxy(1, 2, 3, 4), BBox.from_xyxy(10, 20, 30, 40)]
+    rec1 = BaseRecord([BBoxesRecordComponent()])
+    rec1.detection.set_bboxes(bboxes)
+    rec2 = BaseRecord([BBoxesRecordComponent()])
+    rec2.detection.set_bboxes(rec1.detection.bboxes)
+
+    rec2.detection.bboxes.pop(0)
+    assert rec1.detection.bboxes == bboxes
+    assert rec2.detection.bboxes == bboxes[1:]
+
+    rec1.detection.add_bboxes([BBox.from_xyxy(5, 6, 7, 8)])
+    assert len(rec1.detection.bboxes) == 3
+    assert rec2.detection.bboxes == bboxes[1:]
@@ -0,0 +1,62 @@
+import threading
+import pytest
+from icevision.all import *
+
+
+def _batches(n: int):
+    for i in range(n):
+        # torchvision, efficientdet and mmdet batch structures
+        yield (
+            [torch.full((3, 2, 2), i)],
+            [{"boxes": torch.zeros(1, 4), "labels": torch.ones(1)}],
+        ), [i]
+        yield (torch.zeros(1, 3, 2, 2), {"cls": [torch.ones(1)], "img_size": None}), [i]
+        yield {"img": [torch.zeros(1, 3, 2, 2)], "img_metas": [[{"a": (2, 2)}]]}, [i]
+
+
+def test_device_prefetcher():
+    prefetcher = DevicePrefetcher(list(_batches(2)), device="meta")
+    assert len(prefetcher) == 6
+
+    batches = list(prefetcher)
+    assert [records for _, records in batches] == [[0]] * 3 + [[1]] * 3
+
+    (imgs, targets), _ = batches[0]
+    assert imgs[0].device.type == "meta" and imgs[0].shape == (3, 2, 2)
+    assert targets[0]["boxes"].device.type == "meta"
+    (imgs, targets), _ = batches[1]
+    assert imgs.device.type == "meta"
+    assert targets["cls"][0].device.type == "meta"
+    assert targets["img_size"] is None
+    data, _ = batches[2]
+    assert data["img"][0].device.type == "meta"
+    assert data["img_metas"] == [[{"a": (2, 2)}]]
+
+
+def test_device_prefetcher_error():
+    def failing_dl():
+        yield from itertools.islice(_batches(1), 2)
+        raise ValueError("bad batch")
+
+    batches = []
+    with pytest.raises(ValueError, match="bad batch"):
+        for batch in DevicePrefetcher(failing_dl(), device="cpu"):
+            batches.append(batch)
+    assert len(batches) == 2
+
+
+def test_device_prefetcher_stops_thread():
+    num_threads = threading.active_count()
+    for _ in DevicePrefetcher(_batches(100), device="cpu", num_batches=1):
+        break
+    assert threading.active_count() == num_threads
+
+
+def test_device_prefetcher_infer_dl():
+    images = [np.zeros((8, 8, 3), dtype=np.uint8) for _ in range(5)]
+    dataset = Dataset.from_images(images, class_map=ClassMap(["a"]))
+    dl = models.torchvision.faster_rcnn.infer_dl(dataset, batch_size=2)
+
+    batches = list(DevicePrefetcher(dl, device="cpu"))
+    assert [len(records) for _, records in batches] == [2, 2, 1]
+    assert batches[0][0][0].shape == (2, 3, 8, 8)
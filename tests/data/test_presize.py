@@ -0,0 +1,74 @@
+import pytest
+from icevision.all import *
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_presize_records(coco_mask_records, tmp_path, num_workers):
+    records = coco_mask_records
+    presized_records = presize_records(
+        records, 120, tmp_path, num_workers=num_workers, show_pbar=False
+    )
+
+    assert len(presized_records) == len(records)
+    for record, presized in zip(records, presized_records):
+        scale = 120 / min(record.img_size)
+        assert min(presized.img_size) == 120
+        assert presized.filepath.parent == tmp_path
+        scale_xy = [presized.width / record.width, presized.height / record.height]
+        np.testing.assert_allclose(
+            presized.detection.bboxes.xyxy,
+            record.detection.bboxes.xyxy * np.tile(scale_xy, 2),
+        )
+        np.testing.assert_allclose(
+            presized.detection.areas,
+            np.array(record.detection.areas) * scale**2,
+            rtol=0.05,
+        )
+
+        sample = presized.load()
+        assert sample.img_size == presized.img_size
+        assert sample.detection.mask_array().shape == (
+            len(record.detection.masks),
+            presized.height,
+            presized.width,
+        )
+
+    original_sizes = load_original_img_sizes(tmp_path)
+    for record, presized in zip(records, presized_records):
+        original = presized.rescale(original_sizes[presized.record_id])
+        assert original.img_size == record.img_size
+        np.testing.assert_allclose(
+            original.detection.bboxes.xyxy, record.detection.bboxes.xyxy
+        )
+
+
+def test_presize_records_skips_saved_images(coco_mask_records, tmp_path):
+    records = coco_mask_records[:1]
+    presized = presize_records(records, (50, 60), tmp_path, show_pbar=False)[0]
+    assert presized.img_size == ImgSize(width=60, height=50)
+    mtime = presized.filepath.stat().st_mtime_ns
+
+    presize_records(records, (50, 60), tmp_path, show_pbar=False)
+    assert presized.filepath.stat().st_mtime_ns == mtime
+
+    # images smaller than the presize are copied
+    filepath = presize_records(records, 1000, tmp_path / "copy", show_pbar=False)[
+        0
+    ].filepath
+    assert filepath.read_bytes() == records[0].filepath.read_bytes()
+
+
+def test_presize_records_resizes_stale_images(coco_mask_records, tmp_path):
+    records = coco_mask_records[:1]
+    presize_records(records, (50, 60), tmp_path, show_pbar=False)
+
+    presized = presize_records(records, (30, 40), tmp_path, show_pbar=False)[0]
+    assert presized.img_size == ImgSize(width=40, height=30)
+    assert np.asarray(presized.load().img).shape == (30, 40, 3)
+
+    # a different source image with the same record id
+    other = coco_mask_records[1].clone()
+    other.set_record_id(records[0].record_id)
+    presized = presize_records([other], (30, 40), tmp_path, show_pbar=False)[0]
+    expected = presize_records([other], (30, 40), tmp_path / "other", show_pbar=False)
+    assert presized.filepath.read_bytes() == expected[0].filepath.read_bytes()
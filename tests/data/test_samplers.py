@@ -0,0 +1,58 @@
+import pytest
+from icevision.all import *
+from icevision.models.torchvision import faster_rcnn
+
+
+@pytest.fixture
+def records():
+    sizes = [(40, 20), (20, 40), (40, 20), (20, 40), (30, 30), (80, 40), (40, 80)]
+    records = []
+    for i, (width, height) in enumerate(sizes):
+        record = BaseRecord((ImageRecordComponent(),))
+        record.set_record_id(i)
+        record.set_img(np.zeros((height, width, 3), dtype=np.uint8))
+        record.add_component(ClassMapRecordComponent(task=tasks.detection))
+        record.detection.set_class_map(ClassMap(["a"]))
+        records.append(record)
+    return records
+
+
+def _aspect_ratios(records, batch):
+    return {records[i].width / records[i].height for i in batch}
+
+
+def test_aspect_ratio_batch_sampler(records):
+    sampler = AspectRatioBatchSampler(records, batch_size=2, seed=1)
+    batches = list(sampler)
+
+    assert len(batches) == len(sampler) == 5
+    assert sorted(i for batch in batches for i in batch) == list(range(7))
+    for batch in batches:
+        assert len(_aspect_ratios(records, batch)) == 1
+    # images of each bucket are sorted by area
+    assert [0, 2] in batches and [5] in batches and [1, 3] in batches
+
+    # the order changes every epoch, but is deterministic
+    assert list(sampler) != batches
+    sampler.set_epoch(0)
+    assert list(sampler) == batches
+    assert list(AspectRatioBatchSampler(records, batch_size=2, seed=1)) == batches
+
+
+def test_aspect_ratio_batch_sampler_no_shuffle(records):
+    sampler = AspectRatioBatchSampler(
+        Dataset(records), batch_size=2, shuffle=False, drop_last=True
+    )
+    assert list(sampler) == [[1, 3], [0, 2]]
+    assert len(sampler) == 2
+
+
+def test_aspect_ratio_batch_sampler_dataloader(records):
+    dataset = Dataset(records)
+    sampler = AspectRatioBatchSampler(dataset, batch_size=2)
+    dl = faster_rcnn.infer_dl(dataset, batch_sampler=sampler)
+
+    # images of the same size are stacked without padding
+    for (imgs,), batch_records in dl:
+        assert imgs.shape[0] == len(batch_records)
+        assert len({record.img_size for record in batch_records}) == 1
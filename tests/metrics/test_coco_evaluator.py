@@ -0,0 +1,178 @@
+import pytest
+from icevision.all import *
+from pycocotools.cocoeval import COCOeval
+
+
+def _random_records(metric_type, n_imgs=30, seed=0, h=60, w=80):
+    rng = np.random.RandomState(seed)
+    class_map = ClassMap(["a", "b", "c", "d"])
+
+    def _record(is_pred):
+        components = [
+            SizeRecordComponent(),
+            FilepathRecordComponent(),
+            InstancesLabelsRecordComponent(),
+            BBoxesRecordComponent(),
+        ]
+        if is_pred:
+            components.append(ScoresRecordComponent())
+        else:
+            components.append(IsCrowdsRecordComponent())
+        if metric_type == "segm":
+            components.append(MasksRecordComponent())
+        if metric_type == "keypoints":
+            components.append(KeyPointsRecordComponent())
+        record = BaseRecord(components)
+        record.set_filepath("none")
+        record.set_img_size(ImgSize(w, h), original=True)
+        record.detection.set_class_map(class_map)
+        return record
+
+    def _add_annotations(record, xyxy, labels, kpts):
+        record.detection.add_labels_by_id(labels)
+        record.detection.add_bboxes([BBox.from_xyxy(*o) for o in xyxy])
+        if metric_type == "segm":
+            masks = np.zeros((len(xyxy), h, w), dtype=np.uint8)
+            for mask, (x1, y1, x2, y2) in zip(masks, xyxy.astype(int)):
+                mask[y1:y2, x1:x2] = 1
+            record.detection.add_masks([MaskArray(masks)])
+        if metric_type == "keypoints":
+            record.detection.add_keypoints(
+                [KeyPoints(o.reshape(-1), None) for o in kpts]
+            )
+
+    records, preds = [], []
+    for i in range(n_imgs):
+        record, pred = _record(is_pred=False), _record(is_pred=True)
+        record.set_record_id(i)
+        pred.set_record_id(i)
+
+        n_gts = rng.randint(0, 6)
+        xy = rng.uniform(0, [w - 10, h - 10], (n_gts, 2))
+        xyxy = np.concatenate(
+            [xy, np.minimum(xy + rng.uniform(4, 40, (n_gts, 2)), [w, h])], 1
+        )
+        labels = rng.randint(1, 5, n_gts)
+        kpts = rng.uniform(xyxy[:, None, :2], xyxy[:, None, 2:], (n_gts, 17, 2))
+        # some instances without labeled keypoints
+        visible = rng.randint(0, 3, (n_gts, 17, 1)) * (rng.rand(n_gts, 1, 1) > 0.1)
+        kpts = np.concatenate([kpts, visible], -1)
+        _add_annotations(record, xyxy, labels.tolist(), kpts)
+        record.detection.add_iscrowds((rng.rand(n_gts) < 0.1).astype(int).tolist())
+
+        n_dts = rng.randint(0, 8) if n_gts else rng.randint(0, 2)
+        idxs = rng.randint(0, max(n_gts, 1), n_dts)
+        dt_xyxy = xyxy[idxs] if n_gts else np.tile([[0, 0, 10, 10]], (n_dts, 1))
+        dt_xyxy = np.clip(dt_xyxy + rng.normal(0, 3, (n_dts, 4)), 0, [w, h, w, h])
+        dt_xyxy[:, 2:] = np.maximum(dt_xyxy[:, 2:], dt_xyxy[:, :2] + 1)
+        dt_labels = labels[idxs] if n_gts else np.ones(n_dts, dtype=int)
+        dt_labels = np.where(rng.rand(n_dts) < 0.8, dt_labels, rng.randint(1, 5, n_dts))
+        dt_kpts = kpts[idxs] if n_gts else np.ones((n_dts, 17, 3))
+        dt_kpts = dt_kpts + rng.normal(0, 1, dt_kpts.shape) * [1, 1, 0]
+        _add_annotations(pred, dt_xyxy, dt_labels.tolist(), dt_kpts)
+        # rounded scores to also have ties
+        pred.detection.set_scores(rng.rand(n_dts).round(1))
+
+        records.append(record)
+        preds.append(pred)
+
+    return records, preds
+
+
+def _keypoints_coco_eval(records, preds) -> COCOeval:
+    def _dataset(records, is_pred):
+        anns = []
+        for record in records:
+            bboxes = record.detection.bboxes.xywh
+            for i, kpts in enumerate(record.detection.keypoints):
+                ann = {
+                    "id": len(anns) + 1,
+                    "image_id": record.record_id,
+                    "category_id": record.detection.label_ids[i],
+                    "bbox": bboxes[i].tolist(),
+                    "area": float(bboxes[i, 2] * bboxes[i, 3]),
+                    "keypoints": kpts.keypoints.tolist(),
+                    "num_keypoints": int((kpts.visible > 0).sum()),
+                    "iscrowd": record.detection.iscrowds[i] if not is_pred else 0,
+                }
+                if is_pred:
+                    ann["score"] = record.detection.scores[i]
+                anns.append(ann)
+        images = [{"id": record.record_id} for record in records]
+        categories = [{"id": i} for i in set(o["category_id"] for o in anns)]
+        return {"images": images, "annotations": anns, "categories": categories}
+
+    target_ds = create_coco_api(_dataset(records, is_pred=False))
+    pred_ds = create_coco_api(_dataset(preds, is_pred=True))
+    return COCOeval(target_ds, pred_ds, "keypoints")
+
+
+def _run(coco_eval):
+    with CaptureStdout():
+        coco_eval.evaluate()
+        coco_eval.accumulate()
+    with CaptureStdout() as output:
+        coco_eval.summarize()
+    return output
+
+
+def test_coco_evaluator(records, preds):
+    coco_eval = create_coco_eval(deepcopy(records), deepcopy(preds), "bbox")
+    evaluator = COCOEvaluator(records, preds, "bbox")
+
+    assert _run(evaluator) == _run(coco_eval)
+    np.testing.assert_equal(evaluator.stats, coco_eval.stats)
+
+
+@pytest.mark.parametrize("metric_type", ["bbox", "segm", "keypoints"])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_coco_evaluator_matches_pycocotools(metric_type, seed):
+    records, preds = _random_records(metric_type, seed=seed)
+    if metric_type == "keypoints":
+        coco_eval = _keypoints_coco_eval(records, preds)
+    else:
+        coco_eval = create_coco_eval(deepcopy(records), deepcopy(preds), metric_type)
+    evaluator = COCOEvaluator(records, preds, metric_type)
+
+    _run(coco_eval)
+    _run(evaluator)
+    np.testing.assert_allclose(evaluator.stats, coco_eval.stats, atol=1e-4)
+    np.testing.assert_allclose(
+        evaluator.precision, coco_eval.eval["precision"], atol=1e-4
+    )
+    np.testing.assert_allclose(evaluator.recall, coco_eval.eval["recall"], atol=1e-4)
+
+
+def test_coco_evaluator_iou_thresholds():
+    records, preds = _random_records("bbox", seed=2)
+    coco_eval = create_coco_eval(deepcopy(records), deepcopy(preds), "bbox")
+    coco_eval.params.iouThrs = np.array([0.3, 0.5, 0.75])
+    evaluator = COCOEvaluator(records, preds, "bbox", iou_thresholds=[0.3, 0.5, 0.75])
+
+    assert _run(evaluator) == _run(coco_eval)
+    np.testing.assert_equal(evaluator.stats, coco_eval.stats)
+
+
+@pytest.mark.parametrize("metric_type", ["bbox", "segm", "keypoints"])
+def test_coco_evaluator_update(metric_type):
+    records, preds = _random_records(metric_type, seed=3)
+    evaluator = COCOEvaluator(metric_type=metric_type)
+    for i in range(0, len(records), 8):
+        evaluator.update(records[i : i + 8], preds[i : i + 8])
+    assert len(evaluator) == len(records)
+
+    if metric_type == "keypoints":
+        expected = _keypoints_coco_eval(records, preds)
+    else:
+        expected = create_coco_eval(deepcopy(records), deepcopy(preds), metric_type)
+    coco_eval = evaluator.to_coco_eval()
+
+    _run(expected)
+    assert _run(evaluator) == _run(coco_eval)
+    np.testing.assert_equal(coco_eval.stats, expected.stats)
+    np.testing.assert_allclose(evaluator.stats, expected.stats, atol=1e-4)
+
+
+def test_coco_evaluator_empty():
+    with pytest.raises(RuntimeError):
+        COCOEvaluator().evaluate()
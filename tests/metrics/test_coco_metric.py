@@ -1,3 +1,6 @@
+import gc
+import weakref
+
 import pytest
 from icevision.all import *
 
@@ -40,3 +43,32 @@ def test_coco_metric(records, preds, expected_coco_output):
         coco_metric.finalize()
 
     assert output == expected_coco_output
+
+
+def test_coco_metric_numpy_backend(records, preds, expected_coco_output):
+    coco_metric = COCOMetric(print_summary=True, backend=COCOMetricBackend.numpy)
+    preds = [Prediction(pred, gt) for pred, gt in zip(preds, records)]
+    coco_metric.accumulate(preds)
+
+    with CaptureStdout() as output:
+        logs = coco_metric.finalize()
+
+    assert output == expected_coco_output
+    assert logs["AP (IoU=0.50) area=all"] == 1
+
+
+def test_coco_metric_does_not_keep_records(records, preds):
+    coco_metric = COCOMetric()
+    # copies, the fixtures are also referenced by pytest
+    records, preds = deepcopy(records), deepcopy(preds)
+    preds = [Prediction(pred, gt) for pred, gt in zip(preds, records)]
+    refs = [weakref.ref(o) for o in records + [pred.pred for pred in preds]]
+    for pred in preds:
+        coco_metric.accumulate([pred])
+
+    del records, preds, pred
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+
+    logs = coco_metric.finalize()
+    assert logs["AP (IoU=0.50) area=all"] == 1
@@ -191,3 +191,53 @@ def test_confusion_matrix_value(records, preds):
     expected_result = np.diagflat([0, 0, 2, 1])
     assert dummy_result["dummy_value_for_fastai"] == -1
     assert np.equal(cm_result, expected_result).all()
+
+
+@pytest.mark.parametrize(
+    "priorities, expected",
+    [(None, [0, 1, -1]), (np.array([0.8, 0.7, 0.5, 0.6, 0.2, 0.4]), [0, 1, -1])],
+)
+def test_match_bboxes(target, prediction, priorities, expected):
+    result = match_bboxes(
+        target_bboxes=target.detection.bboxes,
+        predicted_bboxes=prediction.detection.bboxes,
+        priorities=priorities,
+        iou_threshold=0.5,
+    )
+    assert result.tolist() == expected
+
+
+def test_match_bboxes_priorities(target, prediction):
+    # the second prediction has the lower iou with the first target
+    priorities = np.array([0.1, 0.9, 0.5, 0.6, 0.2, 0.4])
+    by_score = match_bboxes(
+        target.detection.bboxes, prediction.detection.bboxes, priorities
+    )
+    by_iou = match_bboxes(target.detection.bboxes, prediction.detection.bboxes)
+    assert by_score.tolist() == [1, 1, -1]
+    assert by_iou.tolist() == [0, 1, -1]
+
+
+def test_match_bboxes_empty(target, empty_prediction):
+    result = match_bboxes(target.detection.bboxes, empty_prediction.detection.bboxes)
+    assert result.tolist() == [-1, -1, -1]
+
+
+@pytest.mark.parametrize(
+    "policy, expected_row",
+    [
+        (MatchingPolicy.BEST_SCORE, [0, 0, 1, 0]),
+        (MatchingPolicy.BEST_IOU, [0, 1, 0, 0]),
+    ],
+)
+def test_confusion_matrix_policy(target, prediction, policy, expected_row):
+    prediction.detection.set_scores([0.1, 0.9, 0.5, 0.6, 0.2, 0.4])
+    confusion_matrix = SimpleConfusionMatrix(policy=policy)
+    confusion_matrix.accumulate([Prediction(prediction, target)])
+    confusion_matrix.finalize()
+    cm = confusion_matrix.confusion_matrix
+
+    assert cm[1].tolist() == expected_row
+    # second target matched correctly, third target missed (background)
+    assert cm[2].tolist() == [1, 0, 1, 0]
+    assert cm.sum() == 3
@@ -0,0 +1,109 @@
+import pytest
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from icevision.all import *
+from tests.metrics.test_coco_evaluator import _random_records
+
+
+def _predictions(metric_type="bbox"):
+    records, preds = _random_records(metric_type, seed=4)
+    return [Prediction(pred, record) for pred, record in zip(preds, records)]
+
+
+def _shards(preds, world_size):
+    # like `DistributedSampler`, pads by repeating the first samples
+    num_samples = math.ceil(len(preds) / world_size) * world_size
+    padded = preds + preds[: num_samples - len(preds)]
+    return [padded[rank::world_size] for rank in range(world_size)]
+
+
+def _local_logs(metric, preds):
+    metric.accumulate(preds)
+    return metric.finalize()
+
+
+@pytest.mark.parametrize("metric_type", ["bbox", "segm"])
+def test_coco_metric_load_states(metric_type):
+    preds = _predictions(metric_type)[:29]
+    coco_metric_type = COCOMetricType(metric_type)
+    expected = _local_logs(COCOMetric(coco_metric_type), preds)
+
+    states = []
+    for shard in _shards(preds, 3):
+        metric = COCOMetric(coco_metric_type)
+        for i in range(0, len(shard), 4):
+            metric.accumulate(shard[i : i + 4])
+        states.append(metric.get_state())
+
+    metric = COCOMetric(coco_metric_type)
+    metric.load_states(states)
+    assert metric.finalize() == expected
+
+
+def test_confusion_matrix_load_states():
+    preds = _predictions()
+    metric = SimpleConfusionMatrix()
+    _local_logs(metric, preds)
+    expected = metric.confusion_matrix
+
+    states = []
+    for shard in [preds[:10], [], preds[10:]]:
+        metric = SimpleConfusionMatrix()
+        metric.accumulate(shard)
+        states.append(metric.get_state())
+
+    metric = SimpleConfusionMatrix()
+    metric.load_states(states)
+    metric.finalize()
+    np.testing.assert_equal(metric.confusion_matrix, expected)
+
+
+def _distributed_worker(rank, world_size, init_method):
+    dist.init_process_group(
+        "gloo", init_method=init_method, rank=rank, world_size=world_size
+    )
+    preds = _predictions()[:29]
+    shard = _shards(preds, world_size)[rank]
+
+    coco_metric, confusion_matrix = COCOMetric(), SimpleConfusionMatrix()
+    expected_logs = _local_logs(COCOMetric(), preds)
+    # counts can't tell repeated samples apart, the padding is counted again
+    _local_logs(confusion_matrix, list(itertools.chain(*_shards(preds, world_size))))
+    expected_cm = confusion_matrix.confusion_matrix
+
+    for i in range(0, len(shard), 4):
+        coco_metric.accumulate(shard[i : i + 4])
+        confusion_matrix.accumulate(shard[i : i + 4])
+
+    assert coco_metric.finalize_distributed() == expected_logs
+    # the evaluator is reset on all processes
+    assert len(coco_metric._evaluator) == 0
+    confusion_matrix.finalize_distributed()
+    np.testing.assert_equal(confusion_matrix.confusion_matrix, expected_cm)
+
+    dist.destroy_process_group()
+
+
+@pytest.mark.skipif(not dist.is_available(), reason="torch.distributed not available")
+def test_finalize_distributed(tmp_path):
+    init_method = f"file://{tmp_path / 'init'}"
+    mp.spawn(_distributed_worker, args=(2, init_method), nprocs=2)
+
+
+def test_finalize_distributed_single_process(records, preds):
+    metric = SimpleConfusionMatrix()
+    metric.accumulate(
+        [Prediction(pred, record) for pred, record in zip(preds, records)]
+    )
+    assert metric.finalize_distributed() == {"dummy_value_for_fastai": -1}
+
+
+def test_finalize_distributed_without_all_gather_object(monkeypatch, records, preds):
+    monkeypatch.setattr("icevision.metrics.metric.is_distributed", lambda: True)
+    monkeypatch.delattr(dist, "all_gather_object")
+    metric = SimpleConfusionMatrix()
+    metric.accumulate(
+        [Prediction(pred, record) for pred, record in zip(preds, records)]
+    )
+    with pytest.warns(UserWarning, match="torch>=1.8"):
+        assert metric.finalize_distributed() == {"dummy_value_for_fastai": -1}
@@ -133,3 +133,20 @@ def test_mmdet_mask_rcnn_build_infer_batch(mask_records):
     assert isinstance(rec.width, int)
     assert isinstance(rec.record_id, int)
     assert isinstance(rec.img, np.ndarray)
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.float32])
+def test_mmdet_img_tensor(dtype):
+    from icevision.models.mmdet.common.bbox.dataloaders import _img_tensor
+
+    record = BaseRecord((ImageRecordComponent(),))
+    img = np.random.randint(0, 256, (4, 6, 3)).astype(dtype)
+    record.set_img(img)
+
+    tensor_img = _img_tensor(record)
+    assert tensor_img.is_contiguous()
+    assert torch.equal(tensor_img, im2tensor(img[:, :, ::-1].copy()))
+
+    tensor_img = _img_tensor(record, uint8=True)
+    assert tensor_img.dtype == torch.from_numpy(img).dtype
+    np.testing.assert_equal(tensor_img.numpy(), img[:, :, ::-1].transpose(2, 0, 1))
@@ -28,7 +28,7 @@ def _test_preds(preds, pred_count=2, mask=False):
 
     pred = preds[0].pred
     assert isinstance(pred.detection.label_ids, list)
-    assert isinstance(pred.detection.bboxes, list)
+    assert isinstance(pred.detection.bboxes, BBoxes)
     assert isinstance(pred.detection.scores, np.ndarray)
     if mask:
         assert isinstance(pred.detection.masks, MaskArray)
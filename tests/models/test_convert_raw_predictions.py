@@ -0,0 +1,111 @@
+import pytest
+from icevision.all import *
+from icevision.models.torchvision import faster_rcnn, mask_rcnn, keypoint_rcnn
+
+
+@pytest.fixture
+def records():
+    records = []
+    for i in range(2):
+        record = BaseRecord(
+            (ImageRecordComponent(), ClassMapRecordComponent(task=tasks.detection))
+        )
+        record.set_record_id(i)
+        record.set_img(np.zeros((16, 16, 3), dtype=np.uint8))
+        record.detection.set_class_map(ClassMap(["a", "b"]))
+        records.append(record)
+    return records
+
+
+@pytest.fixture
+def batch():
+    return (torch.rand(2, 3, 16, 16),)
+
+
+@pytest.fixture
+def raw_preds():
+    return [
+        {
+            "labels": torch.tensor([1, 2, 1]),
+            "scores": torch.tensor([0.9, 0.4, 0.5]),
+            "boxes": torch.tensor(
+                [[0, 0, 4, 4], [1, 1, 5, 5], [2, 2, 8, 8]], dtype=torch.float
+            ),
+            "masks": torch.rand(3, 1, 16, 16),
+            "keypoints": torch.tensor(
+                [[[1, 1, 1], [2, 2, 1]], [[3, 3, 1], [0, 0, 0]], [[0, 0, 0]] * 2],
+                dtype=torch.float,
+            ),
+            "keypoints_scores": torch.rand(3, 2),
+        },
+        {
+            "labels": torch.zeros(0, dtype=torch.int64),
+            "scores": torch.zeros(0),
+            "boxes": torch.zeros(0, 4),
+            "masks": torch.zeros(0, 1, 16, 16),
+            "keypoints": torch.zeros(0, 2, 3),
+            "keypoints_scores": torch.zeros(0, 2),
+        },
+    ]
+
+
+def test_tensors_to_numpy():
+    tensors = [torch.rand(2, 3), torch.arange(4), torch.rand(0, 4), torch.rand(5)]
+    arrays = tensors_to_numpy(tensors)
+    for tensor, array in zip(tensors, arrays):
+        assert array.shape == tuple(tensor.shape)
+        np.testing.assert_equal(array, tensor.numpy())
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="requires cuda")
+def test_tensors_to_numpy_cuda():
+    tensors = [torch.rand(2, 3), torch.arange(4), torch.rand(0, 4), torch.rand(5)]
+    arrays = tensors_to_numpy([tensor.cuda() for tensor in tensors])
+    for tensor, array in zip(tensors, arrays):
+        np.testing.assert_equal(array, tensor.numpy())
+
+
+def test_faster_rcnn_convert_raw_predictions(batch, raw_preds, records):
+    preds = faster_rcnn.convert_raw_predictions(
+        batch, raw_preds, records, detection_threshold=0.5, keep_images=True
+    )
+
+    assert preds[0].detection.label_ids == [1, 1]
+    np.testing.assert_allclose(preds[0].detection.scores, [0.9, 0.5])
+    np.testing.assert_equal(
+        preds[0].detection.bboxes.xyxy, [[0, 0, 4, 4], [2, 2, 8, 8]]
+    )
+    np.testing.assert_equal(preds[0].detection.above_threshold, [True, False, True])
+    assert preds[0].img.shape == (16, 16, 3)
+    assert len(preds[1].detection.bboxes) == 0
+
+    single_pred = faster_rcnn.convert_raw_prediction(
+        (batch[0][0],), raw_preds[0], records[0], detection_threshold=0.5
+    )
+    assert single_pred.detection.label_ids == preds[0].detection.label_ids
+    assert single_pred.detection.bboxes == preds[0].detection.bboxes
+
+
+def test_mask_rcnn_convert_raw_predictions(batch, raw_preds, records):
+    preds = mask_rcnn.convert_raw_predictions(
+        batch, raw_preds, records, detection_threshold=0.5, mask_threshold=0.5
+    )
+
+    masks = preds[0].detection.masks
+    assert isinstance(masks, MaskArray)
+    np.testing.assert_equal(masks.data, raw_preds[0]["masks"][[0, 2], 0].numpy() > 0.5)
+    assert preds[1].detection.masks.shape == (0, 16, 16)
+
+
+def test_keypoint_rcnn_convert_raw_predictions(batch, raw_preds, records):
+    preds = keypoint_rcnn.convert_raw_predictions(
+        batch, raw_preds, records, detection_threshold=0.4
+    )
+
+    # the third instance has no keypoints
+    keypoints = preds[0].detection.keypoints
+    assert len(keypoints) == 2
+    np.testing.assert_equal(keypoints[0].keypoints, [1, 1, 1, 2, 2, 1])
+    np.testing.assert_equal(keypoints[1].keypoints, [3, 3, 1, 0, 0, 0])
+    assert preds[0].detection.keypoints_scores.shape == (3, 2)
+    assert preds[1].detection.keypoints == []
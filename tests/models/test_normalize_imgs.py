@@ -0,0 +1,123 @@
+import pytest
+from icevision.all import *
+
+
+class _Captured(Exception):
+    pass
+
+
+def _capture_input(module, inputs):
+    raise _Captured(inputs[0])
+
+
+@pytest.fixture(scope="module")
+def fridge_records(samples_source, fridge_class_map):
+    parser = parsers.VOCBBoxParser(
+        annotations_dir=samples_source / "fridge/odFridgeObjects/annotations",
+        images_dir=samples_source / "fridge/odFridgeObjects/images",
+        class_map=fridge_class_map,
+    )
+    return parser.parse(SingleSplitSplitter(), show_pbar=False)[0][:2]
+
+
+def test_img_to_tensor():
+    img = np.random.randint(0, 256, (4, 6, 3), dtype=np.uint8)
+
+    tensor_img = img_to_tensor(img, uint8=True)
+    assert tensor_img.dtype == torch.uint8
+    assert tensor_img.is_contiguous()
+    np.testing.assert_equal(tensor_img.numpy(), img.transpose(2, 0, 1))
+
+    assert torch.equal(img_to_tensor(img), im2tensor(img))
+    float_img = img.astype(np.float32)
+    assert torch.equal(img_to_tensor(float_img, uint8=True), im2tensor(float_img))
+
+
+def test_normalize_imgs():
+    img = np.random.randint(0, 256, (4, 6, 3), dtype=np.uint8)
+    expected = im2tensor(tfms.A.Normalize()(image=img)["image"])
+
+    imgs = normalize_imgs(img_to_tensor(img, uint8=True)[None])
+    assert imgs.dtype == torch.float32
+    assert torch.allclose(imgs[0], expected, atol=1e-5)
+    assert normalize_imgs(expected) is expected
+
+
+def _faster_rcnn_model():
+    backbone = models.torchvision.faster_rcnn.backbones.resnet18_fpn(pretrained=False)
+    model = models.torchvision.faster_rcnn.model(num_classes=5, backbone=backbone)
+    return model, model.backbone
+
+
+def _efficientdet_model():
+    backbone = models.ross.efficientdet.backbones.tf_lite0(pretrained=False)
+    model = models.ross.efficientdet.model(
+        backbone=backbone, num_classes=5, img_size=128, pretrained_backbone=False
+    )
+    return model, model.model.backbone
+
+
+def _yolov5_model():
+    backbone = models.ultralytics.yolov5.backbones.small(pretrained=False)
+    model = models.ultralytics.yolov5.model(
+        backbone=backbone, num_classes=5, img_size=128
+    )
+    return model, model.model[0]
+
+
+@pytest.mark.parametrize(
+    "model_type, build_model, num_inputs",
+    [
+        (models.torchvision.faster_rcnn, _faster_rcnn_model, 2),
+        (models.ross.efficientdet, _efficientdet_model, 2),
+        (models.ultralytics.yolov5, _yolov5_model, 1),
+    ],
+)
+def test_add_normalize_hook(fridge_records, model_type, build_model, num_inputs):
+    resize = tfms.A.Adapter([tfms.A.Resize(128, 128)])
+    normalize = tfms.A.Adapter([tfms.A.Resize(128, 128), tfms.A.Normalize()])
+    uint8_dl = model_type.train_dl(
+        Dataset(fridge_records, resize), batch_size=2, uint8=True
+    )
+    float_dl = model_type.train_dl(Dataset(fridge_records, normalize), batch_size=2)
+    uint8_batch = first(uint8_dl)[0][:num_inputs]
+    float_batch = first(float_dl)[0][:num_inputs]
+
+    uint8_imgs = uint8_batch[0]
+    uint8_imgs = uint8_imgs[0] if isinstance(uint8_imgs, list) else uint8_imgs
+    assert uint8_imgs.dtype == torch.uint8
+
+    model, first_module = build_model()
+    first_module.register_forward_pre_hook(_capture_input)
+    with pytest.raises(_Captured) as float_input:
+        model(*float_batch)
+
+    handle = add_normalize_hook(model)
+    with pytest.raises(_Captured) as uint8_input:
+        model(*uint8_batch)
+    (expected,), (actual,) = float_input.value.args, uint8_input.value.args
+    assert actual.dtype == torch.float32
+    assert torch.allclose(actual, expected, atol=1e-5)
+
+    handle.remove()
+    with pytest.raises(_Captured) as uint8_input:
+        model(*uint8_batch)
+    assert uint8_input.value.args[0].dtype == torch.uint8
+
+
+def test_add_normalize_hook_predict(fridge_records):
+    resize = tfms.A.Adapter([tfms.A.Resize(128, 128)])
+    normalize = tfms.A.Adapter([tfms.A.Resize(128, 128), tfms.A.Normalize()])
+    model, backbone = _faster_rcnn_model()
+    captured = []
+    backbone.register_forward_pre_hook(lambda module, inputs: captured.append(inputs))
+
+    models.torchvision.faster_rcnn.predict(model, Dataset(fridge_records, normalize))
+    add_normalize_hook(model)
+    preds = models.torchvision.faster_rcnn.predict(
+        model, Dataset(fridge_records, resize), uint8=True
+    )
+    assert len(preds) == 2
+
+    (expected,), (actual,) = captured
+    assert torch.allclose(actual, expected, atol=1e-5)
@@ -0,0 +1,137 @@
+import pytest
+from icevision.all import *
+from icevision.models.utils import _predict_from_dl
+from icevision.models.torchvision import faster_rcnn
+
+
+@pytest.fixture
+def infer_dl():
+    images = [np.zeros((32, 32, 3), dtype=np.uint8) for _ in range(7)]
+    dataset = Dataset.from_images(images, class_map=ClassMap(["a", "b"]))
+    return faster_rcnn.infer_dl(dataset, batch_size=2)
+
+
+class FakePredict:
+    "Predicts `record_id + 1` boxes for each record, counts the predicted batches"
+
+    def __init__(self, fail_at: Optional[int] = None):
+        self.fail_at = fail_at
+        self.num_batches = 0
+
+    def __call__(self, model, batch, records, keep_images=False, **kwargs):
+        if self.num_batches == self.fail_at:
+            raise RuntimeError("crash")
+        self.num_batches += 1
+
+        raw_preds = []
+        for record in records:
+            n = record.record_id + 1
+            raw_preds.append(
+                {
+                    "labels": torch.ones(n, dtype=torch.int64),
+                    "scores": torch.linspace(0.9, 0.6, n),
+                    "boxes": torch.tensor([[1.0, 2.0, 11.0, 12.0]]).repeat(n, 1),
+                }
+            )
+        return faster_rcnn.convert_raw_predictions(
+            batch, raw_preds, records, detection_threshold=0.5
+        )
+
+
+def test_predict_from_dl_stream(infer_dl):
+    predict_fn = FakePredict()
+    preds = _predict_from_dl(
+        predict_fn, model=None, infer_dl=infer_dl, show_pbar=False, stream=True
+    )
+    assert predict_fn.num_batches == 0
+
+    assert next(preds).record_id == 0
+    assert predict_fn.num_batches == 1
+    assert [pred.record_id for pred in preds] == list(range(1, 7))
+
+
+@pytest.mark.parametrize("sink_cls", [JSONLSink, COCOResultsSink, NpzSink])
+def test_predict_from_dl_sink_resume(infer_dl, tmp_path, sink_cls):
+    path = tmp_path / "preds"
+    expected_path = tmp_path / "expected"
+    with sink_cls(expected_path) as sink:
+        assert _predict_from_dl(FakePredict(), None, infer_dl, sink=sink) is None
+    assert sink.num_batches == 4
+
+    # crashes while predicting the third batch
+    sink = sink_cls(path)
+    with pytest.raises(RuntimeError):
+        _predict_from_dl(FakePredict(fail_at=2), None, infer_dl, sink=sink)
+    assert sink.num_batches == 2
+
+    predict_fn = FakePredict()
+    with sink_cls(path, resume=True) as sink:
+        _predict_from_dl(predict_fn, None, infer_dl, sink=sink)
+    assert predict_fn.num_batches == 2
+    assert sink.num_batches == 4
+
+    if sink_cls is NpzSink:
+        for expected_file in sorted(expected_path.glob("*.npz")):
+            arrays, expected = np.load(path / expected_file.name), np.load(
+                expected_file
+            )
+            assert arrays.files == expected.files
+            for k in expected.files:
+                np.testing.assert_equal(arrays[k], expected[k])
+    else:
+        assert path.read_text() == expected_path.read_text()
+
+
+def test_jsonl_sink(infer_dl, tmp_path):
+    with JSONLSink(tmp_path / "preds.jsonl") as sink:
+        _predict_from_dl(FakePredict(), None, infer_dl, sink=sink, show_pbar=False)
+
+    lines = [
+        json.loads(o) for o in (tmp_path / "preds.jsonl").read_text().split("\n")[:-1]
+    ]
+    assert [o["record_id"] for o in lines] == list(range(7))
+    assert lines[2]["label_ids"] == [1, 1, 1]
+    assert lines[2]["bboxes"][0] == [1, 2, 11, 12]
+    np.testing.assert_allclose(lines[2]["scores"], [0.9, 0.75, 0.6])
+
+
+def test_coco_results_sink(infer_dl, tmp_path):
+    with COCOResultsSink(tmp_path / "results.json") as sink:
+        _predict_from_dl(FakePredict(), None, infer_dl, sink=sink, show_pbar=False)
+
+    results = json.loads((tmp_path / "results.json").read_text())
+    assert len(results) == sum(range(1, 8))
+    assert results[0] == {
+        "image_id": 0,
+        "category_id": 1,
+        "bbox": [1, 2, 10, 10],
+        "score": pytest.approx(0.9),
+    }
+
+
+def test_predict_from_dl_closes_sink(infer_dl, tmp_path):
+    sink = COCOResultsSink(tmp_path / "results.json")
+    _predict_from_dl(FakePredict(), None, infer_dl, sink=sink, show_pbar=False)
+
+    results = json.loads((tmp_path / "results.json").read_text())
+    assert len(results) == sum(range(1, 8))
+
+
+def test_skip_batches_keeps_dataloader_args():
+    from icevision.models.utils import _skip_batches
+
+    generator = torch.Generator()
+    dl = DataLoader(
+        list(range(9)),
+        batch_size=2,
+        drop_last=True,
+        num_workers=1,
+        prefetch_factor=3,
+        persistent_workers=True,
+        generator=generator,
+    )
+    skipped = _skip_batches(dl, 1)
+    assert skipped.prefetch_factor == 3
+    assert skipped.persistent_workers
+    assert skipped.generator is generator
+    assert [o.tolist() for o in skipped] == [[2, 3], [4, 5], [6, 7]]
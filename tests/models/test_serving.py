@@ -0,0 +1,110 @@
+import asyncio
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from icevision.all import *
+from icevision.models.torchvision import faster_rcnn
+
+
+class FakePredict:
+    "Predicts the same box for every image, records the size of each batch"
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, model, dataset, detection_threshold, **kwargs):
+        batch, records = faster_rcnn.build_infer_batch(dataset)
+        self.batch_sizes.append(len(records))
+        raw_preds = [
+            {
+                "labels": torch.tensor([1]),
+                "scores": torch.tensor([0.9]),
+                "boxes": torch.tensor([[8.0, 8.0, 40.0, 40.0]]),
+            }
+            for _ in records
+        ]
+        return faster_rcnn.convert_raw_predictions(
+            batch, raw_preds, records, detection_threshold=detection_threshold
+        )
+
+
+@pytest.fixture
+def server():
+    return MicroBatchServer(
+        model=None,
+        predict_fn=FakePredict(),
+        transforms=tfms.A.Adapter([*tfms.A.resize_and_pad(64), tfms.A.Normalize()]),
+        class_map=ClassMap(["a"]),
+        max_batch_size=4,
+        max_latency=0.5,
+    )
+
+
+def test_micro_batch_server_predict(server):
+    img = np.zeros((128, 128, 3), dtype=np.uint8)
+
+    async def _predict():
+        preds = await asyncio.gather(*[server.predict(img) for _ in range(6)])
+        await server.stop()
+        return preds
+
+    preds = asyncio.run(_predict())
+
+    assert server.predict_fn.batch_sizes == [4, 2]
+    assert preds[0] == {
+        "labels": ["a"],
+        "label_ids": [1],
+        "scores": [pytest.approx(0.9)],
+        "bboxes": [[16, 16, 80, 80]],
+        "width": 128,
+        "height": 128,
+    }
+    stats = server.stats()
+    assert stats["num_requests"] == 6
+    assert stats["mean_batch_size"] == 3
+    assert 0 < stats["latency_p50"] <= stats["latency_p99"]
+
+
+def _request(port, path, data=None):
+    url = f"http://127.0.0.1:{port}{path}"
+    try:
+        with urllib.request.urlopen(url, data=data, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_micro_batch_server_http(server):
+    buffer = io.BytesIO()
+    PIL.Image.new("RGB", (128, 64)).save(buffer, format="PNG")
+    img_bytes = buffer.getvalue()
+
+    async def _serve_and_request():
+        http_server = await server.serve(port=0)
+        port = http_server.sockets[0].getsockname()[1]
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            responses = await asyncio.gather(
+                *[
+                    loop.run_in_executor(pool, _request, port, "/predict", img_bytes)
+                    for _ in range(4)
+                ],
+                loop.run_in_executor(pool, _request, port, "/predict", b"not an img"),
+            )
+            stats = await loop.run_in_executor(pool, _request, port, "/stats")
+            not_found = await loop.run_in_executor(pool, _request, port, "/other")
+        http_server.close()
+        await http_server.wait_closed()
+        await server.stop()
+        return responses, stats, not_found
+
+    responses, stats, not_found = asyncio.run(_serve_and_request())
+
+    for status, pred in responses[:4]:
+        assert status == 200
+        assert (pred["width"], pred["height"]) == (128, 64)
+        assert pred["label_ids"] == [1]
+    assert responses[4][0] == 400
+    assert stats == (200, server.stats())
+    assert stats[1]["num_requests"] == 4
+    assert not_found[0] == 404
@@ -74,3 +74,43 @@ def test_mask_parser(coco_mask_parser):
             b"00O1O1O1N2O1N2N2N101N1O2O0O2N2O0O5G=^Ob0^OXTS2",
         }
     ]
+
+
+def test_coco_parser_img_size(coco_dir):
+    parser = parsers.COCOBBoxParser(coco_dir / "annotations.json", coco_dir / "images")
+    infos = parser.annotations_dict["images"]
+    for info in infos:
+        info["width"], info["height"] = 1, 1
+    # the size of images without width and height is read from the image header
+    missing_info = next(o for o in infos if o["file_name"] == "000000343934.jpg")
+    del missing_info["width"]
+
+    records = parser.parse(data_splitter=SingleSplitSplitter(), show_pbar=False)[0]
+    img_sizes = {record.filepath.name: record.img_size for record in records}
+    assert img_sizes["000000343934.jpg"] == ImgSize(width=640, height=480)
+    assert img_sizes["000000128372.jpg"] == ImgSize(width=1, height=1)
+    assert len(parser._img_sizes) == 1
+
+    parser = parsers.COCOBBoxParser(
+        coco_dir / "annotations.json",
+        coco_dir / "images",
+        img_size_from_annotations=False,
+    )
+    records = parser.parse(data_splitter=SingleSplitSplitter(), show_pbar=False)[0]
+    img_sizes = {record.filepath.name: record.img_size for record in records}
+    assert img_sizes["000000128372.jpg"] == ImgSize(width=640, height=427)
+
+
+def test_coco_parser_img_size_num_workers(coco_dir):
+    parser = parsers.COCOBBoxParser(
+        coco_dir / "annotations.json",
+        coco_dir / "images",
+        img_size_from_annotations=False,
+    )
+    records = parser.parse(
+        data_splitter=SingleSplitSplitter(), show_pbar=False, num_workers=2
+    )[0]
+    # the sizes are read once in the main process and sent to the workers
+    assert len(parser._img_sizes) == len(records)
+    img_sizes = {record.filepath.name: record.img_size for record in records}
+    assert img_sizes["000000128372.jpg"] == ImgSize(width=640, height=427)
@@ -84,7 +84,14 @@ def test_parser(data, tmpdir):
     )[0]
     assert parser._check_path(cache_filepath) == True
     assert cache_filepath.exists() == True
-    loaded_records = pickle.load(open(cache_filepath, "rb"))[0]
+    with parsers.ParseCache(cache_filepath, parser_key=parser._cache_key()) as cache:
+        assert len(cache) == 1
+
+    parser = SimpleParser(data)
+    parser.parse_fields = None
+    loaded_records = parser.parse(
+        data_splitter=SingleSplitSplitter(), cache_filepath=cache_filepath
+    )[0]
     assert len(loaded_records) == len(records)
     for loaded_record, record in zip(loaded_records, records):
         assert loaded_record.filepath == record.filepath
@@ -120,3 +127,210 @@ def test_parser_invalid_data(data, bbox_xyxy):
 
     with pytest.raises(InvalidDataError) as err:
         records = parser.parse(data_splitter=SingleSplitSplitter())[0]
+
+
+def test_parser_num_workers(samples_source):
+    def parse(num_workers):
+        parser = parsers.COCOMaskParser(
+            annotations_filepath=samples_source / "annotations.json",
+            img_dir=samples_source / "images",
+        )
+        records = parser.parse(
+            data_splitter=SingleSplitSplitter(),
+            show_pbar=False,
+            num_workers=num_workers,
+        )[0]
+        return parser, records
+
+    parser, records = parse(num_workers=0)
+    # samples of the same record end up in different shards
+    parallel_parser, parallel_records = parse(num_workers=3)
+
+    assert parallel_parser.idmap.name2id == parser.idmap.name2id
+    assert len(parallel_records) == len(records)
+    for parallel_record, record in zip(parallel_records, records):
+        assert parallel_record.record_id == record.record_id
+        assert parallel_record.filepath == record.filepath
+        assert parallel_record.detection.class_map is parallel_parser.class_map
+        assert parallel_record.detection.label_ids == record.detection.label_ids
+        assert parallel_record.detection.bboxes == record.detection.bboxes
+        assert parallel_record.detection.areas == record.detection.areas
+
+
+def test_parser_num_workers_unlocked_class_map(samples_source):
+    def parse(num_workers):
+        parser = parsers.VOCBBoxParser(
+            annotations_dir=samples_source / "voc/Annotations",
+            images_dir=samples_source / "voc/JPEGImages",
+        )
+        records = parser.parse(
+            data_splitter=SingleSplitSplitter(),
+            show_pbar=False,
+            num_workers=num_workers,
+        )[0]
+        return parser, records
+
+    parser, records = parse(num_workers=0)
+    parallel_parser, parallel_records = parse(num_workers=2)
+
+    assert parallel_parser.class_map == parser.class_map
+    for parallel_record, record in zip(parallel_records, records):
+        assert parallel_record.detection.class_map is parallel_parser.class_map
+        assert parallel_record.detection.labels == record.detection.labels
+        assert parallel_record.detection.label_ids == record.detection.label_ids
+
+
+def test_parser_cache_changed_sources(samples_source, tmpdir):
+    voc_dir = Path(tmpdir) / "voc"
+    shutil.copytree(samples_source / "voc/Annotations", voc_dir)
+    cache_filepath = Path(tmpdir) / "cache.db"
+
+    class CountingParser(parsers.VOCBBoxParser):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.parsed = []
+
+        def parse_fields(self, o, record, is_new):
+            self.parsed.append(o.name)
+            super().parse_fields(o, record, is_new=is_new)
+
+    def parse():
+        parser = CountingParser(
+            annotations_dir=voc_dir, images_dir=samples_source / "voc/JPEGImages"
+        )
+        records = parser.parse(
+            data_splitter=SingleSplitSplitter(),
+            autofix=False,
+            show_pbar=False,
+            cache_filepath=cache_filepath,
+        )[0]
+        return parser, records
+
+    parser, records = parse()
+    assert sorted(parser.parsed) == ["2007_000063.xml", "2011_003353.xml"]
+
+    parser, cached_records = parse()
+    assert parser.parsed == []
+    assert [o.detection.bboxes for o in cached_records] == [
+        o.detection.bboxes for o in records
+    ]
+    assert cached_records[0].detection.class_map is parser.class_map
+
+    xml_file = voc_dir / "2011_003353.xml"
+    xml_file.write_text(
+        xml_file.read_text().replace("<xmin>130</xmin>", "<xmin>131</xmin>")
+    )
+    (voc_dir / "2007_000063.xml").unlink()
+    parser, records = parse()
+    assert parser.parsed == ["2011_003353.xml"]
+    assert len(records) == 1
+    assert records[0].detection.bboxes == [BBox.from_xyxy(131, 45, 375, 470)]
+
+
+def test_parser_cache_replaces_pickle(samples_source, tmpdir):
+    # caches of older versions pickled the list of splits
+    cache_filepath = Path(tmpdir) / "cache.pkl"
+    with open(cache_filepath, "wb") as f:
+        pickle.dump([[]], f)
+
+    parser = parsers.VOCBBoxParser(
+        annotations_dir=samples_source / "voc/Annotations",
+        images_dir=samples_source / "voc/JPEGImages",
+    )
+    records = parser.parse(
+        data_splitter=SingleSplitSplitter(),
+        show_pbar=False,
+        cache_filepath=cache_filepath,
+    )[0]
+    assert len(records) == 2
+    with parsers.ParseCache(cache_filepath, parser_key=parser._cache_key()) as cache:
+        assert len(cache) == 2
+    assert (Path(tmpdir) / "cache.pkl.old").exists()
+
+
+def test_parser_cache_keeps_other_files(samples_source, tmpdir):
+    cache_filepath = Path(tmpdir) / "annotations.json"
+    cache_filepath.write_text('{"images": []}')
+
+    parser = parsers.VOCBBoxParser(
+        annotations_dir=samples_source / "voc/Annotations",
+        images_dir=samples_source / "voc/JPEGImages",
+    )
+    with pytest.raises(ValueError, match="is not a parse cache"):
+        parser.parse(cache_filepath=cache_filepath, show_pbar=False)
+    assert cache_filepath.read_text() == '{"images": []}'
+
+
+def test_parser_cache_num_workers(samples_source, tmpdir):
+    cache_filepath = Path(tmpdir) / "cache.db"
+
+    def parse(**kwargs):
+        parser = parsers.COCOMaskParser(
+            annotations_filepath=samples_source / "annotations.json",
+            img_dir=samples_source / "images",
+        )
+        records = parser.parse(
+            data_splitter=SingleSplitSplitter(), show_pbar=False, **kwargs
+        )[0]
+        return parser, records
+
+    parser, records = parse()
+    # the single annotations file is split in shards parsed by different workers
+    cached_parser, cached_records = parse(
+        cache_filepath=cache_filepath, num_workers=2
+    )
+    with parsers.ParseCache(cache_filepath, parser_key=parser._cache_key()) as cache:
+        key = str(samples_source / "annotations.json")
+        lengths, _ = cache.get(key, cache.fingerprint(key))
+    assert len(lengths) > 1
+    assert sum(lengths) == len(parser)
+
+    for _ in range(2):
+        assert cached_parser.idmap.name2id == parser.idmap.name2id
+        assert len(cached_records) == len(records)
+        for cached_record, record in zip(cached_records, records):
+            assert cached_record.record_id == record.record_id
+            assert cached_record.detection.label_ids == record.detection.label_ids
+            assert cached_record.detection.bboxes == record.detection.bboxes
+        cached_parser, cached_records = parse(cache_filepath=cache_filepath)
+
+
+def test_parser_cache_changed_img_dir(samples_source, tmpdir):
+    cache_filepath = Path(tmpdir) / "cache.db"
+
+    def parse(img_dir):
+        parser = parsers.COCOBBoxParser(
+            annotations_filepath=samples_source / "annotations.json",
+            img_dir=img_dir,
+        )
+        return parser.parse(
+            data_splitter=SingleSplitSplitter(),
+            autofix=False,
+            show_pbar=False,
+            cache_filepath=cache_filepath,
+        )[0]
+
+    records = parse(samples_source / "images")
+    assert {o.filepath.parent for o in records} == {samples_source / "images"}
+    # the records parsed with another images directory are not used
+    other_dir = Path(tmpdir) / "images"
+    records = parse(other_dir)
+    assert {o.filepath.parent for o in records} == {other_dir}
+
+
+def test_parser_cache_stores_autofixed_records(data, tmpdir, monkeypatch):
+    cache_filepath = Path(tmpdir) / "cache.db"
+    records = SimpleParser(data).parse(
+        data_splitter=SingleSplitSplitter(), cache_filepath=cache_filepath
+    )[0]
+    # the record with a missing file was removed before caching
+    assert len(records) == 2
+
+    def autofix(self):
+        raise AssertionError("cached records are autofixed again")
+
+    monkeypatch.setattr(BaseRecord, "autofix", autofix)
+    cached_records = SimpleParser(data).parse(
+        data_splitter=SingleSplitSplitter(), cache_filepath=cache_filepath
+    )[0]
+    assert [o.record_id for o in cached_records] == [o.record_id for o in records]
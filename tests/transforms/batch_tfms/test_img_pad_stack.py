@@ -4,7 +4,7 @@ from icevision.all import *
 
 @pytest.fixture()
 def records():
-    imgs = [np.ones((2, 4, 3), dtype=np.float), np.ones((3, 2, 3), dtype=np.float)]
+    imgs = [np.ones((2, 4, 3), dtype=np.float64), np.ones((3, 2, 3), dtype=np.float64)]
 
     records = []
     for img in imgs:
@@ -20,7 +20,7 @@ def test_img_pad_stack(records, pad_value):
     tfmed_records = tfms.batch.ImgPadStack(pad_value=pad_value)(records)
     imgs = np.asarray([record.img for record in tfmed_records])
 
-    expected = np.ones((2, 3, 4, 3), dtype=np.float)
+    expected = np.ones((2, 3, 4, 3), dtype=np.float64)
     expected *= np.array(pad_value).reshape(-1)
     expected[0, :2, :4, :3] = 1
     expected[1, :3, :2, :3] = 1
@@ -28,3 +28,50 @@ def test_img_pad_stack(records, pad_value):
 
     before_shapes = [(record.height, record.width) for record in tfmed_records]
     assert before_shapes == [(2, 4), (3, 2)]
+
+
+def test_img_pad_stack_stride(records):
+    tfmed_records = tfms.batch.ImgPadStack(stride=4)(records)
+    imgs = np.asarray([record.img for record in tfmed_records])
+    assert imgs.shape == (2, 4, 4, 3)
+    assert imgs[1, :3, 2:].sum() == 0 and imgs[1, 3:].sum() == 0
+
+
+def test_img_pad_stack_uint8():
+    records = []
+    for shape in [(5, 3, 3), (2, 6, 3)]:
+        record = BaseRecord((ImageRecordComponent(),))
+        record.set_img(np.full(shape, 7, dtype=np.uint8))
+        records.append(record)
+
+    tfmed_records = tfms.batch.ImgPadStack(pad_value=(1, 2, 3))(records)
+    imgs = [record.img for record in tfmed_records]
+    assert imgs[0].dtype == np.uint8 and imgs[0].shape == (5, 6, 3)
+    np.testing.assert_equal(imgs[0][0, 2:4], [[7, 7, 7], [1, 2, 3]])
+    np.testing.assert_equal(imgs[1][4, 0], [1, 2, 3])
+
+
+def test_img_pad_stack_im2tensor_no_copy(records):
+    tfmed_records = tfms.batch.ImgPadStack()(records)
+    for record in tfmed_records:
+        tensor = im2tensor(record.img)
+        assert tensor.shape == (3, 3, 4)
+        assert tensor.data_ptr() == record.img.__array_interface__["data"][0]
+
+
+def test_img_pad_stack_reuses_buffer(records):
+    img_pad_stack = tfms.batch.ImgPadStack()
+    clones = [record.clone() for record in records]
+    first_imgs = [record.img for record in img_pad_stack(records)]
+    second_imgs = [record.img for record in img_pad_stack(clones)]
+    # the first batch is still referenced, it can't be overwritten
+    assert not np.shares_memory(first_imgs[0], second_imgs[0])
+
+    ptr = second_imgs[0].__array_interface__["data"][0]
+    del first_imgs, second_imgs, clones
+    for record in records:
+        record.img = np.ones((2, 2, 3))
+    imgs = [record.img for record in img_pad_stack(records)]
+    assert imgs[0].__array_interface__["data"][0] == ptr
+    np.testing.assert_equal(imgs[0][:2, :2], 1)
+    np.testing.assert_equal(imgs[1][2:], 0)
@@ -0,0 +1,167 @@
+import pytest
+from icevision.all import *
+
+
+@pytest.fixture()
+def records():
+    records = []
+    for size in [(8, 10), (6, 4)]:
+        record = BaseRecord(
+            (
+                ImageRecordComponent(),
+                InstancesLabelsRecordComponent(),
+                BBoxesRecordComponent(),
+                MasksRecordComponent(),
+                IsCrowdsRecordComponent(),
+            )
+        )
+        h, w = size
+        img = np.random.randint(0, 256, (h, w, 3), dtype=np.uint8)
+        record.set_img(img)
+        record.detection.set_class_map(ClassMap(["a", "b"]))
+        record.detection.add_labels_by_id([1, 2])
+        record.detection.add_bboxes(
+            [BBox.from_xyxy(0, 0, 2, 2), BBox.from_xyxy(1, 1, 3, 4)]
+        )
+        masks = np.zeros((2, h, w), dtype=np.uint8)
+        masks[0, :2, :2] = 1
+        masks[1, 1:4, 1:3] = 1
+        record.detection.add_masks([MaskArray(masks)])
+        record.detection.add_iscrowds([0, 1])
+        records.append(record)
+
+    return records
+
+
+def test_batch_resize(records):
+    tfmed = tfms.batch.BatchAugment([tfms.batch.BatchResize((16, 20))])(records)
+
+    for record in tfmed:
+        assert record.img.shape == (16, 20, 3)
+        assert record.img.dtype == np.uint8
+        assert (record.height, record.width) == (16, 20)
+        assert record.detection.masks.shape == (2, 16, 20)
+
+    np.testing.assert_allclose(
+        tfmed[0].detection.bboxes.xyxy, [[0, 0, 4, 4], [2, 2, 6, 8]]
+    )
+    np.testing.assert_allclose(
+        tfmed[1].detection.bboxes.xyxy, [[0, 0, 10, 16 / 3], [5, 16 / 6, 15, 32 / 3]]
+    )
+    assert tfmed[0].detection.masks.data[0, :4, :4].all()
+    assert tfmed[0].detection.masks.data[0].sum() == 16
+
+
+def test_batch_augment_requires_same_size(records):
+    with pytest.raises(ValueError):
+        tfms.batch.BatchAugment([tfms.batch.BatchHorizontalFlip(p=1)])(records)
+
+
+def test_batch_horizontal_flip(records):
+    records = records[:1]
+    img = records[0].img.copy()
+    masks = records[0].detection.mask_array().data.copy()
+
+    tfmed = tfms.batch.BatchAugment([tfms.batch.BatchHorizontalFlip(p=1)])(records)
+
+    np.testing.assert_equal(tfmed[0].img, img[:, ::-1])
+    np.testing.assert_equal(tfmed[0].detection.masks.data, masks[..., ::-1])
+    np.testing.assert_allclose(
+        tfmed[0].detection.bboxes.xyxy, [[8, 0, 10, 2], [7, 1, 9, 4]]
+    )
+
+
+def test_batch_affine_identity(records):
+    records = records[:1]
+    img = records[0].img.copy()
+    bboxes = records[0].detection.bboxes.xyxy.copy()
+
+    tfm = tfms.batch.BatchAffine(degrees=0, scale=(1, 1), translate=(0, 0), p=1)
+    tfmed = tfms.batch.BatchAugment([tfm])(records)
+
+    np.testing.assert_equal(tfmed[0].img, img)
+    np.testing.assert_allclose(tfmed[0].detection.bboxes.xyxy, bboxes, atol=1e-4)
+
+
+def test_batch_affine_filters_instances(records):
+    records = records[:1]
+    # translates everything 2.5 pixels to the left
+    tfm = tfms.batch.BatchAffine(degrees=0, scale=(1, 1), translate=(0, 0), p=1)
+    tfm.sample_matrices = lambda batch: torch.tensor(
+        [[[1.0, 0, -2.5], [0, 1, 0], [0, 0, 1]]]
+    )
+
+    tfmed = tfms.batch.BatchAugment([tfm])(records)[0]
+
+    assert tfmed.detection.label_ids == [2]
+    assert tfmed.detection.iscrowds == [1]
+    np.testing.assert_allclose(tfmed.detection.bboxes.xyxy, [[0, 1, 0.5, 4]])
+    assert tfmed.detection.masks.shape == (1, 8, 10)
+
+
+def test_batch_color_jitter_and_normalize(records):
+    batch_tfms = tfms.batch.BatchAugment(
+        [
+            tfms.batch.BatchResize(8),
+            tfms.batch.BatchColorJitter(p=1),
+            tfms.batch.BatchNormalize(),
+        ]
+    )
+    tfmed = batch_tfms(records)
+
+    for record in tfmed:
+        assert record.img.shape == (8, 8, 3)
+        assert record.img.dtype == np.float32
+        assert len(record.detection.bboxes) == 2
+
+
+def test_batch_tfms_keypoints(coco_keypoints_parser):
+    records = coco_keypoints_parser.parse(data_splitter=SingleSplitSplitter())[0]
+    record = records[0].load()
+    original_kpts = record.detection.keypoints
+    w = record.width
+
+    batch_tfms = tfms.batch.BatchAugment(
+        [tfms.batch.BatchResize((record.height, w)), tfms.batch.BatchHorizontalFlip(1)]
+    )
+    tfmed = batch_tfms([record])[0]
+
+    assert len(tfmed.detection.keypoints) == len(original_kpts)
+    for tfmed_kpts, kpts in zip(tfmed.detection.keypoints, original_kpts):
+        visible = kpts.visible > 0
+        np.testing.assert_allclose(tfmed_kpts.visible, kpts.visible)
+        np.testing.assert_allclose(
+            tfmed_kpts.x[visible], (w - 1) - kpts.x[visible], atol=1e-3
+        )
+        np.testing.assert_allclose(tfmed_kpts.y, kpts.y, atol=1e-3)
+
+
+def test_tensor_batch_keeps_uint8(records):
+    records = records[:1]
+    augment = [
+        tfms.batch.BatchResize((16, 20)),
+        tfms.batch.BatchHorizontalFlip(p=1),
+        tfms.batch.BatchAffine(p=1),
+        tfms.batch.BatchColorJitter(p=1),
+    ]
+
+    def augment_batch(batch):
+        torch.manual_seed(0)
+        for tfm in augment:
+            batch = tfm(batch)
+        return batch
+
+    batch = augment_batch(tfms.batch.TensorBatch.from_records(records))
+    assert batch.imgs.dtype == torch.uint8
+
+    # the float computation, rounded only at the end
+    float_batch = tfms.batch.TensorBatch.from_records(records)
+    float_batch.imgs = float_batch.imgs.float()
+    float_batch = augment_batch(float_batch)
+    assert float_batch.imgs.dtype == torch.float32
+    diff = batch.imgs.float() - float_batch.imgs.round()
+    assert diff.abs().max() <= 2
+
+    tfmed = batch.to_records(records)[0]
+    assert tfmed.img.dtype == np.uint8
+    assert tfmed.img.shape == (16, 20, 3)
@@ -13,6 +13,7 @@ from icevision.tfms.albumentations.albumentations_helpers import (
     get_transform,
 )
 
+
 # TODO: Check that attributes are being set on components
 @pytest.fixture
 def records(coco_mask_records):
@@ -47,6 +48,27 @@ def test_simple_transform(records, check_attributes_on_component):
     check_attributes_on_component(tfmed)
 
 
+def test_adapter_compose_cache(records):
+    timings = []
+    tfm = tfms.A.Adapter([tfms.A.HorizontalFlip(p=1.0)], timing_hook=timings.append)
+    tfm_ds = Dataset(records, tfm=tfm)
+    infer_ds = Dataset.from_images([np.zeros((4, 4, 3), dtype=np.uint8)], tfm)
+
+    tfm_ds[0], tfm_ds[1]
+    assert len(tfm._compiled_tfms) == 1
+    compiled = list(tfm._compiled_tfms.values())[0]
+    tfm_ds[2]
+    assert list(tfm._compiled_tfms.values()) == [compiled]
+
+    # records without bboxes use a different pipeline
+    infer_ds[0]
+    assert len(tfm._compiled_tfms) == 2
+
+    assert len(timings) == 4
+    assert set(timings[0].keys()) == {"setup", "augment", "collect"}
+    assert all(seconds >= 0 for o in timings for seconds in o.values())
+
+
 def test_crop_transform(records, check_attributes_on_component):
     tfm = tfms.A.Adapter([tfms.A.CenterCrop(100, 100, p=1.0)])
     tfm_ds = Dataset(records, tfm=tfm)
@@ -173,3 +195,67 @@ def test_get_transform() -> None:
     assert isinstance(get_transform(transforms, "Normalize"), Normalize)
     assert isinstance(get_transform(transforms, "Pad"), PadIfNeeded)
     assert isinstance(get_transform(transforms, "Longest"), LongestMaxSize)
+
+
+@pytest.mark.parametrize(
+    "tfms_list,expected",
+    [
+        (tfms.A.resize_and_pad(100), ImgSize(width=100, height=75)),
+        (tfms.A.aug_tfms(size=64, presize=150), ImgSize(width=200, height=150)),
+        ([tfms.A.HorizontalFlip(), tfms.A.Resize(50, 60)], ImgSize(60, 50)),
+        (tfms.A.aug_tfms(size=64), None),
+        (tfms.A.resize_and_pad(1000), None),
+        ([tfms.A.LongestMaxSize(100, p=0.5)], None),
+    ],
+)
+def test_adapter_min_img_size(tfms_list, expected):
+    tfm = tfms.A.Adapter(tfms_list)
+    assert tfm.min_img_size(ImgSize(width=400, height=300)) == expected
+
+
+def test_draft_decode(records):
+    tfm = tfms.A.Adapter(tfms.A.resize_and_pad(64))
+    full_ds = Dataset(records, tfm=tfm)
+    draft_ds = Dataset(records, tfm=tfm, draft_decode=True)
+
+    # the loaded image is smaller but has enough resolution for the resize
+    record = records[0].load(min_img_size=tfm.min_img_size)
+    assert records[0].img_size == ImgSize(width=640, height=480)
+    assert record.img_size == ImgSize(width=80, height=60)
+    np.testing.assert_allclose(
+        record.detection.bboxes.xyxy, records[0].detection.bboxes.xyxy / 8
+    )
+    np.testing.assert_allclose(
+        record.detection.areas, np.array(records[0].detection.areas) / 64
+    )
+    assert record.detection.mask_array().shape == (len(record.detection.masks), 60, 80)
+
+    for full, draft in zip(full_ds, draft_ds):
+        assert full.img.shape == draft.img.shape
+        assert full.detection.label_ids == draft.detection.label_ids
+        np.testing.assert_allclose(
+            full.detection.bboxes.xyxy, draft.detection.bboxes.xyxy, atol=1
+        )
+        assert full.detection.masks.shape == draft.detection.masks.shape
+
+
+def test_draft_decode_wrong_parsed_size(records):
+    tfm = tfms.A.Adapter(tfms.A.resize_and_pad(64))
+    # e.g. the size of an EXIF rotated image read from the COCO annotations
+    parsed = records[0].clone()
+    parsed.set_img_size(ImgSize(width=480, height=640), original=True)
+
+    # the image is not drafted, the annotations are not scaled
+    record = parsed.load(min_img_size=lambda size: None)
+    assert record.img_size == ImgSize(width=640, height=480)
+    np.testing.assert_allclose(
+        record.detection.bboxes.xyxy, records[0].detection.bboxes.xyxy
+    )
+
+    # the annotations are scaled by the scale of the draft, not the parsed size
+    record = parsed.load(min_img_size=tfm.min_img_size)
+    scale = record.img_size.width / 640
+    assert scale < 1 and record.img_size.height == 480 * scale
+    np.testing.assert_allclose(
+        record.detection.bboxes.xyxy, records[0].detection.bboxes.xyxy * scale
+    )
@@ -20,6 +20,29 @@ def test_open_img(samples_source, fn, expected):
     assert isinstance(open_img(samples_source / fn), PIL.Image.Image)
 
 
+def test_open_img_draft(samples_source, tmp_path):
+    # decoded at 1/4 of the size, the smallest scale that is at least draft_size
+    img = open_img(samples_source / "images2/flies.jpeg", draft_size=ImgSize(500, 900))
+    assert img.size == (648, 972)
+    # same size as the image without orientation
+    img = open_img(samples_source / "images2/flies.jpeg", draft_size=ImgSize(900, 500))
+    assert img.size == (1296, 1944)
+
+    filepath = tmp_path / "img.png"
+    PIL.Image.new("RGB", (400, 200)).save(filepath)
+    assert open_img(filepath, draft_size=ImgSize(100, 50)).size == (400, 200)
+
+
+def test_open_img_with_size(samples_source):
+    filepath = samples_source / "images2/flies.jpeg"
+    img, original_size = open_img_with_size(filepath, draft_size=ImgSize(500, 900))
+    assert img.size == (648, 972)
+    assert original_size == get_img_size(filepath)
+
+    img, original_size = open_img_with_size(filepath)
+    assert original_size == img.size
+
+
 @pytest.mark.parametrize(
     "fn,expected",
     [
@@ -30,3 +53,32 @@ def test_open_img(samples_source, fn, expected):
 def test_get_image_size(samples_source, fn, expected):
     size = get_image_size(samples_source / fn)
     assert size == (expected)
+
+
+@pytest.mark.parametrize(
+    "fn",
+    [
+        "voc/JPEGImages/2007_000063.jpg",
+        "voc/SegmentationClass/2007_000063.png",
+        # exif orientation 6, width and height are swapped
+        "images2/flies.jpeg",
+    ],
+)
+def test_get_img_size_header(samples_source, fn):
+    with PIL.Image.open(samples_source / fn) as image:
+        expected = PIL.ImageOps.exif_transpose(image).size
+
+    assert get_img_size(samples_source / fn) == expected
+    assert get_img_sizes([samples_source / fn] * 3, num_workers=2) == [expected] * 3
+
+
+def test_get_img_size_truncated_jpeg(tmp_path):
+    from icevision.utils.imageio import _read_header_img_size
+
+    # the file ends inside the fill bytes preceding a marker
+    filepath = tmp_path / "truncated.jpg"
+    filepath.write_bytes(b"\xff\xd8\xff\xff")
+    assert _read_header_img_size(filepath) is None
+    # falls back to PIL, which can't read it either
+    with pytest.raises(PIL.UnidentifiedImageError):
+        get_img_size(filepath)
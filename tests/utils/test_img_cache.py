@@ -0,0 +1,129 @@
+import gc
+import time
+import pytest
+from icevision.all import *
+
+
+@pytest.fixture
+def img_files(tmp_path):
+    filepaths = []
+    for i in range(3):
+        filepath = tmp_path / f"{i}.png"
+        PIL.Image.new("RGB", (20, 10), color=(i, i, i)).save(filepath)
+        filepaths.append(filepath)
+    return filepaths
+
+
+def test_img_cache_load(img_files):
+    img_cache = ImageCache(max_bytes=2 ** 20)
+    for _ in range(2):
+        for filepath in img_files:
+            img = img_cache.load(filepath)
+            np.testing.assert_equal(img, np.array(open_img(filepath)))
+            assert img.flags.writeable
+
+    stats = img_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 3, 0)
+    assert stats["hit_rate"] == 0.5
+    assert stats["num_bytes"] > 3 * 20 * 10 * 3
+
+    img_cache.reset_stats()
+    assert img_cache.stats()["hit_rate"] is None
+    img_cache.clear()
+    assert img_cache.stats()["num_bytes"] == 0
+    img_cache.load(img_files[0])
+    assert img_cache.stats()["misses"] == 1
+
+
+def test_img_cache_lru_eviction(img_files):
+    img_cache = ImageCache(max_bytes=2 ** 20)
+    img_cache.load(img_files[0])
+    entry_size = img_cache.stats()["num_bytes"]
+
+    img_cache = ImageCache(max_bytes=int(2.5 * entry_size))
+    img_cache.load(img_files[0])
+    img_cache.load(img_files[1])
+    time.sleep(0.01)
+    # uses the first image, the second is now the least recently used
+    img_cache.load(img_files[0])
+    time.sleep(0.01)
+    img_cache.load(img_files[2])
+
+    assert img_cache.stats()["evictions"] == 1
+    assert img_cache.stats()["num_bytes"] == 2 * entry_size
+    img_cache.reset_stats()
+    img_cache.load(img_files[0])
+    img_cache.load(img_files[2])
+    assert img_cache.stats()["hits"] == 2
+
+
+def test_img_cache_modified_file(img_files):
+    img_cache = ImageCache(max_bytes=2 ** 20)
+    img_cache.load(img_files[0])
+    PIL.Image.new("RGB", (5, 5)).save(img_files[0])
+    assert img_cache.load(img_files[0]).shape == (5, 5, 3)
+    assert img_cache.stats()["misses"] == 2
+
+
+def test_img_cache_removes_dir(img_files):
+    img_cache = ImageCache(max_bytes=2 ** 20)
+    cache_dir = img_cache.cache_dir
+    img_cache.load(img_files[0])
+    del img_cache
+    gc.collect()
+    assert not cache_dir.exists()
+
+
+def test_dataset_img_cache_workers(img_files):
+    records = []
+    for i, filepath in enumerate(img_files):
+        record = BaseRecord((FilepathRecordComponent(),))
+        record.set_record_id(i)
+        record.set_filepath(filepath)
+        records.append(record)
+
+    img_cache = ImageCache(max_bytes=2 ** 20)
+    dataset = Dataset(records, img_cache=img_cache)
+    dl = DataLoader(dataset, batch_size=1, num_workers=2, collate_fn=lambda o: o)
+    for _ in range(2):
+        for (record,) in dl:
+            assert record.img.shape == (10, 20, 3)
+            assert record.width == 20
+
+    stats = img_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (3, 3)
+
+
+def test_img_cache_full_filesystem(img_files, monkeypatch):
+    img_cache = ImageCache(max_bytes=2 ** 20)
+
+    def save(f, img):
+        f.write(b"partial")
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(np, "save", save)
+    img = img_cache.load(img_files[0])
+    np.testing.assert_equal(img, np.array(open_img(img_files[0])))
+    assert list(img_cache.cache_dir.glob("*.tmp")) == []
+    assert img_cache.stats()["num_bytes"] == 0
+
+
+def test_img_cache_clamps_budget(tmp_path, monkeypatch):
+    usage = shutil.disk_usage(tmp_path)
+    monkeypatch.setattr(
+        shutil, "disk_usage", lambda path: usage._replace(free=2 ** 20)
+    )
+    img_cache = ImageCache(max_bytes=2 ** 30, cache_dir=tmp_path / "cache")
+    assert img_cache.max_bytes == 2 ** 20
+
+
+def test_img_cache_load_with_size(samples_source):
+    filepath = samples_source / "images2/flies.jpeg"
+    img_cache = ImageCache(max_bytes=2 ** 24)
+    for _ in range(2):
+        img, original_size = img_cache.load_with_size(
+            filepath, draft_size=ImgSize(500, 900)
+        )
+        assert img.shape == (972, 648, 3)
+        assert original_size == get_img_size(filepath)
+    assert img_cache.stats()["hits"] == 1